@@ -1,16 +1,48 @@
-import argparse
-import json
+from __future__ import annotations
+
+# Keep module-level imports minimal: forwarded commands (app/daemon.py) and
+# `--help` should not pay for json, subprocess or the audio stack. Subcommands
+# import what they use.
 import os
 import sys
-import subprocess
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO
+
+if TYPE_CHECKING:
+    import argparse
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
+# Output streams of a main(stdout=..., stderr=...) call, per thread: the daemon
+# runs client commands on its worker while other threads (transaction lanes,
+# the VoiceMeeter poller) keep writing to the process's sys.stdout. Created on
+# first use, so a plain CLI run does not import threading.
+_streams: Any = None
+
+
+def _out() -> TextIO:
+    return getattr(_streams, "out", None) or sys.stdout
+
+
+def _err() -> TextIO:
+    return getattr(_streams, "err", None) or sys.stderr
+
+
+def _set_streams(out: TextIO | None, err: TextIO | None) -> tuple[TextIO | None, TextIO | None]:
+    """Route this thread's command output to `out`/`err` (None: sys.stdout/stderr); returns the previous pair."""
+    global _streams
+    if _streams is None:
+        import threading
+
+        _streams = threading.local()
+    previous = getattr(_streams, "out", None), getattr(_streams, "err", None)
+    _streams.out, _streams.err = out, err
+    return previous
+
 
 def _print(msg: str) -> None:
-    print(msg, flush=True)
+    print(msg, file=_out(), flush=True)
 
 
 def _ensure_dirs(*dirs: Path, dry_run: bool = False) -> None:
@@ -22,16 +54,19 @@ def _ensure_dirs(*dirs: Path, dry_run: bool = False) -> None:
 
 
 def _write_json(path: Path, data: dict, force: bool = False, dry_run: bool = False) -> None:
+    from profiles.manager import dump_json, write_json
+
     if path.exists() and not force:
         _print(f"[skip] {path} exists (use --force to overwrite)")
         return
     if dry_run:
-        _print(f"[dry-run] write {path} -> {json.dumps(data, indent=2)}")
+        _print(f"[dry-run] write {path} -> {dump_json(data).decode('utf-8').rstrip()}")
         return
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    _print(f"[ok] wrote {path}")
+    # Atomic, and an identical file is left alone (mtime unchanged)
+    if write_json(path, data):
+        _print(f"[ok] wrote {path}")
+    else:
+        _print(f"[ok] unchanged {path}")
 
 
 def _venv_paths(venv_dir: Path) -> dict:
@@ -63,6 +98,8 @@ def _create_venv(venv_dir: Path, dry_run: bool = False) -> None:
 
 
 def _pip_install(pip_path: Path, packages: list[str], dry_run: bool = False) -> int:
+    import subprocess
+
     if dry_run:
         _print(f"[dry-run] {pip_path} install {' '.join(packages)}")
         return 0
@@ -80,6 +117,37 @@ def _pip_install(pip_path: Path, packages: list[str], dry_run: bool = False) ->
     return 0
 
 
+def _pregenerate_com_wrappers(python: Path | None, dry_run: bool = False) -> None:
+    """Cache the comtypes wrappers now instead of on the first device access.
+
+    `python` is the venv interpreter to generate them for (None = this one).
+    """
+    if dry_run:
+        _print(f"[dry-run] pre-generate comtypes wrappers ({python or sys.executable})")
+        return
+    if python is None:
+        from audio.windows import pregenerate_com_wrappers
+
+        result = pregenerate_com_wrappers()
+    else:
+        import json
+        import subprocess
+
+        if not python.exists():
+            _print(f"[warn] python not found at {python}; skip comtypes wrappers")
+            return
+        code = "import json; from audio.windows import pregenerate_com_wrappers as g; print(json.dumps(g()))"
+        proc = subprocess.run([str(python), "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=False)
+        try:
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            result = {"ok": False, "error": (proc.stderr or "no output").strip().splitlines()[-1:]}
+    if result.get("ok"):
+        _print(f"[ok] comtypes wrappers cached ({len(result['modules'])} modules in {result['gen_dir'] or 'comtypes.gen'})")
+    else:
+        _print(f"[skip] comtypes wrappers not generated: {result.get('error')}")
+
+
 def _scan_devices() -> dict:
     """Attempt a basic device scan. Falls back to placeholders if deps are missing."""
     devices = {"playback": [], "recording": []}
@@ -144,6 +212,7 @@ def cmd_init(args: argparse.Namespace) -> int:
 
     if args.profiles == "default":
         example = {
+            "version": 2,
             "name": "Dictation",
             "playback": cfg["defaults"]["playback"],
             "recording": cfg["defaults"]["recording"],
@@ -172,11 +241,32 @@ def cmd_init(args: argparse.Namespace) -> int:
             rc = _pip_install(paths["pip"], ["pycaw", "comtypes"], dry_run=dry)
             if rc != 0:
                 _print("[warn] dependency installation reported a non-zero exit code")
+        _pregenerate_com_wrappers(paths["python"], dry_run=dry)
+    else:
+        _pregenerate_com_wrappers(None, dry_run=dry)
 
     _print("[done] init complete")
     return 0
 
 
+def _backend(args: argparse.Namespace):
+    """The AudioBackend selected by --backend / SSB_BACKEND, created once per process."""
+    backend = getattr(args, "_backend_instance", None)
+    if backend is None:
+        from audio.backend import get_backend
+        from audio.metrics import persist_on_exit
+
+        # Accumulate this run's latencies/counters for `app.cli stats` (opt-in: SSB_METRICS=1)
+        persist_on_exit()
+
+        try:
+            backend = get_backend(getattr(args, "backend", None), record=getattr(args, "record", None))
+        except ValueError as e:
+            raise SystemExit(f"error: {e}")
+        args._backend_instance = backend
+    return backend
+
+
 def cmd_doctor(_args: argparse.Namespace) -> int:
     from diagnostics.doctor import run_basic_checks, format_checks_for_cli
 
@@ -185,8 +275,275 @@ def cmd_doctor(_args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_stats(args: argparse.Namespace) -> int:
+    import json
+
+    from audio.metrics import METRICS_ENV, METRICS_PATH, load_persisted, persistence_enabled
+
+    if args.reset:
+        try:
+            METRICS_PATH.unlink()
+        except FileNotFoundError:
+            pass
+        _print("[ok] metrics reset")
+        return 0
+    stats = load_persisted()
+    if not persistence_enabled():
+        _err().write(f"[info] runs are only recorded with {METRICS_ENV}=1 set\n")
+    if args.format == "prometheus":
+        _out().write(stats.to_prometheus())
+    elif args.format == "json":
+        _print(json.dumps(stats.to_dict(), indent=2))
+    else:
+        _print(json.dumps({"operations": stats.summary(), "counters": stats.counters}, indent=2))
+    return 0
+
+
+def cmd_profile_list(args: argparse.Namespace) -> int:
+    from profiles.manager import PROFILES_DIR, profile_catalog
+
+    catalog = profile_catalog(Path(args.directory) if args.directory else PROFILES_DIR)
+    # Only files changed since the last listing are parsed (warm in the daemon)
+    catalog.refresh()
+    if args.tag and args.device:
+        by_device = {e.path for e in catalog.using_device(args.device)}
+        entries = [e for e in catalog.tagged(args.tag) if e.path in by_device]
+    elif args.tag:
+        entries = catalog.tagged(args.tag)
+    elif args.device:
+        entries = catalog.using_device(args.device)
+    else:
+        entries = catalog.entries()
+    if args.json:
+        import json
+
+        rows = [
+            {"name": e.name, "file": e.path.name, "tags": list(e.tags), "devices": list(e.devices), "error": e.error}
+            for e in entries
+        ]
+        _print(json.dumps(rows, indent=2))
+        return 0
+    lines = []
+    for e in entries:
+        if e.error:
+            lines.append(f"{e.path.name}: invalid ({e.error})")
+            continue
+        tags = f"  [{', '.join(e.tags)}]" if e.tags else ""
+        lines.append(f"{e.name} ({e.path.name}){tags}: {' / '.join(e.devices) or '-'}")
+    lines.append(f"{len(entries)} profile(s)")
+    # One write instead of one flush per profile
+    out = _out()
+    out.write("\n".join(lines) + "\n")
+    out.flush()
+    return 0
+
+
+def cmd_profile_validate(args: argparse.Namespace) -> int:
+    from profiles.manager import PROFILES_DIR, profile_catalog
+
+    catalog = profile_catalog(Path(args.directory) if args.directory else PROFILES_DIR)
+    catalog.refresh()
+    invalid = catalog.validate()
+    if args.json:
+        import json
+
+        _print(json.dumps({path.name: errors for path, errors in invalid.items()}, indent=2))
+    else:
+        for path, errors in invalid.items():
+            _print(f"{path.name}: {'; '.join(errors)}")
+        _print(f"{len(catalog)} profile(s), {len(invalid)} invalid")
+    return 1 if invalid else 0
+
+
+def cmd_profile_apply(args: argparse.Namespace) -> int:
+    from profiles.apply import read_state
+    from profiles.compiler import profile_compiler
+    from profiles.transaction import run_transaction
+
+    backend = _backend(args)
+    snapshot = backend.take_snapshot()
+    try:
+        compiled = profile_compiler().get(args.name, snapshot)
+    except (OSError, ValueError) as e:
+        _print(f"cannot read profile {args.name}: {e}")
+        return 1
+    if compiled is None:
+        _print(f"profile not found: {args.name}")
+        return 1
+    state = read_state(
+        backend,
+        volume=compiled.volume is not None,
+        mute=compiled.mute is not None,
+        snapshot=snapshot,
+        preset=compiled.voicemeeter is not None,
+    )
+    plan = compiled.plan(state, tolerance=args.tolerance)
+    for line in plan.describe():
+        _print(line)
+    if args.plan:
+        return 0
+    # Windows and VoiceMeeter steps in parallel; undone from `state` on failure
+    result = run_transaction(plan, backend, state, deadline=args.deadline)
+    for line in result.describe():
+        _print(line)
+    return 0 if result.ok else 1
+
+
+def cmd_daemon(args: argparse.Namespace) -> int:
+    import json
+
+    from app.daemon import AudioDaemon, DaemonClient, DaemonError
+
+    if args.status or args.stop:
+        client = DaemonClient.connect()
+        if client is None:
+            _print("no daemon running")
+            return 1
+        with client:
+            try:
+                result = client.call("shutdown" if args.stop else "ping")
+            except (OSError, DaemonError) as e:
+                _print(f"daemon not reachable: {e}")
+                return 1
+        _print("[ok] daemon stopping" if args.stop else json.dumps(result, indent=2))
+        return 0
+    from audio.backend import RECORD_ENV, backend_spec
+
+    daemon = AudioDaemon(_backend(args), spec=backend_spec(args.backend), record=args.record or os.environ.get(RECORD_ENV) or None)
+    _print(f"[run] audio daemon ({daemon.backend.name}) pid {os.getpid()}; stop with Ctrl+C or `app.cli daemon --stop`")
+    try:
+        daemon.serve(args.address)
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        _print(f"[error] {e}")
+        return 1
+    return 0
+
+
+# Commands that make no sense inside a batch (they run their own loop)
+_NOT_BATCHABLE = frozenset({"batch", "daemon", "shell"})
+
+
+def _parse_batch_line(line: str) -> tuple[list[str], object] | None:
+    """(argv, id) of one batch line; None for blank/comment lines.
+
+    Plain lines are split like a shell command ("win volume 30"); JSON lines are
+    an argv list or {"argv": [...] | "...", "id": ...}.
+    """
+    import json
+    import shlex
+
+    text = line.strip()
+    if not text or text.startswith("#"):
+        return None
+    if text[0] in "[{":
+        data = json.loads(text)
+        if isinstance(data, list):
+            return [str(a) for a in data], None
+        if isinstance(data, dict) and "argv" in data:
+            argv = data["argv"]
+            argv = shlex.split(argv) if isinstance(argv, str) else [str(a) for a in argv]
+            return argv, data.get("id")
+        raise ValueError('expected an argv list or {"argv": ...}')
+    return shlex.split(text), None
+
+
+def _run_command(parser: argparse.ArgumentParser, argv: list[str], backend) -> dict:
+    """Run one command on `backend`, capturing its output; never raises."""
+    import io
+    import time
+
+    out, err = io.StringIO(), io.StringIO()
+    t0 = time.perf_counter()
+    previous = _set_streams(out, err)
+    try:
+        if argv and argv[0] in _NOT_BATCHABLE:
+            print(f"{argv[0]} cannot be nested", file=err)
+            rc = 2
+        else:
+            args = parser.parse_args(argv)
+            args._backend_instance = backend
+            rc = args.func(args)
+    except SystemExit as e:  # argparse errors, --help
+        rc = _exit_code(e, err)
+    except Exception as e:
+        print(f"{type(e).__name__}: {e}", file=err)
+        rc = 1
+    finally:
+        _set_streams(*previous)
+    result = {"argv": argv, "rc": rc, "ok": rc == 0, "ms": round((time.perf_counter() - t0) * 1e3, 3), "output": out.getvalue().splitlines()}
+    if err.getvalue():
+        result["error"] = err.getvalue().strip()
+    return result
+
+
+def _exit_code(e: SystemExit, err: TextIO) -> int:
+    """Return code of a SystemExit caught instead of ending the process; a message goes to `err`."""
+    if isinstance(e.code, str):
+        print(e.code, file=err)
+    return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+
+
+def cmd_batch(args: argparse.Namespace) -> int:
+    """Run many commands in one process on a shared backend and device snapshot."""
+    import json
+
+    from audio.session import SessionBackend
+
+    backend = SessionBackend(_backend(args))
+    parser = build_parser()
+    stream = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    failed = total = 0
+    try:
+        for lineno, line in enumerate(stream, 1):
+            try:
+                parsed = _parse_batch_line(line)
+            except ValueError as e:
+                parsed, result = None, {"argv": None, "rc": 2, "ok": False, "ms": 0.0, "output": [], "error": f"invalid line: {e}"}
+            else:
+                if parsed is None:
+                    continue
+                result = _run_command(parser, parsed[0], backend)
+                if parsed[1] is not None:
+                    result["id"] = parsed[1]
+            total += 1
+            _print(json.dumps({"line": lineno, **result}, ensure_ascii=False))
+            if not result["ok"]:
+                failed += 1
+                if not args.keep_going:
+                    break
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    print(f"[done] {total} command(s), {failed} failed, {backend.refreshes} enumeration(s)", file=_err())
+    return 1 if failed else 0
+
+
+def cmd_shell(args: argparse.Namespace) -> int:
+    from app.shell import run_shell
+
+    return run_shell(_backend(args), build_parser(), _run_command)
+
+
 def build_parser() -> argparse.ArgumentParser:
-    p = argparse.ArgumentParser(prog="app.cli", add_help=True)
+    import argparse
+
+    class Parser(argparse.ArgumentParser):
+        # Usage, help and errors go to the streams of main() as well
+        def _print_message(self, message: str, file: Any = None) -> None:
+            if message:
+                (_out() if file is sys.stdout else _err()).write(message)
+
+    p = Parser(prog="app.cli", add_help=True)
+    p.add_argument(
+        "--backend",
+        default=None,
+        help="Audio backend spec: windows (default), simulated[:options] or replay:<trace>; env SSB_BACKEND",
+    )
+    p.add_argument("--record", default=None, metavar="TRACE", help="Record backend calls to a trace file (.gz = compressed); env SSB_RECORD")
+    p.add_argument("--import-profile", action="store_true", help="Print an import-time breakdown of the command (python -X importtime)")
+    p.add_argument("--no-daemon", action="store_true", help=f"Run locally even if an audio daemon is running; env {NO_DAEMON_ENV}=1")
     sub = p.add_subparsers(dest="command", required=True)
 
     p_init = sub.add_parser("/init", help="Initialize project structure and config")
@@ -211,60 +568,100 @@ def build_parser() -> argparse.ArgumentParser:
     p_doc = sub.add_parser("/doctor", help="Run environment checks")
     p_doc.set_defaults(func=cmd_doctor)
 
-    # Windows audio helper commands (Stufe 1 testing)
+    p_stats = sub.add_parser("stats", help="Show operation latencies and HRESULT/timeout/fallback counters")
+    p_stats.add_argument("--format", choices=["summary", "json", "prometheus"], default="summary")
+    p_stats.add_argument("--reset", action="store_true", help="Delete the accumulated metrics")
+    p_stats.set_defaults(func=cmd_stats)
+
+    p_profile = sub.add_parser("profile", help="Apply profiles from profiles/")
+    profile_sub = p_profile.add_subparsers(dest="profile_cmd", required=True)
+    p_profile_list = profile_sub.add_parser("list", help="List profiles (filter by tag or device)")
+    p_profile_list.add_argument("--tag", help="Only profiles with this tag")
+    p_profile_list.add_argument("--device", help="Only profiles using this device (id or name as written in the profile)")
+    p_profile_list.add_argument("--directory", help="Profile directory (default: profiles/)")
+    p_profile_list.add_argument("--json", action="store_true", help="Print JSON")
+    p_profile_list.set_defaults(func=cmd_profile_list)
+    p_profile_validate = profile_sub.add_parser("validate", help="Check all profiles against their schema version")
+    p_profile_validate.add_argument("--directory", help="Profile directory (default: profiles/)")
+    p_profile_validate.add_argument("--json", action="store_true", help="Print JSON")
+    p_profile_validate.set_defaults(func=cmd_profile_validate)
+    p_profile_apply = profile_sub.add_parser("apply", help="Apply a profile; only settings that differ are changed")
+    p_profile_apply.add_argument("name", help="Profile name or file stem")
+    p_profile_apply.add_argument("--plan", action="store_true", help="Show the planned operations without executing them")
+    p_profile_apply.add_argument("--tolerance", type=int, default=1, help="Volume difference (percent points) treated as already set")
+    p_profile_apply.add_argument("--deadline", type=float, default=2.0, help="Seconds for the whole switch; on failure or timeout the previous state is restored")
+    p_profile_apply.set_defaults(func=cmd_profile_apply)
+
+    p_batch = sub.add_parser("batch", help="Run commands from a file or stdin in one process (one JSON result per line)")
+    p_batch.add_argument("file", nargs="?", default="-", help="Command file: one command per line or JSON lines (default: stdin)")
+    p_batch.add_argument("--keep-going", action="store_true", help="Continue after a failed command instead of stopping")
+    p_batch.set_defaults(func=cmd_batch)
+
+    p_shell = sub.add_parser("shell", help="Interactive shell with a warm backend and device-name completion")
+    p_shell.set_defaults(func=cmd_shell)
+
+    p_daemon = sub.add_parser("daemon", help="Keep a warm backend resident and serve JSON-RPC on a local socket")
+    p_daemon.add_argument("--address", default=None, help="unix:<path> or tcp:127.0.0.1:<port> (default: per-user socket)")
+    p_daemon.add_argument("--status", action="store_true", help="Show whether a daemon is running")
+    p_daemon.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    p_daemon.set_defaults(func=cmd_daemon)
+
+    # Windows audio helper commands (Stufe 1 testing); run against the selected backend
     def _win_list(args: argparse.Namespace) -> int:
         from audio import windows as win
 
-        play = win.list_playback_devices()
-        rec = win.list_recording_devices()
+        backend = _backend(args)
+        if getattr(args, "all", False):
+            if not hasattr(backend, "enumerate_endpoints"):
+                _print(f"--all is not supported by the {backend.name} backend")
+                return 1
+            # Include disabled/unplugged/not-present endpoints with their state
+            for d in backend.enumerate_endpoints(win.E_ALL, win.DEVICE_STATEMASK_ALL, win.ENDPOINT_FIELDS):
+                _print(f"- {d.get('id')} :: {d.get('name')} [state={d.get('state')}, form_factor={d.get('form_factor')}]")
+            return 0
+        snap = backend.take_snapshot()
         _print("Playback devices:")
-        for d in play:
+        for d in snap.playback:
             _print(f"- {d.get('id')} :: {d.get('name')}")
         _print("Recording devices:")
-        for d in rec:
+        for d in snap.recording:
             _print(f"- {d.get('id')} :: {d.get('name')}")
         return 0
 
-    def _win_set_def_pb(args: argparse.Namespace) -> int:
-        from audio import windows as win
-
+    def _win_set_default(args: argparse.Namespace, flow: str) -> int:
+        backend = _backend(args)
         if getattr(args, "debug", False):
-            rep = win.debug_set_default_endpoint(args.identifier, "render")
+            if not hasattr(backend, "debug_set_default_endpoint"):
+                _print(f"--debug is not supported by the {backend.name} backend")
+                return 1
+            import json
+
+            rep = backend.debug_set_default_endpoint(args.identifier, flow)
             _print(json.dumps(rep, indent=2))
             return 0 if rep.get("success") else 1
-        ok = win.set_default_playback(args.identifier)
+        setter = backend.set_default_playback if flow == "render" else backend.set_default_recording
+        ok = setter(args.identifier)
         _print("ok" if ok else "failed (try placing SoundVolumeView.exe in tools/)")
         return 0 if ok else 1
 
-    def _win_set_def_rec(args: argparse.Namespace) -> int:
-        from audio import windows as win
+    def _win_set_def_pb(args: argparse.Namespace) -> int:
+        return _win_set_default(args, "render")
 
-        if getattr(args, "debug", False):
-            rep = win.debug_set_default_endpoint(args.identifier, "capture")
-            _print(json.dumps(rep, indent=2))
-            return 0 if rep.get("success") else 1
-        ok = win.set_default_recording(args.identifier)
-        _print("ok" if ok else "failed (try placing SoundVolumeView.exe in tools/)")
-        return 0 if ok else 1
+    def _win_set_def_rec(args: argparse.Namespace) -> int:
+        return _win_set_default(args, "capture")
 
     def _win_volume(args: argparse.Namespace) -> int:
-        from audio import windows as win
-
-        ok = win.set_master_volume(args.percent)
+        ok = _backend(args).set_master_volume(args.percent)
         _print("ok" if ok else "failed")
         return 0 if ok else 1
 
     def _win_mute(args: argparse.Namespace) -> int:
-        from audio import windows as win
-
-        ok = win.mute_master(args.state == "on")
+        ok = _backend(args).mute_master(args.state == "on")
         _print("ok" if ok else "failed")
         return 0 if ok else 1
 
     def _win_tone(args: argparse.Namespace) -> int:
-        from audio import windows as win
-
-        win.play_test_tone(args.freq, args.ms)
+        _backend(args).play_test_tone(args.freq, args.ms)
         _print("tone")
         return 0
 
@@ -272,6 +669,7 @@ def build_parser() -> argparse.ArgumentParser:
     win_sub = p_win.add_subparsers(dest="win_cmd", required=True)
 
     p_win_list = win_sub.add_parser("list", help="List playback/recording devices")
+    p_win_list.add_argument("--all", action="store_true", help="Include inactive endpoints (state, form factor)")
     p_win_list.set_defaults(func=_win_list)
 
     p_win_setpb = win_sub.add_parser("set-default-playback", help="Set default playback by name or id")
@@ -300,10 +698,79 @@ def build_parser() -> argparse.ArgumentParser:
     return p
 
 
-def main(argv: list[str] | None = None) -> int:
+def parse_importtime(text: str) -> list[tuple[str, int, int, int]]:
+    """(module, self µs, cumulative µs, nesting depth) from `python -X importtime` output."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def _import_profile(argv: list[str], top: int = 25) -> int:
+    """Run `argv` in a child with -X importtime; print its slowest imports to stderr."""
+    import subprocess
+
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-m", "app.cli", *argv], cwd=PROJECT_ROOT, stderr=subprocess.PIPE, text=True, check=False)
+    rows = parse_importtime(proc.stderr)
+    other = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+    if other:
+        print("\n".join(other), file=_err())
+    total_ms = sum(r[1] for r in rows) / 1000
+    print(f"[import-profile] {len(rows)} modules, {total_ms:.1f} ms import time (self, summed)", file=_err())
+    print(f"{'cumulative':>12} {'self':>9}  module", file=_err())
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:9.2f} ms {self_us / 1000:6.2f} ms  {'  ' * depth}{name}", file=_err())
+    return proc.returncode
+
+
+# Subcommands a running daemon executes on behalf of a thin client
+FORWARDED_COMMANDS = frozenset({"win", "profile"})
+# Set to 1 to run every command locally, as with --no-daemon
+NO_DAEMON_ENV = "SSB_NO_DAEMON"
+
+
+def _forwardable(argv: list[str]) -> bool:
+    """True if `argv` may be handed to a running daemon (see main)."""
+    if os.environ.get(NO_DAEMON_ENV, "").strip() not in ("", "0") or "--no-daemon" in argv:
+        return False
+    # Global options (--backend, --record, ...) come before the command and ask
+    # for a locally created backend
+    return bool(argv) and argv[0] in FORWARDED_COMMANDS
+
+
+def main(argv: list[str] | None = None, backend=None, stdout: TextIO | None = None, stderr: TextIO | None = None) -> int:
+    """Run one command; `backend` (used by the daemon) replaces --backend selection.
+
+    `stdout`/`stderr` receive the command's output instead of sys.stdout/stderr
+    (only output of the calling thread; the daemon captures client replies so).
+    """
+    if stdout is not None or stderr is not None:
+        previous = _set_streams(stdout, stderr)
+        try:
+            return main(argv, backend)
+        finally:
+            _set_streams(*previous)
     argv = sys.argv[1:] if argv is None else argv
+    if "--import-profile" in argv:
+        return _import_profile([a for a in argv if a != "--import-profile"])
+    # Thin client: without explicit global options, hand device commands to a
+    # running daemon (app/daemon.py) before paying for parser and backend setup
+    if backend is None and _forwardable(argv):
+        from app.daemon import forward
+
+        rc = forward(argv)
+        if rc is not None:
+            return rc
     parser = build_parser()
     args = parser.parse_args(argv)
+    if backend is not None:
+        args._backend_instance = backend
     return args.func(args)
 
 
@@ -0,0 +1,398 @@
+"""Resident audio daemon: a warm backend behind JSON-RPC 2.0 on a local socket.
+
+`python -m app.cli daemon` keeps one AudioBackend (COM objects, device table,
+resolver index) alive and answers newline-delimited JSON-RPC requests on a Unix
+socket (POSIX) or a loopback TCP port (Windows, where Python has no AF_UNIX).
+Requests are serialised on one worker thread, which makes the backend calls and
+keeps its thread-affine COM cache warm. Some work leaves that thread: `profile
+apply` runs its steps on the transaction lanes of profiles/transaction.py, each
+with its own COM objects, and the volume controller and VoiceMeeter poller have
+threads of their own. A "cli" request's output is captured from the worker
+thread only (cli.main(stdout=..., stderr=...)), so whatever those threads print
+does not end up in a client's reply.
+
+The daemon writes a state file (address, token, pid, backend spec and record
+path) readable only by the user; clients read it to find the daemon and send the
+token with every request. When that file points at a live daemon, `app.cli`
+forwards commands to it instead of importing the audio stack itself (see
+app/cli.py `main`), unless the client's SSB_BACKEND/SSB_RECORD ask for a
+different backend or trace than the daemon runs.
+
+Methods: "ping", "cli" ({"argv": [...]} -> {"rc", "output", "error_output"}),
+"stats", "shutdown" and the AudioBackend methods ("take_snapshot",
+"set_default_playback", ...; params as a list or an object).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any
+
+# Environment variable overriding the state file location
+STATE_ENV = "SSB_DAEMON_STATE"
+CONNECT_TIMEOUT = 2.0
+# Same names as audio.backend.BACKEND_ENV/RECORD_ENV (not imported: forwarding stays light)
+BACKEND_ENV = "SSB_BACKEND"
+RECORD_ENV = "SSB_RECORD"
+
+# Backend methods callable over JSON-RPC
+BACKEND_METHODS = frozenset(
+    {
+        "take_snapshot",
+        "resolve_device",
+        "get_default_playback_id",
+        "get_default_recording_id",
+        "set_default_playback",
+        "set_default_recording",
+        "set_master_volume",
+        "mute_master",
+        "play_test_tone",
+    }
+)
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+UNAUTHORIZED = -32000
+
+
+class DaemonError(RuntimeError):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(f"{message} ({code})")
+        self.code = code
+        self.message = message
+
+
+def state_path() -> Path:
+    """Where the running daemon publishes its address and token."""
+    override = os.environ.get(STATE_ENV)
+    if override:
+        return Path(override)
+    if os.name == "nt":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home()) / "SoundSystemBasic"
+        return base / "daemon.json"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        base = Path(runtime_dir)
+    else:
+        import tempfile
+
+        base = Path(tempfile.gettempdir())
+    return base / f"ssb-audio-{os.getuid()}.json"
+
+
+def default_address() -> str:
+    if os.name == "nt" or not hasattr(socket, "AF_UNIX"):
+        return "tcp:127.0.0.1:0"
+    return "unix:" + str(state_path().with_suffix(".sock"))
+
+
+def _to_json(value: Any) -> Any:
+    from audio.resolver import Resolution
+    from audio.windows import DeviceSnapshot
+
+    if isinstance(value, DeviceSnapshot):
+        return {
+            "playback": value.playback,
+            "recording": value.recording,
+            "default_playback_id": value.default_playback_id,
+            "default_recording_id": value.default_recording_id,
+        }
+    if isinstance(value, Resolution):
+        return value.as_dict()
+    return value
+
+
+class AudioDaemon:
+    """Request dispatcher around one backend; see module docstring for methods."""
+
+    def __init__(self, backend: Any, token: str | None = None, spec: str | None = None, record: str | None = None) -> None:
+        import secrets
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.backend = backend
+        self.token = token or secrets.token_hex(16)
+        # Effective backend spec and trace path, published so clients can tell whether they match
+        self.spec = spec
+        self.record = record
+        self.started = time.monotonic()
+        self.requests = 0
+        self._server: Any = None
+        # Serialises requests; owns the COM objects of the backend calls it makes
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AudioDaemon", initializer=_init_com)
+
+    def _run(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        return self._worker.submit(fn, *args, **kwargs).result()
+
+    def warm_up(self) -> None:
+        """Enumerate once and start change notifications where the backend has them."""
+
+        def warm() -> None:
+            watch = getattr(self.backend, "watch_devices", None)
+            if watch is not None:
+                watch()
+            self.backend.take_snapshot()
+
+        self._run(warm)
+
+    def _cli(self, argv: list[str]) -> dict[str, Any]:
+        import io
+
+        from app import cli
+
+        out, err = io.StringIO(), io.StringIO()
+        try:
+            rc = cli.main(list(argv), backend=self.backend, stdout=out, stderr=err)
+        except SystemExit as e:  # argparse errors, --help
+            rc = cli._exit_code(e, err)
+        return {"rc": rc, "output": out.getvalue(), "error_output": err.getvalue()}
+
+    def dispatch(self, method: str, params: Any) -> Any:
+        import time
+
+        if method == "ping":
+            return {"pid": os.getpid(), "backend": getattr(self.backend, "name", "?"), "spec": self.spec, "record": self.record, "uptime_s": round(time.monotonic() - self.started, 3), "requests": self.requests}
+        if method == "cli":
+            argv = params.get("argv") if isinstance(params, dict) else params
+            if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+                raise DaemonError(INVALID_PARAMS, "cli expects {'argv': [str, ...]}")
+            return self._run(self._cli, argv)
+        if method == "stats":
+            from audio.metrics import metrics
+
+            return metrics.to_dict()
+        if method == "shutdown":
+            if self._server is not None:
+                import threading
+
+                threading.Thread(target=self._server.shutdown, daemon=True).start()
+            return True
+        if method in BACKEND_METHODS:
+            fn = getattr(self.backend, method)
+            try:
+                if isinstance(params, dict):
+                    result = self._run(fn, **params)
+                else:
+                    result = self._run(fn, *(params or []))
+            except TypeError as e:
+                raise DaemonError(INVALID_PARAMS, str(e))
+            return _to_json(result)
+        raise DaemonError(METHOD_NOT_FOUND, f"unknown method {method!r}")
+
+    def handle(self, line: bytes) -> dict[str, Any] | None:
+        """Answer one JSON-RPC request line; None for notifications (no id)."""
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": PARSE_ERROR, "message": "parse error"}}
+        if not isinstance(msg, dict) or not isinstance(msg.get("method"), str):
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": INVALID_REQUEST, "message": "invalid request"}}
+        req_id = msg.get("id")
+        self.requests += 1
+        try:
+            if msg.get("auth") != self.token:
+                raise DaemonError(UNAUTHORIZED, "unauthorized")
+            result = self.dispatch(msg["method"], msg.get("params"))
+            response: dict[str, Any] = {"jsonrpc": "2.0", "id": req_id, "result": result}
+        except DaemonError as e:
+            response = {"jsonrpc": "2.0", "id": req_id, "error": {"code": e.code, "message": e.message}}
+        except Exception as e:
+            response = {"jsonrpc": "2.0", "id": req_id, "error": {"code": INTERNAL_ERROR, "message": f"{type(e).__name__}: {e}"}}
+        return response if req_id is not None else None
+
+    def serve(self, address: str | None = None, warm: bool = True) -> None:
+        """Listen on `address` ("unix:<path>" or "tcp:<host>:<port>") until shutdown."""
+        import socketserver
+
+        address = address or default_address()
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    response = daemon.handle(line)
+                    if response is not None:
+                        self.wfile.write(json.dumps(response, separators=(",", ":")).encode("utf-8") + b"\n")
+                        self.wfile.flush()
+
+        kind, _, where = address.partition(":")
+        if kind == "unix":
+            path = Path(where)
+            path.unlink(missing_ok=True)
+
+            class Server(socketserver.ThreadingUnixStreamServer):
+                daemon_threads = True
+
+            server: Any = Server(str(path), Handler)
+            os.chmod(path, 0o600)
+            published = f"unix:{path}"
+        elif kind == "tcp":
+            host, _, port = where.rpartition(":")
+            if host not in ("127.0.0.1", "localhost", "::1"):
+                raise ValueError("the daemon only listens on loopback addresses")
+
+            class Server(socketserver.ThreadingTCPServer):  # type: ignore[no-redef]
+                daemon_threads = True
+                allow_reuse_address = True
+
+            server = Server((host, int(port or 0)), Handler)
+            published = f"tcp:{host}:{server.server_address[1]}"
+        else:
+            raise ValueError(f"invalid daemon address {address!r} (expected unix:<path> or tcp:<host>:<port>)")
+
+        if warm:
+            self.warm_up()
+        state = state_path()
+        state.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(state, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"address": published, "token": self.token, "pid": os.getpid(), "backend": getattr(self.backend, "name", "?"), "spec": self.spec, "record": self.record}, f)
+        self._server = server
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            state.unlink(missing_ok=True)
+            if kind == "unix":
+                Path(where).unlink(missing_ok=True)
+            self._worker.shutdown(wait=False)
+
+
+def _init_com() -> None:
+    try:
+        import comtypes
+
+        comtypes.CoInitialize()
+    except Exception:
+        pass
+
+
+class DaemonClient:
+    """Connection to a running daemon; one persistent socket, many requests."""
+
+    def __init__(self, address: str, token: str, timeout: float = CONNECT_TIMEOUT) -> None:
+        kind, _, where = address.partition(":")
+        if kind == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            target: Any = where
+        elif kind == "tcp":
+            host, _, port = where.rpartition(":")
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            target = (host, int(port))
+        else:
+            raise ValueError(f"invalid daemon address {address!r}")
+        sock.settimeout(timeout)
+        try:
+            sock.connect(target)
+        except OSError:
+            sock.close()
+            raise
+        # Requests may legitimately block on a slow driver; the daemon enforces deadlines
+        sock.settimeout(None)
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+        self._token = token
+        self._next_id = 0
+
+    @classmethod
+    def connect(cls, timeout: float = CONNECT_TIMEOUT, state: dict[str, Any] | None = None) -> "DaemonClient | None":
+        """Client for the daemon named in `state` (default: the state file); None if none is reachable."""
+        state = state or read_state()
+        if state is None:
+            return None
+        try:
+            return cls(state["address"], state["token"], timeout)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def call(self, method: str, params: Any = None) -> Any:
+        self._next_id += 1
+        request = {"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params, "auth": self._token}
+        self._file.write(json.dumps(request, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise DaemonError(INTERNAL_ERROR, "daemon closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise DaemonError(response["error"].get("code", INTERNAL_ERROR), response["error"].get("message", "error"))
+        return response.get("result")
+
+    def close(self) -> None:
+        try:
+            self._file.close()
+        finally:
+            self._sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+
+def read_state() -> dict[str, Any] | None:
+    """Contents of the state file; None if there is none (no daemon running)."""
+    try:
+        state = json.loads(state_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def mismatch(state: dict[str, Any]) -> str | None:
+    """Why this client must not use the daemon described by `state`; None if it may.
+
+    A client that sets SSB_BACKEND or SSB_RECORD asks for that backend or trace;
+    forwarding would silently use whatever the daemon was started with.
+    """
+    wanted = (os.environ.get(BACKEND_ENV) or "").strip()
+    if wanted and wanted != (state.get("spec") or "").strip():
+        return f"{BACKEND_ENV}={wanted!r}, daemon runs {state.get('spec')!r}"
+    record = (os.environ.get(RECORD_ENV) or "").strip()
+    if record and record != (state.get("record") or ""):
+        return f"{RECORD_ENV}={record!r}, daemon records to {state.get('record')!r}"
+    return None
+
+
+def forward(argv: list[str]) -> int | None:
+    """Run a CLI command in the daemon.
+
+    Returns None if the command should run locally instead: no daemon is
+    reachable, it runs a different backend or trace than the environment asks for
+    (see `mismatch`), or it rejected the token before doing anything. Once the
+    request has been accepted, a failure is reported with rc 1 and never re-run
+    locally: the daemon may already have executed the command.
+    """
+    state = read_state()
+    if state is None or mismatch(state) is not None:
+        return None
+    client = DaemonClient.connect(state=state)
+    if client is None:
+        return None
+    with client:
+        try:
+            result = client.call("cli", {"argv": argv})
+        except DaemonError as e:
+            if e.code == UNAUTHORIZED:
+                # Stale state file of another daemon instance: nothing was run
+                return None
+            sys.stderr.write(f"error: audio daemon: {e}\n")
+            return 1
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"error: audio daemon connection lost: {e}\n")
+            return 1
+    sys.stdout.write(result.get("output", ""))
+    sys.stderr.write(result.get("error_output", ""))
+    sys.stdout.flush()
+    return int(result.get("rc") or 0)
@@ -0,0 +1,159 @@
+"""Interactive shell (`python -m app.cli shell`) with a warm backend and device cache.
+
+Every app.cli command works at the prompt, with or without the "win" prefix
+("list", "set-default-playback Speakers", "win volume 30"). All commands share
+one SessionBackend (audio/session.py), so devices are enumerated once; `refresh`
+re-enumerates on request, and on backends with change notifications (Windows)
+the cache is dropped when a device event arrives. Device names complete with
+Tab from the cached index; `time <cmd>` prints a command's latency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cmd
+import shlex
+import time
+from typing import Any
+
+from audio.session import SessionBackend
+
+# Subcommands of `win` usable without the prefix
+WIN_COMMANDS = ("list", "set-default-playback", "set-default-recording", "volume", "mute", "test-tone")
+_NAME_ARGUMENT = {"set-default-playback": "playback", "set-default-recording": "recording"}
+
+
+class AudioShell(cmd.Cmd):
+    intro = "SoundSystemBasic shell – 'help' für Befehle, Tab ergänzt Gerätenamen, 'exit' beendet."
+    prompt = "ssb> "
+    # Allow dashes in command names ("set-default-playback")
+    identchars = cmd.Cmd.identchars + "-"
+
+    def __init__(self, backend: Any, parser: argparse.ArgumentParser, run_command: Any) -> None:
+        super().__init__()
+        self.session = backend if isinstance(backend, SessionBackend) else SessionBackend(backend)
+        self.parser = parser
+        self._run_command = run_command
+        self._changed = False
+        self._unsubscribe = None
+        watch = getattr(self.session.inner, "watch_devices", None)
+        if watch is not None:
+            table = watch()
+            if table.live:
+                self._unsubscribe = table.subscribe(self._on_device_event)
+
+    # -- device cache -----------------------------------------------------
+    def _on_device_event(self, _event: Any) -> None:
+        # Runs on a COM notification thread: only mark, the prompt thread re-reads
+        self.session.invalidate()
+        self._changed = True
+
+    def _names(self, flow: str) -> list[str]:
+        snap = self.session.take_snapshot()
+        return [d.get("name") or "" for d in (snap.playback if flow == "playback" else snap.recording)]
+
+    # -- cmd.Cmd hooks ----------------------------------------------------
+    def preloop(self) -> None:
+        self.session.take_snapshot()
+
+    def postcmd(self, stop: bool, line: str) -> bool:
+        if self._changed:
+            self._changed = False
+            print("[info] Geräteänderung erkannt – Cache wird beim nächsten Zugriff neu gelesen")
+        return stop
+
+    def postloop(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+
+    def emptyline(self) -> bool:
+        return False
+
+    def _argv(self, line: str) -> list[str]:
+        argv = shlex.split(line)
+        if argv and argv[0] in WIN_COMMANDS:
+            argv.insert(0, "win")
+        return argv
+
+    def _execute(self, line: str) -> dict[str, Any] | None:
+        try:
+            argv = self._argv(line)
+        except ValueError as e:
+            print(f"error: {e}")
+            return None
+        result = self._run_command(self.parser, argv, self.session)
+        for out in result["output"]:
+            print(out)
+        if result.get("error"):
+            print(result["error"])
+        return result
+
+    def default(self, line: str) -> bool:
+        if line == "EOF":
+            print()
+            return True
+        self._execute(line)
+        return False
+
+    # -- shell commands ---------------------------------------------------
+    def do_refresh(self, _arg: str) -> bool:
+        """refresh – Geräte neu enumerieren"""
+        t0 = time.perf_counter()
+        snap = self.session.refresh()
+        print(f"{len(snap.playback)} Wiedergabe-, {len(snap.recording)} Aufnahmegeräte ({(time.perf_counter() - t0) * 1e3:.1f} ms)")
+        return False
+
+    def do_time(self, arg: str) -> bool:
+        """time <befehl> – Befehl ausführen und Latenz anzeigen"""
+        if not arg.strip():
+            print("usage: time <command>")
+            return False
+        result = self._execute(arg)
+        if result is not None:
+            print(f"[time] {result['ms']:.3f} ms (rc={result['rc']})")
+        return False
+
+    def do_exit(self, _arg: str) -> bool:
+        """exit – Shell beenden"""
+        return True
+
+    do_quit = do_exit
+
+    # -- completion -------------------------------------------------------
+    def completenames(self, text: str, *ignored: Any) -> list[str]:
+        names = set(WIN_COMMANDS) | {"win", "refresh", "time", "exit", "quit", "help"}
+        return sorted(n for n in names if n.startswith(text))
+
+    def completedefault(self, text: str, line: str, begidx: int, endidx: int) -> list[str]:
+        head = line[:begidx].split()
+        if head and head[0] in ("time",):
+            head = head[1:]
+        if head and head[0] == "win":
+            head = head[1:]
+            if len(head) == 0:
+                return [c for c in WIN_COMMANDS if c.startswith(text)]
+        if not head or head[0] not in _NAME_ARGUMENT:
+            return []
+        # Names contain spaces: match against everything typed after the subcommand
+        typed = line[line.index(head[0]) + len(head[0]) : endidx].lstrip().lstrip("\"'")
+        offset = len(typed) - len(text)
+        folded = typed.casefold()
+        return [name[offset:] for name in self._names(_NAME_ARGUMENT[head[0]]) if name.casefold().startswith(folded)]
+
+    complete_time = completedefault
+
+
+def run_shell(backend: Any, parser: argparse.ArgumentParser, run_command: Any) -> int:
+    try:
+        import readline
+
+        # Complete whole device names, including spaces inside them
+        readline.set_completer_delims(" \t\n\"'")
+    except ImportError:
+        pass
+    shell = AudioShell(backend, parser, run_command)
+    try:
+        shell.cmdloop()
+    except KeyboardInterrupt:
+        print()
+    return 0
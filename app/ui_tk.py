@@ -1,23 +1,42 @@
+import argparse
+import queue
+import threading
 import tkinter as tk
+from functools import partial
 from tkinter import ttk, messagebox
 
 try:
     from audio import windows as win
+    from audio.backend import get_backend
+    from audio.deadline import call_with_deadline
 except Exception:  # pragma: no cover
     win = None  # type: ignore
+    get_backend = call_with_deadline = None  # type: ignore
 
 
 class App(tk.Tk):
-    def __init__(self) -> None:
+    def __init__(self, backend=None) -> None:
         super().__init__()
         self.title("Sound System Basic – Stufe 1")
         self.geometry("1100x600")
 
+        # AudioBackend (audio/backend.py): Windows by default, simulated for CI/benchmarks
+        if backend is None and get_backend is not None:
+            backend = get_backend()
+        self.backend = backend
+
         self.playback_devices: list[dict] = []
         self.recording_devices: list[dict] = []
+        # Live device table (IMMNotificationClient); events are drained on the Tk thread
+        self.device_table = None
+        self._device_events: queue.SimpleQueue = queue.SimpleQueue()
+        # (done, CallResult) from helper threads; done() runs on the Tk thread
+        self._call_results: queue.SimpleQueue = queue.SimpleQueue()
+        self._refreshing = False
 
         self._build_ui()
-        self.refresh_devices()
+        self.after(50, self._poll_call_results)
+        self._start_device_watch()
 
     def _build_ui(self) -> None:
         # Top controls: refresh + status
@@ -108,26 +127,98 @@ class App(tk.Tk):
     def set_status(self, text: str) -> None:
         self.status_var.set(text)
 
+    def _start_device_watch(self) -> None:
+        # Only backends with change notifications (Windows) provide watch_devices()
+        watch = getattr(self.backend, "watch_devices", None)
+        if watch is None:
+            self.refresh_devices()
+            return
+        # Seeding the table enumerates all endpoints: time-boxed, off the Tk thread
+        self._refreshing = True
+        self.set_status("Geräte werden gelesen …")
+        self._call_async(self._on_watch_started, watch)
+
+    def _on_watch_started(self, res) -> None:
+        if not res.ok:
+            self._on_refreshed(res)
+            return
+        self._refreshing = False
+        table = res.value
+        if table.live:
+            table.subscribe(self._device_events.put)
+            self.device_table = table
+            self.after(250, self._poll_device_events)
+        self._show_snapshot(table.snapshot())
+
+    def _poll_device_events(self) -> None:
+        changed = False
+        while True:
+            try:
+                self._device_events.get_nowait()
+            except queue.Empty:
+                break
+            changed = True
+        # The VolumeController rebinds on DefaultDeviceChanged itself (watch_devices)
+        if changed and self.device_table is not None:
+            # Table is already up to date; no COM enumeration needed
+            self._show_snapshot(self.device_table.snapshot())
+        self.after(250, self._poll_device_events)
+
+    def _call_async(self, done, fn, *args, key=None) -> None:
+        """call_with_deadline() on a helper thread; done(result) runs on the Tk thread."""
+
+        def run():
+            # Tk is not thread-safe: hand the result over, _poll_call_results calls done()
+            self._call_results.put((done, call_with_deadline(fn, *args, key=key)))
+
+        threading.Thread(target=run, name="UiAudioCall", daemon=True).start()
+
+    def _poll_call_results(self) -> None:
+        # Rescheduled first, so a failing callback does not stop the loop
+        self.after(50, self._poll_call_results)
+        while True:
+            try:
+                done, res = self._call_results.get_nowait()
+            except queue.Empty:
+                break
+            done(res)
+
     def refresh_devices(self) -> None:
-        if win is None:
+        if self.backend is None:
             messagebox.showerror("Fehler", "Audio-Modul nicht verfügbar.")
             return
-        try:
-            self.playback_devices = win.list_playback_devices()
-            self.recording_devices = win.list_recording_devices()
-        except Exception as e:  # pragma: no cover
+        if self._refreshing:
+            return
+        # One enumeration pass for both lists and the default markers, time-boxed
+        # and off the Tk thread so a stalling driver cannot freeze the window.
+        # Forced: with a live device table the backend would otherwise serve the
+        # table instead of enumerating; the forced pass also reseeds that table.
+        def take_snapshot():
+            return self.backend.take_snapshot(force=True)
+
+        self._refreshing = True
+        self.set_status("Geräte werden gelesen …")
+        self._call_async(self._on_refreshed, take_snapshot)
+
+    def _on_refreshed(self, res) -> None:
+        self._refreshing = False
+        if res.timed_out:
+            self.set_status("Zeitüberschreitung beim Lesen der Geräte (Treiber hängt?). Bitte erneut versuchen.")
+            return
+        if not res.ok:  # pragma: no cover
             self.playback_devices = []
             self.recording_devices = []
-            self.set_status(f"Fehler beim Lesen der Geräte: {type(e).__name__}")
+            self.set_status(f"Fehler beim Lesen der Geräte: {type(res.error).__name__}")
             return
+        self._show_snapshot(res.value)
+
+    def _show_snapshot(self, snap) -> None:
+        self.playback_devices = list(snap.playback)
+        self.recording_devices = list(snap.recording)
 
         # Determine defaults for star marking
-        try:
-            pb_def_id = win.get_default_playback_id() if win else None
-            rec_def_id = win.get_default_recording_id() if win else None
-        except Exception:
-            pb_def_id = None
-            rec_def_id = None
+        pb_def_id = snap.default_playback_id
+        rec_def_id = snap.default_recording_id
 
         self.lb_playback.delete(0, tk.END)
         for d in self.playback_devices:
@@ -237,38 +328,49 @@ class App(tk.Tk):
         if not dev:
             self.set_status("Kein Wiedergabegerät ausgewählt.")
             return
-        ok = win.set_default_playback(dev.get("id") or dev.get("name", ""))
+        ident = dev.get("id") or dev.get("name", "")
+        self._call_async(partial(self._on_playback_set, dev), self.backend.set_default_playback, ident, key=ident)
+
+    def _on_playback_set(self, dev: dict, res) -> None:
+        if res.skipped:
+            self.set_status(f"Wiedergabe-Gerät reagiert wiederholt nicht, übersprungen: {dev.get('name')}")
+            return
+        if res.timed_out:
+            self.set_status(f"Zeitüberschreitung beim Setzen des Wiedergabe-Standards: {dev.get('name')}")
+            return
         self.set_status(
-            f"Wiedergabe-Standard gesetzt: {dev.get('name')}" if ok else "Fehler beim Setzen des Wiedergabe-Standards."
+            f"Wiedergabe-Standard gesetzt: {dev.get('name')}" if res.value else "Fehler beim Setzen des Wiedergabe-Standards."
         )
-        # Short delay to let the system apply before refreshing
+        # Short delay to let the system apply before refreshing (markers and labels)
         self.after(400, self._refresh_defaults_after_set)
-        try:
-            pb_def = win.get_default_playback_id()
-            self._select_by_id("playback", pb_def)
-            self._update_default_labels(pb_def, win.get_default_recording_id())
-        except Exception:
-            pass
 
     def set_default_recording(self) -> None:
         dev = self._selected_device("recording")
         if not dev:
             self.set_status("Kein Aufnahmegerät ausgewählt.")
             return
-        ok = win.set_default_recording(dev.get("id") or dev.get("name", ""))
+        ident = dev.get("id") or dev.get("name", "")
+        self._call_async(partial(self._on_recording_set, dev), self.backend.set_default_recording, ident, key=ident)
+
+    def _on_recording_set(self, dev: dict, res) -> None:
+        if res.skipped:
+            self.set_status(f"Aufnahme-Gerät reagiert wiederholt nicht, übersprungen: {dev.get('name')}")
+            return
+        if res.timed_out:
+            self.set_status(f"Zeitüberschreitung beim Setzen des Aufnahme-Standards: {dev.get('name')}")
+            return
         self.set_status(
-            f"Aufnahme-Standard gesetzt: {dev.get('name')}" if ok else "Fehler beim Setzen des Aufnahme-Standards."
+            f"Aufnahme-Standard gesetzt: {dev.get('name')}" if res.value else "Fehler beim Setzen des Aufnahme-Standards."
         )
         # Short delay to let the system apply before refreshing
         self.after(400, self._refresh_defaults_after_set)
 
     def _refresh_defaults_after_set(self) -> None:
+        if self.device_table is not None and self.device_table.live:
+            # OnDefaultDeviceChanged will update the lists
+            return
         try:
-            pb_def = win.get_default_playback_id() if win else None
-            rec_def = win.get_default_recording_id() if win else None
-            # Update labels
-            self._update_default_labels(pb_def, rec_def)
-            # Reselect defaults in lists and update star markers by reloading list labels
+            # Reselect defaults, update labels and star markers from a fresh snapshot
             self.refresh_devices()
         except Exception:
             pass
@@ -280,18 +382,22 @@ class App(tk.Tk):
         except Exception:
             return
         self.lbl_vol.configure(text=f"{val:d}")
-        # Apply on release only? For responsiveness, apply continuously is fine.
-        if win is not None:
-            win.set_master_volume(val)
+        if self.backend is None:
+            return
+        if hasattr(self.backend, "volume_controller"):
+            # Non-blocking: the controller coalesces motion events (latest value wins)
+            self.backend.volume_controller().submit_volume(val)
+        else:
+            self.backend.set_master_volume(val)
 
     def _on_mute_toggle(self) -> None:
-        if win is not None:
-            win.mute_master(bool(self.mute_var.get()))
+        if self.backend is not None:
+            self.backend.mute_master(bool(self.mute_var.get()))
         self.set_status("Mute geändert.")
 
     def test_tone(self) -> None:
-        if win is not None:
-            win.play_test_tone()
+        if self.backend is not None:
+            self.backend.play_test_tone()
         self.set_status("Testton abgespielt.")
 
     def copy_pb_id(self) -> None:
@@ -313,8 +419,15 @@ class App(tk.Tk):
         self.set_status("Aufnahme-ID kopiert.")
 
 
-def main() -> None:
-    app = App()
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="app.ui_tk")
+    parser.add_argument("--backend", default=None, help="Audio backend spec: windows (default), simulated[:options] or replay:<trace>; env SSB_BACKEND")
+    parser.add_argument("--record", default=None, metavar="TRACE", help="Record backend calls to a trace file; env SSB_RECORD")
+    args = parser.parse_args(argv)
+    from audio.metrics import persist_on_exit
+
+    persist_on_exit()
+    app = App(backend=get_backend(args.backend, record=args.record) if get_backend is not None else None)
     app.mainloop()
 
 
@@ -0,0 +1,196 @@
+"""asyncio facade over audio/windows.py with one dedicated COM apartment thread.
+
+All backend calls run on a single worker thread that is CoInitialized as STA, so
+the COM objects it creates through the backend's cache (see ComObjectCache) are
+its own. Volume and mute are the exception: the backend forwards them to its
+VolumeController, which keeps the endpoint handle on its own worker thread.
+Coroutines enqueue requests into a bounded queue (awaiting a free slot when it is
+full), and each call has a deadline and can be cancelled while it is still queued.
+Identical read requests that are in flight at the same time share one backend
+call, so several concurrent `await`s of e.g. `snapshot()` cost a single
+enumeration. `close()` fails every request that is still queued with
+RuntimeError; later calls fail the same way. An instance may be used from
+several event loops (e.g. successive `asyncio.run()` calls): the queue bound
+and the shared reads are kept per loop.
+
+The backend is any object exposing the function names of audio/windows.py
+(`take_snapshot`, `set_default_playback`, ...); by default that module itself.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+import weakref
+from typing import Any
+
+# Backend calls without side effects; concurrent identical calls are coalesced
+READ_METHODS = frozenset(
+    {
+        "take_snapshot",
+        "current_snapshot",
+        "get_default_playback_id",
+        "get_default_recording_id",
+        "resolve_device",
+    }
+)
+
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_MAX_QUEUE = 64
+
+_STOP = object()
+
+
+def _init_sta() -> None:
+    try:
+        import comtypes
+
+        comtypes.CoInitializeEx(comtypes.COINIT_APARTMENTTHREADED)
+    except Exception:
+        # No COM on this host (stub backends) or already initialised
+        pass
+
+
+class AsyncAudioControl:
+    """Awaitable audio operations executed on one STA worker thread."""
+
+    def __init__(self, backend: Any = None, max_queue: int = DEFAULT_MAX_QUEUE, timeout: float = DEFAULT_TIMEOUT) -> None:
+        if backend is None:
+            from audio import windows as backend  # type: ignore[no-redef]
+        self.backend = backend
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self._queue: queue.Queue = queue.Queue()
+        # asyncio primitives belong to the loop that first uses them: one per loop
+        self._slots: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+        self._slots_lock = threading.Lock()
+        self._inflight: dict[tuple[Any, ...], asyncio.Future] = {}
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="AudioSTA", daemon=True)
+        self._thread.start()
+        self.calls = 0
+        self.coalesced = 0
+
+    # -- public coroutines ------------------------------------------------
+    async def snapshot(self, timeout: float | None = None) -> Any:
+        return await self.call("take_snapshot", timeout=timeout)
+
+    async def default_playback_id(self, timeout: float | None = None) -> str | None:
+        return await self.call("get_default_playback_id", timeout=timeout)
+
+    async def default_recording_id(self, timeout: float | None = None) -> str | None:
+        return await self.call("get_default_recording_id", timeout=timeout)
+
+    async def resolve(self, identifier: str, flow: str | None = None, timeout: float | None = None) -> Any:
+        return await self.call("resolve_device", identifier, flow, timeout=timeout)
+
+    async def set_default_playback(self, identifier: str, timeout: float | None = None) -> bool:
+        return await self.call("set_default_playback", identifier, timeout=timeout)
+
+    async def set_default_recording(self, identifier: str, timeout: float | None = None) -> bool:
+        return await self.call("set_default_recording", identifier, timeout=timeout)
+
+    async def set_volume(self, percent: int, timeout: float | None = None) -> bool:
+        return await self.call("set_master_volume", percent, timeout=timeout)
+
+    async def mute(self, state: bool, timeout: float | None = None) -> bool:
+        return await self.call("mute_master", state, timeout=timeout)
+
+    async def call(self, method: str, *args: Any, timeout: float | None = None) -> Any:
+        """Run backend.<method>(*args) on the worker thread.
+
+        Raises asyncio.TimeoutError when the deadline passes (a queued request is
+        then dropped; a running one finishes but its result is discarded).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if method in READ_METHODS:
+            key = (asyncio.get_running_loop(), method, *args)
+            shared = self._inflight.get(key)
+            if shared is not None:
+                self.coalesced += 1
+            else:
+                shared = asyncio.ensure_future(self._submit_and_wait(method, args, timeout))
+                self._inflight[key] = shared
+                shared.add_done_callback(lambda _f, key=key: self._inflight.pop(key, None))
+            # shield: one waiter timing out must not cancel the shared call
+            return await asyncio.wait_for(asyncio.shield(shared), timeout)
+        return await asyncio.wait_for(self._submit_and_wait(method, args, timeout), timeout)
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the worker; requests still queued fail with RuntimeError.
+
+        A call that is already running finishes and delivers its result.
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                method, _args, cfut, _deadline = item
+                # False if the caller cancelled while the request was queued
+                if cfut.set_running_or_notify_cancel():
+                    cfut.set_exception(RuntimeError(f"{method}: AsyncAudioControl closed"))
+            self._queue.put(_STOP)
+        if wait:
+            self._thread.join(timeout=self.timeout)
+
+    async def __aenter__(self) -> "AsyncAudioControl":
+        return self
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        self.close(wait=False)
+
+    # -- internals --------------------------------------------------------
+    async def _submit_and_wait(self, method: str, args: tuple[Any, ...], timeout: float) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._slots_lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = self._slots[loop] = asyncio.Semaphore(self.max_queue)
+        # Bounded queue: wait for a free slot instead of growing without limit
+        await slots.acquire()
+        cfut: concurrent.futures.Future = concurrent.futures.Future()
+        cfut.add_done_callback(lambda _f: self._release(loop, slots))
+        with self._close_lock:
+            # Checked under the lock so nothing is queued behind _STOP
+            if self._closed:
+                cfut.set_exception(RuntimeError(f"{method}: AsyncAudioControl closed"))
+            else:
+                self._queue.put((method, args, cfut, time.monotonic() + timeout))
+        self.calls += 1
+        # Cancelling this coroutine cancels cfut, which the worker then skips
+        return await asyncio.wrap_future(cfut)
+
+    @staticmethod
+    def _release(loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore) -> None:
+        try:
+            loop.call_soon_threadsafe(slots.release)
+        except RuntimeError:
+            # The call outlived its loop (timed out, then asyncio.run() returned): nothing to free
+            pass
+
+    def _run(self) -> None:
+        _init_sta()
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            method, args, cfut, deadline = item
+            # False if the caller cancelled while the request was queued
+            if not cfut.set_running_or_notify_cancel():
+                continue
+            if time.monotonic() > deadline:
+                cfut.set_exception(asyncio.TimeoutError(f"{method}: deadline passed in queue"))
+                continue
+            try:
+                cfut.set_result(getattr(self.backend, method)(*args))
+            except BaseException as e:  # noqa: BLE001 - forwarded to the awaiting coroutine
+                cfut.set_exception(e)
@@ -0,0 +1,97 @@
+"""Audio backend protocol and selector.
+
+`AudioBackend` is the set of operations the CLI and the Tk app need: enumerate
+(one DeviceSnapshot), read/set the default endpoints, master volume, mute and a
+test tone. `WindowsBackend` (audio/windows.py) implements it with CoreAudio;
+`SimulatedBackend` (audio/simulated.py) is an in-memory topology with configurable
+latencies and failure injection for benchmarks on hosts without Windows.
+
+A backend is selected by a spec string, "<name>[:<options>]", e.g. "windows",
+"simulated:playback=8,recording=4,latency.set_default=20..40,seed=1" or
+"replay:trace.jsonl.gz" (audio/trace.py); without one, the SSB_BACKEND environment
+variable and then "windows" are used. With a record path (or SSB_RECORD) every
+call of the selected backend is written to a trace file.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Protocol, runtime_checkable
+
+# Environment variable holding the default backend spec
+BACKEND_ENV = "SSB_BACKEND"
+# Environment variable holding a trace path to record backend calls into
+RECORD_ENV = "SSB_RECORD"
+BACKENDS = ("windows", "simulated", "replay")
+DEFAULT_BACKEND = "windows"
+
+
+@runtime_checkable
+class AudioBackend(Protocol):
+    """Operations every audio backend provides.
+
+    Failures are reported the way audio/windows.py does: setters return False,
+    `take_snapshot()` returns an empty snapshot, default-id getters return None.
+    """
+
+    name: str
+
+    def take_snapshot(self, force: bool = False) -> Any:
+        """Playback/recording endpoints and per-role defaults (audio.windows.DeviceSnapshot).
+
+        Backends that keep a live device table may serve it; `force` re-enumerates.
+        """
+        ...
+
+    def resolve_device(self, identifier: str, flow: str | None = None) -> Any:
+        """Ranked candidates for a name or id (audio.resolver.Resolution)."""
+        ...
+
+    def get_default_playback_id(self) -> str | None: ...
+
+    def get_default_recording_id(self) -> str | None: ...
+
+    def set_default_playback(self, device_identifier: str) -> bool: ...
+
+    def set_default_recording(self, device_identifier: str) -> bool: ...
+
+    def set_master_volume(self, percent: int) -> bool: ...
+
+    def mute_master(self, mute: bool) -> bool: ...
+
+    def play_test_tone(self, frequency: int = 880, duration_ms: int = 300) -> None: ...
+
+
+def backend_spec(spec: str | None = None) -> str:
+    """The effective spec: `spec`, else $SSB_BACKEND, else "windows"."""
+    return (spec or os.environ.get(BACKEND_ENV) or DEFAULT_BACKEND).strip()
+
+
+def get_backend(spec: str | None = None, record: str | None = None) -> AudioBackend:
+    """Instantiate the backend named by `spec` (see module docstring).
+
+    `record` (default: $SSB_RECORD) wraps it in a trace-writing RecordingBackend.
+    """
+    name, _, options = backend_spec(spec).partition(":")
+    name = name.strip().lower()
+    backend: AudioBackend
+    if name == "windows":
+        from audio.windows import WindowsBackend
+
+        backend = WindowsBackend()
+    elif name == "simulated":
+        from audio.simulated import SimulatedBackend
+
+        backend = SimulatedBackend.from_spec(options)
+    elif name == "replay":
+        from audio.trace import ReplayBackend
+
+        backend = ReplayBackend.from_spec(options)
+    else:
+        raise ValueError(f"unknown audio backend {name!r} (expected one of: {', '.join(BACKENDS)})")
+    record = record or os.environ.get(RECORD_ENV)
+    if record:
+        from audio.trace import RecordingBackend
+
+        backend = RecordingBackend(backend, record)
+    return backend
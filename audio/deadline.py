@@ -0,0 +1,253 @@
+"""Per-call deadlines and per-device circuit breaking for blocking audio calls.
+
+Flaky endpoints (Bluetooth headsets, sleeping USB interfaces) can block COM calls
+such as GetAllDevices/SetDefaultEndpoint for seconds. `call_with_deadline()` runs
+a callable on a worker thread and returns a CallResult instead of blocking the
+caller past its deadline. A worker that overruns is abandoned and replaced, so a
+stuck driver call never delays later calls; the worker thread is reused otherwise,
+which keeps its per-thread COM objects (ComObjectCache) warm.
+
+`CircuitBreaker` counts stalls per key (endpoint id). After `threshold` stalls in a
+row the key is "open" and skipped until `cooldown` seconds have passed; then one
+trial call is let through ("half-open") and its outcome closes or re-opens it.
+When a call times out, only the keys its own worker thread is still tracking
+count as stalls; calls on other threads are unaffected.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from audio.metrics import incr
+
+# Defaults (seconds)
+DEFAULT_TIMEOUT = 3.0
+STALL_THRESHOLD = 0.5
+BREAKER_THRESHOLD = 2
+BREAKER_COOLDOWN = 30.0
+
+
+@dataclass(frozen=True)
+class CallResult:
+    """Outcome of a deadline-bounded call."""
+
+    ok: bool
+    value: Any = None
+    timed_out: bool = False
+    skipped: bool = False
+    error: BaseException | None = None
+    elapsed: float = 0.0
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+class CircuitBreaker:
+    """Per-key stall counter with open/half-open/closed states."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN, stall_after: float = STALL_THRESHOLD, clock: Any = time.monotonic) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.stall_after = stall_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures: dict[str, int] = {}
+        self._opened_at: dict[str, float] = {}
+        self._trial: set[str] = set()
+        self._inflight: dict[tuple[str, int], float] = {}  # (key, thread ident) -> start
+
+    def state(self, key: str) -> str:
+        with self._lock:
+            opened = self._opened_at.get(key)
+            if opened is None:
+                return "closed"
+            return "half-open" if self._clock() - opened >= self.cooldown else "open"
+
+    def allow(self, key: str) -> bool:
+        """True if a call for `key` may run now (one trial call when half-open)."""
+        with self._lock:
+            opened = self._opened_at.get(key)
+            if opened is None:
+                return True
+            if self._clock() - opened < self.cooldown or key in self._trial:
+                return False
+            self._trial.add(key)
+            return True
+
+    def record_success(self, key: str) -> None:
+        with self._lock:
+            self._failures.pop(key, None)
+            self._opened_at.pop(key, None)
+            self._trial.discard(key)
+
+    def record_failure(self, key: str) -> None:
+        with self._lock:
+            count = self._failures.get(key, 0) + 1
+            self._failures[key] = count
+            self._trial.discard(key)
+            if count >= self.threshold or key in self._opened_at:
+                self._opened_at[key] = self._clock()
+
+    @contextmanager
+    def track(self, key: str) -> Iterator[None]:
+        """Time a call for `key`; slower than `stall_after` counts as a stall.
+
+        Nested track() calls for the same key on one thread leave the recording to
+        the outermost one; a call abandoned via fail_inflight() records nothing more.
+        """
+        start = self._clock()
+        slot = (key, threading.get_ident())
+        with self._lock:
+            nested = slot in self._inflight
+            if not nested:
+                self._inflight[slot] = start
+        if nested:
+            yield
+            return
+        try:
+            yield
+        finally:
+            with self._lock:
+                abandoned = self._inflight.pop(slot, None) is None
+            # An abandoned call was already counted by fail_inflight()
+            if not abandoned:
+                if self._clock() - start > self.stall_after:
+                    self.record_failure(key)
+                else:
+                    self.record_success(key)
+
+    def fail_inflight(self, thread: int) -> list[str]:
+        """Record one stall for every key `thread` is still inside `track()` for (its call was abandoned).
+
+        The slots are removed, so the abandoned track() does not record again when
+        the stuck call eventually returns.
+        """
+        with self._lock:
+            slots = [slot for slot in self._inflight if slot[1] == thread]
+            for slot in slots:
+                del self._inflight[slot]
+        keys = [key for key, _thread in slots]
+        for key in keys:
+            self.record_failure(key)
+        return keys
+
+    def open_keys(self) -> list[str]:
+        with self._lock:
+            return sorted(self._opened_at)
+
+
+class _Worker(threading.Thread):
+    def __init__(self, name: str) -> None:
+        super().__init__(name=name, daemon=True)
+        self.jobs: queue.Queue = queue.Queue()
+        self.abandoned = False
+
+    def run(self) -> None:
+        try:
+            import comtypes
+
+            comtypes.CoInitialize()
+        except Exception:
+            pass
+        while not self.abandoned:
+            fn, args, fut = self.jobs.get()
+            if fn is None or not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(fn(*args))
+            except BaseException as e:  # noqa: BLE001 - forwarded to the caller
+                fut.set_exception(e)
+
+
+class DeadlineExecutor:
+    """Runs callables on a reusable worker; replaces the worker when a call overruns."""
+
+    def __init__(self, name: str = "AudioDeadline") -> None:
+        self._name = name
+        self._lock = threading.Lock()
+        self._worker: _Worker | None = None
+        self.abandoned_workers = 0
+
+    def _current(self) -> _Worker:
+        with self._lock:
+            if self._worker is None:
+                self._worker = _Worker(self._name)
+                self._worker.start()
+            return self._worker
+
+    def _abandon(self, worker: _Worker) -> None:
+        with self._lock:
+            if self._worker is not worker:
+                return
+            worker.abandoned = True
+            self._worker = None
+            self.abandoned_workers += 1
+            replacement = _Worker(self._name)
+            # Hand queued (not yet started) jobs to the replacement
+            while True:
+                try:
+                    replacement.jobs.put(worker.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            worker.jobs.put((None, (), None))
+            self._worker = replacement
+            replacement.start()
+
+    def run(self, fn: Any, *args: Any, timeout: float = DEFAULT_TIMEOUT, on_abandon: Any = None) -> CallResult:
+        """Run fn(*args) on the worker; on_abandon(thread ident) is called if it overruns."""
+        worker = self._current()
+        fut: concurrent.futures.Future = concurrent.futures.Future()
+        start = time.monotonic()
+        worker.jobs.put((fn, args, fut))
+        try:
+            value = fut.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            if not fut.cancel():
+                self._abandon(worker)
+                if on_abandon is not None:
+                    on_abandon(worker.ident)
+            return CallResult(False, timed_out=True, elapsed=time.monotonic() - start)
+        except Exception as e:
+            return CallResult(False, error=e, elapsed=time.monotonic() - start)
+        return CallResult(True, value, elapsed=time.monotonic() - start)
+
+
+_executor = DeadlineExecutor()
+_device_breaker = CircuitBreaker()
+
+
+def device_breaker() -> CircuitBreaker:
+    """Process-wide breaker keyed by endpoint id."""
+    return _device_breaker
+
+
+def _tracked(breaker: CircuitBreaker, key: str, fn: Any, *args: Any) -> Any:
+    with breaker.track(key):
+        return fn(*args)
+
+
+def call_with_deadline(fn: Any, *args: Any, timeout: float = DEFAULT_TIMEOUT, key: str | None = None, breaker: CircuitBreaker | None = None) -> CallResult:
+    """Run fn(*args) with a time limit; with `key`, consult/update the breaker.
+
+    With `key`, the call is tracked for it on the worker, so `fn` tracking the same
+    key again does not count twice. On timeout, the keys this call's worker is still
+    tracking in the breaker (e.g. the endpoint an enumeration was reading when it
+    stalled) are recorded as stalls, once each.
+    """
+    breaker = breaker or _device_breaker
+    name = getattr(fn, "__name__", "call")
+    if key is not None and not breaker.allow(key):
+        incr("breaker_skip", name)
+        return CallResult(False, skipped=True)
+    if key is not None:
+        fn, args = _tracked, (breaker, key, fn, *args)
+    res = _executor.run(fn, *args, timeout=timeout, on_abandon=breaker.fail_inflight)
+    if res.timed_out:
+        incr("timeout", name)
+    return res
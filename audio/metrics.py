@@ -0,0 +1,322 @@
+"""Always-on, low-overhead latency histograms and event counters.
+
+Backend operations ("enumerate", "resolve", "get_default", "set_default",
+"volume", "mute", "tone", "svv_spawn") are timed with `timed(op)` or
+`observe(op, ns)` into fixed-bucket histograms; `incr(event, label)` counts
+HRESULTs, timeouts, breaker skips and fallbacks. The hot path is a
+perf_counter_ns() pair and a deque append, which is thread-safe without a lock.
+Samples of `timed()` calls are folded into the buckets under a lock before any
+read (a buffered sample costs about 40 bytes until then); observe() and incr()
+fold in batches of FOLD_EVERY as well. Nothing is exported or formatted until a snapshot is requested
+(`app.cli stats`, `/doctor`), so there are no exporter hooks on the hot path.
+
+Persisting is opt-in: with SSB_METRICS=1 set, CLI and UI processes merge their
+counters into METRICS_PATH on exit (`persist_on_exit()`), so `app.cli stats`
+shows the accumulated numbers of earlier runs. Without it, nothing is read or
+written at exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+METRICS_PATH = PROJECT_ROOT / "config" / "metrics.json"
+# Set to 1 to accumulate the metrics of CLI/UI runs in METRICS_PATH
+METRICS_ENV = "SSB_METRICS"
+
+# Histogram upper bounds in nanoseconds (10 µs .. 10 s); one overflow bucket follows
+BUCKET_BOUNDS_NS = (
+    10_000,
+    25_000,
+    50_000,
+    100_000,
+    250_000,
+    500_000,
+    1_000_000,
+    2_500_000,
+    5_000_000,
+    10_000_000,
+    25_000_000,
+    50_000_000,
+    100_000_000,
+    250_000_000,
+    500_000_000,
+    1_000_000_000,
+    2_500_000_000,
+    5_000_000_000,
+    10_000_000_000,
+)
+
+# observe()/incr() samples buffered before they are folded into the histograms/counters
+FOLD_EVERY = 256
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Histogram:
+    """Bucketed latencies. observe_ns() only appends to `pending` (a deque append
+    is atomic); samples are folded into the buckets under `lock` every FOLD_EVERY
+    observe_ns() samples and before every read. timed() wrappers append to
+    `pending` directly and leave the folding to those."""
+
+    __slots__ = ("counts", "count", "sum_ns", "lock", "pending")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.sum_ns = 0
+        self.lock = threading.Lock()
+        self.pending: deque[int] = deque()
+
+    def observe_ns(self, ns: int) -> None:
+        self.pending.append(ns)
+        if len(self.pending) >= FOLD_EVERY:
+            self.fold()
+
+    def fold(self) -> None:
+        counts, popleft = self.counts, self.pending.popleft
+        with self.lock:
+            # Samples appended meanwhile are left for the next fold
+            n = len(self.pending)
+            total = 0
+            for _ in range(n):
+                ns = popleft()
+                counts[bisect_right(BUCKET_BOUNDS_NS, ns)] += 1
+                total += ns
+            self.count += n
+            self.sum_ns += total
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bucket bound (seconds) below which a fraction `q` of samples fall."""
+        self.fold()
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return (BUCKET_BOUNDS_NS[i] if i < len(BUCKET_BOUNDS_NS) else float("inf")) / 1e9
+        return None
+
+    def as_dict(self) -> dict[str, Any]:
+        self.fold()
+        return {"count": self.count, "sum_ns": self.sum_ns, "counts": list(self.counts)}
+
+    def merge(self, data: dict[str, Any]) -> None:
+        counts = data.get("counts") or []
+        if len(counts) != len(self.counts):
+            return
+        with self.lock:
+            for i, n in enumerate(counts):
+                self.counts[i] += int(n)
+            self.count += int(data.get("count", 0))
+            self.sum_ns += int(data.get("sum_ns", 0))
+
+
+class Metrics:
+    """Histograms per operation and counters per (event, label)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.histograms: dict[str, Histogram] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+        # (event, label, n) not yet added to _counters; folded like Histogram.pending
+        self._events: deque[tuple[str, str, int]] = deque()
+        self.started = time.time()
+
+    def histogram(self, op: str) -> Histogram:
+        hist = self.histograms.get(op)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(op, Histogram())
+        return hist
+
+    def observe(self, op: str, ns: int) -> None:
+        self.histogram(op).observe_ns(ns)
+
+    def incr(self, event: str, label: str = "", n: int = 1) -> None:
+        self._events.append((event, label, n))
+        if len(self._events) >= FOLD_EVERY:
+            self._fold_events()
+
+    def _fold_events(self) -> None:
+        popleft = self._events.popleft
+        with self._lock:
+            for _ in range(len(self._events)):
+                event, label, n = popleft()
+                counter = self._counters.setdefault(event, {})
+                counter[label] = counter.get(label, 0) + n
+
+    @property
+    def counters(self) -> dict[str, dict[str, int]]:
+        self._fold_events()
+        return self._counters
+
+    def _fold(self) -> None:
+        for hist in list(self.histograms.values()):
+            hist.fold()
+        self._fold_events()
+
+    def timed(self, op: str) -> Callable[[F], F]:
+        """Decorator recording the wall time of every call into histogram `op`."""
+        hist = self.histogram(op)
+
+        def decorate(fn: F) -> F:
+            # Locals instead of attribute/global lookups; no fold check per call:
+            # the samples are folded on the next read (or observe() batch)
+            append = hist.pending.append
+            clock = time.perf_counter_ns
+
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                t0 = clock()
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException:
+                    append(clock() - t0)
+                    raise
+                append(clock() - t0)
+                return result
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    @property
+    def empty(self) -> bool:
+        self._fold()
+        return not any(h.count for h in self.histograms.values()) and not self._counters
+
+    def reset(self) -> None:
+        self._fold()
+        with self._lock:
+            for hist in self.histograms.values():
+                with hist.lock:
+                    # In place: timed() wrappers hold references to the histograms
+                    hist.counts[:] = [0] * len(hist.counts)
+                    hist.count = 0
+                    hist.sum_ns = 0
+            self._counters.clear()
+            self.started = time.time()
+
+    # -- export -----------------------------------------------------------
+    def to_dict(self) -> dict[str, Any]:
+        self._fold()
+        return {
+            "version": 1,
+            "since": self.started,
+            "bucket_bounds_ns": list(BUCKET_BOUNDS_NS),
+            "histograms": {op: h.as_dict() for op, h in sorted(self.histograms.items()) if h.count},
+            "counters": {event: dict(sorted(labels.items())) for event, labels in sorted(self.counters.items())},
+        }
+
+    def merge(self, data: dict[str, Any]) -> None:
+        if list(data.get("bucket_bounds_ns") or []) != list(BUCKET_BOUNDS_NS):
+            return
+        for op, hist in (data.get("histograms") or {}).items():
+            self.histogram(op).merge(hist)
+        for event, labels in (data.get("counters") or {}).items():
+            for label, n in labels.items():
+                self.incr(event, label, int(n))
+        self.started = min(self.started, float(data.get("since", self.started)))
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Per-operation count, mean and bucket-based p50/p99 in milliseconds."""
+        self._fold()
+        out: dict[str, dict[str, Any]] = {}
+        for op, h in sorted(self.histograms.items()):
+            if not h.count:
+                continue
+            p50, p99 = h.quantile(0.5), h.quantile(0.99)
+            out[op] = {
+                "count": h.count,
+                "mean_ms": round(h.sum_ns / h.count / 1e6, 3),
+                "p50_le_ms": None if p50 is None else round(p50 * 1e3, 3),
+                "p99_le_ms": None if p99 is None else round(p99 * 1e3, 3),
+            }
+        return out
+
+    def to_prometheus(self, prefix: str = "ssb") -> str:
+        self._fold()
+        lines = [
+            f"# HELP {prefix}_operation_seconds Latency of audio backend operations.",
+            f"# TYPE {prefix}_operation_seconds histogram",
+        ]
+        for op, h in sorted(self.histograms.items()):
+            if not h.count:
+                continue
+            cumulative = 0
+            for i, n in enumerate(h.counts):
+                cumulative += n
+                le = f"{BUCKET_BOUNDS_NS[i] / 1e9:g}" if i < len(BUCKET_BOUNDS_NS) else "+Inf"
+                lines.append(f'{prefix}_operation_seconds_bucket{{op="{op}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_operation_seconds_sum{{op="{op}"}} {h.sum_ns / 1e9:.9f}')
+            lines.append(f'{prefix}_operation_seconds_count{{op="{op}"}} {h.count}')
+        lines.append(f"# HELP {prefix}_events_total HRESULTs, timeouts, breaker skips and fallbacks.")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for event, labels in sorted(self.counters.items()):
+            for label, n in sorted(labels.items()):
+                lines.append(f'{prefix}_events_total{{event="{event}",label="{label}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+timed = metrics.timed
+observe = metrics.observe
+incr = metrics.incr
+
+
+def load_persisted(path: Path = METRICS_PATH) -> Metrics:
+    """Metrics accumulated by earlier processes (empty if none were saved)."""
+    loaded = Metrics()
+    try:
+        loaded.merge(json.loads(path.read_text(encoding="utf-8")))
+    except Exception:
+        pass
+    return loaded
+
+
+def _save(path: Path) -> None:
+    if metrics.empty:
+        return
+    total = load_persisted(path)
+    total.merge(metrics.to_dict())
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(total.to_dict()), encoding="utf-8")
+        tmp.replace(path)
+    except Exception:
+        pass
+
+
+_persist_registered = False
+
+
+def persistence_enabled() -> bool:
+    return os.environ.get(METRICS_ENV, "").strip() not in ("", "0")
+
+
+def persist_on_exit(path: Path = METRICS_PATH) -> bool:
+    """Merge this process's metrics into `path` at interpreter exit if SSB_METRICS is set.
+
+    Returns whether persisting is enabled.
+    """
+    global _persist_registered
+    if not persistence_enabled():
+        return False
+    if not _persist_registered:
+        _persist_registered = True
+        atexit.register(_save, path)
+    return True
@@ -0,0 +1,233 @@
+"""Device-name resolver index (built once per DeviceSnapshot).
+
+Resolves a user-supplied identifier (endpoint id or name) to ranked candidates:
+exact id, casefolded exact name, name prefix, token match, substring and a bounded
+fuzzy score. `Resolution.confidence` drops when the best candidate has a close
+runner-up, so callers can tell "Mic" (ambiguous) from "Mic 2" (unique).
+"""
+
+from __future__ import annotations
+
+import bisect
+import difflib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+# Base scores per match kind (1.0 = certain)
+SCORE_ID = 1.0
+SCORE_NAME = 0.95
+SCORE_PREFIX = 0.8
+SCORE_TOKEN = 0.65
+SCORE_SUBSTRING = 0.55
+SCORE_FUZZY = 0.6
+
+# Candidates below this score are not used for resolution
+MIN_SCORE = 0.5
+# Fuzzy matching: minimum similarity ratio and maximum names scored per query
+FUZZY_CUTOFF = 0.6
+FUZZY_MAX_SCAN = 2000
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def _char_mask(token: str) -> int:
+    """Bit set of the distinct characters of `token` (for the fuzzy pre-check)."""
+    mask = 0
+    for ch in token:
+        mask |= 1 << ord(ch)
+    return mask
+
+
+@dataclass(frozen=True)
+class Match:
+    device: dict[str, Any]
+    score: float
+    kind: str
+
+    @property
+    def device_id(self) -> str:
+        return self.device["id"]
+
+
+@dataclass(frozen=True)
+class Resolution:
+    query: str
+    candidates: list[Match] = field(default_factory=list)
+
+    @property
+    def best(self) -> Match | None:
+        return self.candidates[0] if self.candidates else None
+
+    @property
+    def device_id(self) -> str | None:
+        best = self.best
+        return best.device_id if best is not None and best.score >= MIN_SCORE else None
+
+    @property
+    def confidence(self) -> float:
+        """Best score, reduced by half the runner-up's score (0 = no match)."""
+        if not self.candidates:
+            return 0.0
+        best = self.candidates[0].score
+        runner_up = self.candidates[1].score if len(self.candidates) > 1 else 0.0
+        return max(0.0, min(1.0, best - 0.5 * runner_up))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "query": self.query,
+            "device_id": self.device_id,
+            "confidence": round(self.confidence, 3),
+            "candidates": [{"id": m.device_id, "name": m.device.get("name"), "score": round(m.score, 3), "kind": m.kind} for m in self.candidates],
+        }
+
+
+class DeviceIndex:
+    """Lookup structures over a fixed list of {"id", "name", "flow"} entries."""
+
+    def __init__(self, devices: Iterable[dict[str, Any]]) -> None:
+        self.devices: list[dict[str, Any]] = list(devices)
+        self._by_id: dict[str, int] = {}
+        self._by_name: dict[str, list[int]] = {}
+        self._by_token: dict[str, set[int]] = {}
+        self._names: list[str] = []
+        for i, dev in enumerate(self.devices):
+            name = (dev.get("name") or "").casefold()
+            self._names.append(name)
+            self._by_id[dev["id"]] = i
+            self._by_id.setdefault(dev["id"].casefold(), i)
+            self._by_name.setdefault(name, []).append(i)
+            for tok in _tokens(name):
+                self._by_token.setdefault(tok, set()).add(i)
+        # (name, index) sorted for prefix range scans
+        self._sorted = sorted((n, i) for i, n in enumerate(self._names))
+        self._sorted_names = [n for n, _ in self._sorted]
+        self._rank = [0] * len(self._names)  # index -> position in name order
+        for pos, (_name, i) in enumerate(self._sorted):
+            self._rank[i] = pos
+        # Token vocabulary: sorted for token-prefix scans, by length for fuzzy matching
+        self._vocab = sorted(self._by_token)
+        # (length, token, char mask, repeated chars) of non-numeric tokens, by length
+        self._fuzzy_vocab = sorted((len(tok), tok, _char_mask(tok), len(tok) - len(set(tok))) for tok in self._vocab if not tok.isdigit())
+        self._fuzzy_lengths = [entry[0] for entry in self._fuzzy_vocab]
+        # All names in one string: a query found nowhere skips the per-name substring scan
+        self._all_names = "\n".join(self._names)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Any) -> "DeviceIndex":
+        entries = [dict(d, flow="playback") for d in snapshot.playback]
+        entries += [dict(d, flow="recording") for d in snapshot.recording]
+        return cls(entries)
+
+    def resolve(self, query: str, flow: str | None = None, limit: int = 5) -> Resolution:
+        """Rank candidates for `query`; `flow` ("playback"/"recording") filters them."""
+        scored: dict[int, tuple[float, str]] = {}
+
+        def add(i: int, score: float, kind: str) -> None:
+            if flow is not None and self.devices[i].get("flow") != flow:
+                return
+            if i not in scored or scored[i][0] < score:
+                scored[i] = (score, kind)
+
+        i = self._by_id.get(query, self._by_id.get(query.casefold()))
+        if i is not None and (flow is None or self.devices[i].get("flow") == flow):
+            # Endpoint ids are unique; nothing can outrank an exact id
+            return Resolution(query, [Match(self.devices[i], SCORE_ID, "id")])
+        q = query.casefold().strip()
+        if q:
+            for i in self._by_name.get(q, ()):
+                add(i, SCORE_NAME, "name")
+            # Prefix: contiguous range in the sorted name list
+            pos = bisect.bisect_left(self._sorted_names, q)
+            while pos < len(self._sorted) and self._sorted_names[pos].startswith(q):
+                name, i = self._sorted[pos]
+                # Prefer prefixes that end on a word boundary ("Mic" -> "Mic 2" over "Microphone")
+                boundary = len(name) == len(q) or not name[len(q)].isalnum()
+                add(i, SCORE_PREFIX + 0.1 * len(q) / max(1, len(name)) + (0.05 if boundary else 0.0), "prefix")
+                pos += 1
+            # Tokens: every query token must be a device token or a token prefix
+            q_tokens = _tokens(q)
+            if q_tokens:
+                hits: set[int] | None = None
+                for tok in q_tokens:
+                    ids = set(self._by_token.get(tok, ()))
+                    if not ids:
+                        pos = bisect.bisect_left(self._vocab, tok)
+                        while pos < len(self._vocab) and self._vocab[pos].startswith(tok):
+                            ids |= self._by_token[self._vocab[pos]]
+                            pos += 1
+                    hits = ids if hits is None else hits & ids
+                    if not hits:
+                        break
+                for i in hits or ():
+                    n_tokens = max(1, len(_tokens(self._names[i])))
+                    add(i, SCORE_TOKEN + 0.1 * len(q_tokens) / n_tokens, "token")
+            if not scored and q in self._all_names:
+                for i, name in enumerate(self._names):
+                    if q in name:
+                        add(i, SCORE_SUBSTRING + 0.05 * len(q) / max(1, len(name)), "substring")
+            if not scored:
+                return Resolution(query, self._fuzzy(q, flow, limit))
+        ranked = sorted(scored.items(), key=lambda kv: (-kv[1][0], self._names[kv[0]]))[:limit]
+        return Resolution(query, [Match(self.devices[i], score, kind) for i, (score, kind) in ranked])
+
+    def _fuzzy(self, q: str, flow: str | None, limit: int) -> list[Match]:
+        """Rank devices by how well each query token matches a vocabulary token.
+
+        Only vocabulary tokens whose length allows a ratio >= FUZZY_CUTOFF are
+        compared, and at most FUZZY_MAX_SCAN comparisons are made per query. Before
+        difflib runs, the shared characters bound the number of matching characters
+        (each shared character matches at most as often as it occurs in either
+        token); tokens that cannot reach the cutoff that way are skipped.
+        """
+        q_tokens = [t for t in _tokens(q) if not t.isdigit()]
+        if not q_tokens:
+            return []
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        budget = FUZZY_MAX_SCAN
+        per_device: dict[int, float] = {}
+        best_sum = 0.0
+        for n, tok in enumerate(q_tokens):
+            # Token-overlap bound: even perfect matches for the remaining tokens
+            # cannot lift any device's average to the cutoff
+            if best_sum + len(q_tokens) - n < FUZZY_CUTOFF * len(q_tokens):
+                return []
+            matcher.set_seq2(tok)
+            q_mask = _char_mask(tok)
+            q_repeats = len(tok) - len(set(tok))
+            lo = int(len(tok) * FUZZY_CUTOFF / (2 - FUZZY_CUTOFF))
+            hi = int(len(tok) * (2 - FUZZY_CUTOFF) / FUZZY_CUTOFF) + 1
+            start = bisect.bisect_left(self._fuzzy_lengths, max(1, lo))
+            stop = bisect.bisect_right(self._fuzzy_lengths, hi)
+            matched: list[tuple[float, str]] = []
+            for length, known, k_mask, k_repeats in self._fuzzy_vocab[start : min(stop, start + budget)]:
+                # Length bound: matching characters <= shared ones (+ repeats)
+                if 2 * ((q_mask & k_mask).bit_count() + min(q_repeats, k_repeats)) < FUZZY_CUTOFF * (len(tok) + length):
+                    continue
+                matcher.set_seq1(known)
+                # Cheap upper bound first, as in difflib.get_close_matches
+                if matcher.quick_ratio() < FUZZY_CUTOFF:
+                    continue
+                ratio = matcher.ratio()
+                if ratio >= FUZZY_CUTOFF:
+                    matched.append((ratio, known))
+            budget -= max(0, min(stop - start, budget))
+            # Best ratio per device: higher ratios are written last
+            best_for_device: dict[int, float] = {}
+            for ratio, known in sorted(matched):
+                best_for_device.update(dict.fromkeys(self._by_token[known], ratio))
+            if len(q_tokens) == 1:
+                per_device = best_for_device
+                break
+            for i, ratio in best_for_device.items():
+                per_device[i] = per_device.get(i, 0.0) + ratio / len(q_tokens)
+            best_sum = max(per_device.values(), default=0.0) * len(q_tokens)
+        found = {i: r for i, r in per_device.items() if r >= FUZZY_CUTOFF and (flow is None or self.devices[i].get("flow") == flow)}
+        # Best ratio first, ties in name order (both sorts are stable)
+        ranked = sorted(found, key=self._rank.__getitem__)
+        ranked.sort(key=found.__getitem__, reverse=True)
+        return [Match(self.devices[i], SCORE_FUZZY * found[i], "fuzzy") for i in ranked[:limit]]
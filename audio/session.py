@@ -0,0 +1,115 @@
+"""Backend wrapper that shares one device snapshot across many commands.
+
+`SessionBackend` serves `take_snapshot`, `resolve_device` and the default-id
+getters from a single cached DeviceSnapshot and resolves names for the setters
+against it, so a batch or an interactive session enumerates once instead of per
+command. The setters hand the resolved endpoint id to the wrapped backend, which
+uses an id as is instead of resolving it against a snapshot of its own.
+Successful set-default calls update the cached defaults in place of a
+re-enumeration; `refresh()` re-enumerates (bypassing a live device table),
+`invalidate()` makes the next read do so. Everything else is passed through to
+the wrapped backend.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import threading
+import time
+from typing import Any
+
+from audio.windows import E_COMMUNICATIONS, E_CONSOLE, E_MULTIMEDIA, DeviceSnapshot
+
+
+class SessionBackend:
+    """AudioBackend wrapper caching the snapshot of `inner` (see module docstring)."""
+
+    def __init__(self, inner: Any) -> None:
+        self.inner = inner
+        self.name = inner.name
+        self._lock = threading.Lock()
+        self._snapshot: DeviceSnapshot | None = None
+        self.refreshes = 0
+
+    def __getattr__(self, attr: str) -> Any:
+        # Backend-specific extras (enumerate_endpoints, watch_devices, last_hresult, ...)
+        return getattr(self.inner, attr)
+
+    # -- cache ------------------------------------------------------------
+    def refresh(self) -> DeviceSnapshot:
+        # Forced: a backend serving a live device table must enumerate again
+        snap = self.inner.take_snapshot(force=True)
+        with self._lock:
+            self._snapshot = snap
+            self.refreshes += 1
+        return snap
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    @property
+    def cached(self) -> DeviceSnapshot | None:
+        return self._snapshot
+
+    def _note_default(self, flow: str, device_id: str, roles: tuple[int, ...] = (E_CONSOLE, E_MULTIMEDIA, E_COMMUNICATIONS)) -> None:
+        with self._lock:
+            snap = self._snapshot
+            if snap is None:
+                return
+            defaults = dict(snap.defaults)
+            # Successful set-default calls switch all three roles, set_default_role one
+            defaults[flow] = {**defaults.get(flow, {}), **{role: device_id for role in roles}}
+            self._snapshot = dataclasses.replace(snap, defaults=defaults, taken_at=time.monotonic())
+
+    # -- AudioBackend -----------------------------------------------------
+    def take_snapshot(self, force: bool = False) -> DeviceSnapshot:
+        if force:
+            return self.refresh()
+        return self._snapshot or self.refresh()
+
+    def resolve_device(self, identifier: str, flow: str | None = None) -> Any:
+        return self.take_snapshot().index.resolve(identifier, flow=flow)
+
+    def get_default_playback_id(self) -> str | None:
+        return self.take_snapshot().default_playback_id
+
+    def get_default_recording_id(self) -> str | None:
+        return self.take_snapshot().default_recording_id
+
+    def _set_default(self, device_identifier: str, flow: str) -> bool:
+        device_id = self.resolve_device(device_identifier, flow=flow).device_id
+        setter = self.inner.set_default_playback if flow == "playback" else self.inner.set_default_recording
+        # Unresolved names go through unchanged; the backend may still find them (SVV fallback)
+        ok = setter(device_id or device_identifier)
+        if ok:
+            if device_id:
+                self._note_default(flow, device_id)
+            else:
+                self.invalidate()
+        return ok
+
+    def set_default_playback(self, device_identifier: str) -> bool:
+        return self._set_default(device_identifier, "playback")
+
+    def set_default_recording(self, device_identifier: str) -> bool:
+        return self._set_default(device_identifier, "recording")
+
+    def set_default_role(self, device_identifier: str, flow: str, role: int) -> bool:
+        device_id = self.resolve_device(device_identifier, flow=flow).device_id
+        ok = self.inner.set_default_role(device_id or device_identifier, flow, role)
+        if ok:
+            if device_id:
+                self._note_default(flow, device_id, roles=(int(role),))
+            else:
+                self.invalidate()
+        return ok
+
+    def set_master_volume(self, percent: int) -> bool:
+        return self.inner.set_master_volume(percent)
+
+    def mute_master(self, mute: bool) -> bool:
+        return self.inner.mute_master(mute)
+
+    def play_test_tone(self, frequency: int = 880, duration_ms: int = 300) -> None:
+        self.inner.play_test_tone(frequency, duration_ms)
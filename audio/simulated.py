@@ -0,0 +1,407 @@
+"""In-memory audio backend for benchmarks and development without Windows.
+
+`SimulatedBackend` implements audio.backend.AudioBackend over a synthetic device
+topology. Every operation ("enumerate", "get_default", "set_default", "volume",
+"mute", "get_volume" for volume/mute reads, "tone") sleeps for a latency drawn
+from a per-operation distribution and can be made to fail, either with a
+probability or for the next N calls. A seeded random.Random keeps runs
+reproducible.
+
+Latency specs (milliseconds): a number (fixed), a (lo, hi) tuple (uniform),
+("lognormal", median, sigma), or a callable taking the Random instance. In spec
+strings: "5", "20..40" or "lognormal:10:0.5".
+
+`SimulatedVoicemeeter` stands in for the VoiceMeeter Remote API
+(audio/voicemeeter.py) in the same way.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable
+
+from audio.metrics import incr, observe
+from audio.windows import (
+    DEVICE_STATE_ACTIVE,
+    DEVICE_STATE_DISABLED,
+    DEVICE_STATE_UNPLUGGED,
+    E_ALL,
+    E_CAPTURE,
+    E_COMMUNICATIONS,
+    E_CONSOLE,
+    E_MULTIMEDIA,
+    E_RENDER,
+    DeviceSnapshot,
+)
+
+OPERATIONS = ("enumerate", "get_default", "set_default", "volume", "mute", "get_volume", "tone")
+
+# HRESULT reported for injected failures (E_FAIL)
+SIMULATED_HRESULT = 0x80004005
+
+_ROLES = (E_CONSOLE, E_MULTIMEDIA, E_COMMUNICATIONS)
+
+LatencySpec = Any
+
+
+def latency_sampler(spec: LatencySpec) -> Callable[[random.Random], float]:
+    """Turn a latency spec into a function returning seconds."""
+    if spec is None:
+        return lambda _rng: 0.0
+    if callable(spec):
+        return lambda rng: max(0.0, float(spec(rng))) / 1000.0
+    if isinstance(spec, str):
+        spec = _parse_latency(spec)
+    if isinstance(spec, (int, float)):
+        fixed = max(0.0, float(spec)) / 1000.0
+        return lambda _rng: fixed
+    if isinstance(spec, tuple) and len(spec) == 3 and spec[0] == "lognormal":
+        _kind, median, sigma = spec
+        mu = math.log(max(1e-6, float(median)))
+        return lambda rng: rng.lognormvariate(mu, float(sigma)) / 1000.0
+    if isinstance(spec, tuple) and len(spec) == 2:
+        lo, hi = float(spec[0]), float(spec[1])
+        return lambda rng: rng.uniform(lo, hi) / 1000.0
+    raise ValueError(f"invalid latency spec: {spec!r}")
+
+
+def _parse_latency(text: str) -> LatencySpec:
+    text = text.strip()
+    if text.startswith("lognormal:"):
+        _kind, median, sigma = text.split(":")
+        return ("lognormal", float(median), float(sigma))
+    if ".." in text:
+        lo, hi = text.split("..", 1)
+        return (float(lo), float(hi))
+    return float(text)
+
+
+class SimulatedBackend:
+    """Deterministic in-memory AudioBackend with latency and failure injection."""
+
+    name = "simulated"
+
+    def __init__(
+        self,
+        playback: int = 4,
+        recording: int = 3,
+        inactive: int = 0,
+        latency: dict[str, LatencySpec] | None = None,
+        failures: dict[str, float] | None = None,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        unknown = set(latency or {}) | set(failures or {})
+        unknown -= set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"unknown operation(s): {', '.join(sorted(unknown))} (expected: {', '.join(OPERATIONS)})")
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._latency = {op: latency_sampler((latency or {}).get(op)) for op in OPERATIONS}
+        self._failure_rate = dict(failures or {})
+        self._fail_next: Counter = Counter()
+        self._lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.failures_injected: Counter = Counter()
+        self.last_hresult: int | None = None
+        # id -> {"id", "name", "flow" (E_RENDER/E_CAPTURE), "state", "form_factor"}
+        self.devices: dict[str, dict[str, Any]] = {}
+        self.defaults: dict[tuple[int, int], str | None] = {}
+        self.volume = 35
+        self.muted = False
+        self.tones: list[tuple[int, int]] = []
+        self.topology_version = 0
+        for i in range(playback):
+            self.add_device(f"Simulated Speakers {i}", E_RENDER)
+        for i in range(recording):
+            self.add_device(f"Simulated Microphone {i}", E_CAPTURE)
+        for i in range(inactive):
+            state = DEVICE_STATE_DISABLED if i % 2 else DEVICE_STATE_UNPLUGGED
+            self.add_device(f"Simulated USB Audio {i}", E_RENDER if i % 2 == 0 else E_CAPTURE, state=state)
+
+    @classmethod
+    def from_spec(cls, options: str) -> "SimulatedBackend":
+        """Build from "playback=8,recording=4,inactive=0,seed=1,latency.<op>=<ms>,fail.<op>=<p>"."""
+        kwargs: dict[str, Any] = {}
+        latency: dict[str, LatencySpec] = {}
+        failures: dict[str, float] = {}
+        for part in filter(None, (p.strip() for p in options.split(","))):
+            key, sep, value = part.partition("=")
+            if not sep:
+                raise ValueError(f"invalid simulated backend option {part!r} (expected key=value)")
+            key = key.strip()
+            if key.startswith("latency."):
+                latency[key[len("latency."):]] = _parse_latency(value)
+            elif key.startswith("fail."):
+                failures[key[len("fail."):]] = float(value)
+            elif key in ("playback", "recording", "inactive", "seed"):
+                kwargs[key] = int(value)
+            else:
+                raise ValueError(f"unknown simulated backend option {key!r}")
+        return cls(latency=latency, failures=failures, **kwargs)
+
+    # -- topology ---------------------------------------------------------
+    def add_device(self, name: str, flow: int, state: int = DEVICE_STATE_ACTIVE) -> str:
+        """Add an endpoint; the first active endpoint of a flow becomes its default."""
+        with self._lock:
+            id_ = f"{{0.0.{flow}.00000000}}.{{sim-{len(self.devices):04d}}}"
+            # FormFactor: 1 = Speakers, 4 = Microphone
+            form_factor = 1 if flow == E_RENDER else 4
+            self.devices[id_] = {"id": id_, "name": name, "flow": flow, "state": state, "form_factor": form_factor}
+            if state & DEVICE_STATE_ACTIVE and not self.defaults.get((flow, E_MULTIMEDIA)):
+                for role in _ROLES:
+                    self.defaults[(flow, role)] = id_
+            self.topology_version += 1
+            return id_
+
+    def remove_device(self, device_id: str) -> None:
+        with self._lock:
+            dev = self.devices.pop(device_id, None)
+            if dev is None:
+                return
+            for key, value in list(self.defaults.items()):
+                if value == device_id:
+                    self.defaults[key] = next((d["id"] for d in self.devices.values() if d["flow"] == dev["flow"] and d["state"] & DEVICE_STATE_ACTIVE), None)
+            self.topology_version += 1
+
+    # -- failure injection ------------------------------------------------
+    def fail_next(self, op: str, count: int = 1) -> None:
+        """Make the next `count` calls of `op` fail."""
+        if op not in OPERATIONS:
+            raise ValueError(f"unknown operation {op!r}")
+        with self._lock:
+            self._fail_next[op] += count
+
+    def _op(self, op: str) -> bool:
+        """Account, sleep and decide the outcome of one operation; False = injected failure."""
+        t0 = time.perf_counter_ns()
+        with self._lock:
+            self.calls[op] += 1
+            delay = self._latency[op](self._rng)
+            failed = False
+            if self._fail_next[op] > 0:
+                self._fail_next[op] -= 1
+                failed = True
+            elif self._failure_rate.get(op, 0.0) > 0.0:
+                failed = self._rng.random() < self._failure_rate[op]
+            if failed:
+                self.failures_injected[op] += 1
+            self.last_hresult = SIMULATED_HRESULT if failed else 0
+        if delay:
+            self._sleep(delay)
+        # Measured, like the Windows backend: with a virtual clock's sleep this is the bookkeeping only
+        observe(op, time.perf_counter_ns() - t0)
+        if failed:
+            incr("hresult", f"0x{SIMULATED_HRESULT:08X}")
+        return not failed
+
+    # -- AudioBackend -----------------------------------------------------
+    def _entries(self, flow: int) -> list[dict[str, Any]]:
+        entries = [{"id": d["id"], "name": d["name"]} for d in self.devices.values() if d["flow"] == flow and d["state"] & DEVICE_STATE_ACTIVE]
+        entries.sort(key=lambda d: d["name"].casefold())
+        return entries
+
+    def take_snapshot(self, force: bool = False) -> DeviceSnapshot:
+        # Always enumerates; `force` is accepted for the protocol
+        if not self._op("enumerate"):
+            return DeviceSnapshot(taken_at=time.monotonic())
+        with self._lock:
+            return DeviceSnapshot(
+                playback=self._entries(E_RENDER),
+                recording=self._entries(E_CAPTURE),
+                defaults={
+                    "playback": {role: self.defaults.get((E_RENDER, role)) for role in _ROLES},
+                    "recording": {role: self.defaults.get((E_CAPTURE, role)) for role in _ROLES},
+                },
+                taken_at=time.monotonic(),
+            )
+
+    def enumerate_endpoints(self, flow: int = E_ALL, state_mask: int = DEVICE_STATE_ACTIVE, fields: tuple[str, ...] = ("id", "name")) -> list[dict[str, Any]]:
+        if not self._op("enumerate"):
+            return []
+        with self._lock:
+            picked = [d for d in self.devices.values() if (flow == E_ALL or d["flow"] == flow) and d["state"] & state_mask]
+            keep = set(fields) | {"id"}
+            return [{k: v for k, v in d.items() if k in keep} for d in picked]
+
+    def resolve_device(self, identifier: str, flow: str | None = None) -> Any:
+        with self._lock:
+            snap = DeviceSnapshot(playback=self._entries(E_RENDER), recording=self._entries(E_CAPTURE))
+        return snap.index.resolve(identifier, flow=flow)
+
+    def _get_default(self, flow: int) -> str | None:
+        if not self._op("get_default"):
+            return None
+        with self._lock:
+            return self.defaults.get((flow, E_MULTIMEDIA))
+
+    def get_default_playback_id(self) -> str | None:
+        return self._get_default(E_RENDER)
+
+    def get_default_recording_id(self) -> str | None:
+        return self._get_default(E_CAPTURE)
+
+    def _set_default(self, device_identifier: str, flow: int) -> bool:
+        res = self.resolve_device(device_identifier, flow="playback" if flow == E_RENDER else "recording")
+        if not self._op("set_default") or res.device_id is None:
+            return False
+        with self._lock:
+            for role in _ROLES:
+                self.defaults[(flow, role)] = res.device_id
+        return True
+
+    def set_default_playback(self, device_identifier: str) -> bool:
+        return self._set_default(device_identifier, E_RENDER)
+
+    def set_default_recording(self, device_identifier: str) -> bool:
+        return self._set_default(device_identifier, E_CAPTURE)
+
+    def set_default_role(self, device_identifier: str, flow: str, role: int) -> bool:
+        res = self.resolve_device(device_identifier, flow=flow)
+        if not self._op("set_default") or res.device_id is None:
+            return False
+        with self._lock:
+            self.defaults[(E_RENDER if flow == "playback" else E_CAPTURE, int(role))] = res.device_id
+        return True
+
+    def set_master_volume(self, percent: int) -> bool:
+        if not self._op("volume"):
+            return False
+        self.volume = max(0, min(100, int(percent)))
+        return True
+
+    def mute_master(self, mute: bool) -> bool:
+        if not self._op("mute"):
+            return False
+        self.muted = bool(mute)
+        return True
+
+    def get_master_volume(self) -> int | None:
+        return self.volume if self._op("get_volume") else None
+
+    def get_mute(self) -> bool | None:
+        return self.muted if self._op("get_volume") else None
+
+    def play_test_tone(self, frequency: int = 880, duration_ms: int = 300) -> None:
+        if self._op("tone"):
+            self.tones.append((int(frequency), int(duration_ms)))
+
+
+VOICEMEETER_OPERATIONS = ("login", "dirty", "get", "set", "script")
+
+
+class SimulatedVoicemeeter:
+    """In-memory VoiceMeeter Remote API (the interface of audio.voicemeeter.DllRemote).
+
+    Parameters live in a dict; every change (API write, script, preset load or
+    `external_change`, i.e. a fader moved in the VoiceMeeter window) sets the
+    dirty flag, which `is_parameters_dirty` reports once and clears, like the
+    DLL. Calls are counted per operation in `calls` and can be given latencies
+    (same specs as SimulatedBackend).
+    """
+
+    name = "simulated"
+
+    def __init__(
+        self,
+        kind: int = 2,
+        latency: dict[str, LatencySpec] | None = None,
+        presets: dict[str, dict[str, float]] | None = None,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        from audio.voicemeeter import shadow_parameters
+
+        unknown = set(latency or {}) - set(VOICEMEETER_OPERATIONS)
+        if unknown:
+            raise ValueError(f"unknown operation(s): {', '.join(sorted(unknown))} (expected: {', '.join(VOICEMEETER_OPERATIONS)})")
+        self.kind = kind
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self._latency = {op: latency_sampler((latency or {}).get(op)) for op in VOICEMEETER_OPERATIONS}
+        self._lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.params: dict[str, float] = {name: 0.0 for name in shadow_parameters(kind)}
+        self.presets = dict(presets or {})
+        self.loaded: list[str] = []
+        self.logged_in = False
+        self.dirty = True
+
+    def _op(self, op: str) -> None:
+        with self._lock:
+            self.calls[op] += 1
+            delay = self._latency[op](self._rng)
+        if delay:
+            self._sleep(delay)
+
+    def external_change(self, name: str, value: float) -> None:
+        """A change made outside the API (VoiceMeeter window, MIDI, another client)."""
+        with self._lock:
+            self.params[name] = float(value)
+            self.dirty = True
+
+    # -- Remote API ---------------------------------------------------------
+    def login(self) -> int:
+        self._op("login")
+        if self.logged_in:
+            return -2
+        self.logged_in = True
+        return 0
+
+    def logout(self) -> int:
+        self._op("login")
+        self.logged_in = False
+        return 0
+
+    def voicemeeter_type(self) -> int | None:
+        return self.kind if self.logged_in else None
+
+    def is_parameters_dirty(self) -> bool | None:
+        self._op("dirty")
+        if not self.logged_in:
+            return None
+        with self._lock:
+            dirty, self.dirty = self.dirty, False
+        return dirty
+
+    def get_float(self, name: str) -> float | None:
+        self._op("get")
+        return self.params.get(name) if self.logged_in else None
+
+    def set_float(self, name: str, value: float) -> bool:
+        self._op("set")
+        if not self.logged_in or name not in self.params:
+            return False
+        self.external_change(name, value)
+        return True
+
+    def set_parameters(self, script: str) -> bool:
+        """Assignments separated by ";" or newlines; Command.Load="<file>" loads a preset."""
+        self._op("script")
+        if not self.logged_in:
+            return False
+        changes: dict[str, float] = {}
+        for part in filter(None, (p.strip() for p in script.replace("\n", ";").split(";"))):
+            name, sep, value = part.partition("=")
+            name, value = name.strip(), value.strip()
+            if not sep:
+                return False
+            if name == "Command.Load":
+                path = value.strip('"')
+                self.loaded.append(path)
+                changes.update(self.presets.get(path, {}))
+            elif name in self.params:
+                try:
+                    changes[name] = float(value)
+                except ValueError:
+                    return False
+            else:
+                return False
+        with self._lock:
+            self.params.update(changes)
+            self.dirty = True
+        return True
@@ -0,0 +1,141 @@
+"""Batched SoundVolumeView.exe fallback (NirSoft).
+
+SoundVolumeView executes several commands given in one command line, so the
+fallback actions of one operation (e.g. default playback + default recording of a
+profile) are collected in an SvvBatch and run with a single process spawn and a
+timeout. SoundVolumeView only reports one exit code for the whole command line,
+so when a batch with several actions fails, each action's `verify` callback (if
+given, e.g. "is this device the default now?") tells which ones took effect.
+Only the remaining actions are re-run, each on its own, so every SvvResult
+carries its own outcome and no action that already went through is repeated.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from audio.metrics import incr, observe
+
+# Default subprocess timeout (seconds) for one SoundVolumeView invocation
+SVV_TIMEOUT = 10.0
+
+# Role arguments for /SetDefault: 0=Console, 1=Multimedia, 2=Communications
+SVV_ROLE_MULTIMEDIA = "1"
+
+
+def soundvolumeview_path() -> Path | None:
+    # Prefer local tools folder
+    candidate = Path("tools") / "SoundVolumeView.exe"
+    if candidate.exists():
+        return candidate
+    # As a fallback, rely on PATH (not resolved here); caller will attempt run
+    return None
+
+
+@dataclass(frozen=True)
+class SvvAction:
+    command: str
+    args: tuple[str, ...] = ()
+    label: str = ""
+    # Checks whether the action took effect; used after a failed batch
+    verify: Callable[[], bool] | None = field(default=None, compare=False, repr=False)
+
+    def argv(self) -> list[str]:
+        return [self.command, *self.args]
+
+
+@dataclass
+class SvvResult:
+    action: SvvAction
+    ok: bool
+    returncode: int | None = None
+    timed_out: bool = False
+    error: str | None = None
+    output: str = ""
+
+
+@dataclass
+class SvvBatch:
+    """Collects SoundVolumeView actions and runs them in one process."""
+
+    exe: str | Path | None = None
+    timeout: float = SVV_TIMEOUT
+    actions: list[SvvAction] = field(default_factory=list)
+    spawns: int = 0
+
+    def add(self, command: str, *args: str, label: str = "", verify: Callable[[], bool] | None = None) -> SvvAction:
+        action = SvvAction(command, tuple(str(a) for a in args), label, verify)
+        self.actions.append(action)
+        return action
+
+    def set_default(
+        self, device_name_or_id: str, flow: str, role: str = SVV_ROLE_MULTIMEDIA, verify: Callable[[], bool] | None = None
+    ) -> SvvAction:
+        """Queue /SetDefault; flow: 'render' (playback) or 'capture' (recording)."""
+        flow_arg = "Render" if flow == "render" else "Capture"
+        return self.add("/SetDefault", device_name_or_id, role, flow_arg, label=f"set-default-{flow}", verify=verify)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def _exe(self) -> str:
+        if self.exe is not None:
+            return str(self.exe)
+        found = soundvolumeview_path()
+        # Attempt relying on PATH if user placed it there
+        return str(found) if found is not None else "SoundVolumeView.exe"
+
+    def _spawn(self, actions: list[SvvAction], timeout: float) -> tuple[int | None, bool, str | None, str]:
+        cmd = [self._exe()]
+        for action in actions:
+            cmd.extend(action.argv())
+        self.spawns += 1
+        t0 = time.perf_counter_ns()
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=max(0.1, timeout))
+            return proc.returncode, False, None, (proc.stdout or "") + (proc.stderr or "")
+        except subprocess.TimeoutExpired:
+            incr("timeout", "svv_spawn")
+            return None, True, "timeout", ""
+        except Exception as e:
+            return None, False, type(e).__name__, ""
+        finally:
+            observe("svv_spawn", time.perf_counter_ns() - t0)
+
+    def run(self) -> list[SvvResult]:
+        """Run all queued actions; returns one result per action (queue is cleared)."""
+        actions, self.actions = self.actions, []
+        if not actions:
+            return []
+        deadline = time.monotonic() + self.timeout
+        rc, timed_out, error, output = self._spawn(actions, self.timeout)
+        if rc == 0:
+            return [SvvResult(a, True, rc, output=output) for a in actions]
+        if len(actions) == 1 or timed_out or error is not None:
+            # Single action, or the tool hangs / cannot start: re-running will not help
+            return [SvvResult(a, False, rc, timed_out, error, output) for a in actions]
+        results: list[SvvResult] = []
+        for action in actions:
+            if _took_effect(action):
+                results.append(SvvResult(action, True, rc, output=output))
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                results.append(SvvResult(action, False, None, True, "timeout"))
+                continue
+            rc, timed_out, error, output = self._spawn([action], remaining)
+            results.append(SvvResult(action, rc == 0, rc, timed_out, error, output))
+        return results
+
+
+def _took_effect(action: SvvAction) -> bool:
+    if action.verify is None:
+        return False
+    try:
+        return bool(action.verify())
+    except Exception:
+        return False
@@ -0,0 +1,317 @@
+"""Record and replay backend call traces.
+
+`RecordingBackend` wraps any AudioBackend and appends one line per call to a
+trace file: method, arguments, result, HRESULT (the backend's `last_hresult`
+after the call; cleared before it, and kept per thread by the Windows backend)
+and wall time. `ReplayBackend` serves those recorded responses with the recorded
+timings, so a user's device topology and latencies can be re-run on any host,
+e.g. through `App.refresh_devices` or `set_default_playback`.
+
+Trace format: JSON lines, gzip-compressed when the path ends in ".gz". The first
+line is a header {"trace": 1, "backend": ..., "started": ...}; every further line
+is {"m": method, "a": args, "r": result, "h": hresult, "w": wall µs, "t": offset µs}
+("h" is omitted when no HRESULT was reported, "x" holds a raised exception).
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Callable, IO
+
+from audio.resolver import Match, Resolution
+from audio.windows import DEVICE_STATE_ACTIVE, E_ALL, DeviceSnapshot
+
+TRACE_VERSION = 1
+
+# What a method returns when a replayed trace has no entry for it
+_MISSING_RESULT: dict[str, Any] = {
+    "enumerate_endpoints": [],
+    "set_default_playback": False,
+    "set_default_recording": False,
+    "set_default_role": False,
+    "set_master_volume": False,
+    "mute_master": False,
+}
+
+
+class ReplayedError(RuntimeError):
+    """Raised by ReplayBackend where the recorded call raised."""
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return path.open(mode, encoding="utf-8")
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, DeviceSnapshot):
+        return {
+            "$": "snapshot",
+            "p": value.playback,
+            "r": value.recording,
+            "d": {flow: {str(role): id_ for role, id_ in roles.items()} for flow, roles in value.defaults.items()},
+        }
+    if isinstance(value, Resolution):
+        return {"$": "resolution", "q": value.query, "c": [[m.device, m.score, m.kind] for m in value.candidates]}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict) and "$" in value:
+        kind = value["$"]
+        if kind == "snapshot":
+            return DeviceSnapshot(
+                playback=value["p"],
+                recording=value["r"],
+                defaults={flow: {int(role): id_ for role, id_ in roles.items()} for flow, roles in value["d"].items()},
+                taken_at=time.monotonic(),
+            )
+        if kind == "resolution":
+            return Resolution(value["q"], [Match(device, score, kind) for device, score, kind in value["c"]])
+    return value
+
+
+def _call_key(method: str, args: list[Any]) -> str:
+    return method + json.dumps(args, separators=(",", ":"), sort_keys=True)
+
+
+class RecordingBackend:
+    """AudioBackend wrapper that writes every call of `inner` to a trace file."""
+
+    def __init__(self, inner: Any, path: str | Path) -> None:
+        self.inner = inner
+        self.name = inner.name
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file: IO[str] | None = _open(self.path, "w")
+        self._t0 = time.perf_counter()
+        self.recorded = 0
+        # Write the gzip trailer on normal interpreter exit
+        atexit.register(self.close)
+        self._write({"trace": TRACE_VERSION, "backend": inner.name, "started": time.strftime("%Y-%m-%dT%H:%M:%S%z")})
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            # Keep the trace usable if the process dies mid-session
+            self._file.flush()
+
+    def _call(self, method: str, *args: Any) -> Any:
+        if hasattr(self.inner, "last_hresult"):
+            self.inner.last_hresult = None
+        start = time.perf_counter()
+        entry: dict[str, Any] = {"m": method, "a": _encode(list(args))}
+        try:
+            result = getattr(self.inner, method)(*args)
+        except Exception as e:
+            entry["x"] = f"{type(e).__name__}: {e}"
+            raise
+        else:
+            entry["r"] = _encode(result)
+            return result
+        finally:
+            end = time.perf_counter()
+            hr = getattr(self.inner, "last_hresult", None)
+            if hr:
+                entry["h"] = hr
+            entry["w"] = int((end - start) * 1e6)
+            entry["t"] = int((start - self._t0) * 1e6)
+            self._write(entry)
+            self.recorded += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # -- AudioBackend -----------------------------------------------------
+    def take_snapshot(self, force: bool = False) -> DeviceSnapshot:
+        return self._call("take_snapshot", *((True,) if force else ()))
+
+    def enumerate_endpoints(self, flow: int = E_ALL, state_mask: int = DEVICE_STATE_ACTIVE, fields: tuple[str, ...] = ("id", "name")) -> list[dict[str, Any]]:
+        return self._call("enumerate_endpoints", flow, state_mask, tuple(fields))
+
+    def resolve_device(self, identifier: str, flow: str | None = None) -> Any:
+        return self._call("resolve_device", identifier, flow)
+
+    def get_default_playback_id(self) -> str | None:
+        return self._call("get_default_playback_id")
+
+    def get_default_recording_id(self) -> str | None:
+        return self._call("get_default_recording_id")
+
+    def set_default_playback(self, device_identifier: str) -> bool:
+        return self._call("set_default_playback", device_identifier)
+
+    def set_default_recording(self, device_identifier: str) -> bool:
+        return self._call("set_default_recording", device_identifier)
+
+    def set_default_role(self, device_identifier: str, flow: str, role: int) -> bool:
+        return self._call("set_default_role", device_identifier, flow, int(role))
+
+    def set_master_volume(self, percent: int) -> bool:
+        return self._call("set_master_volume", percent)
+
+    def mute_master(self, mute: bool) -> bool:
+        return self._call("mute_master", mute)
+
+    def get_master_volume(self) -> int | None:
+        return self._call("get_master_volume")
+
+    def get_mute(self) -> bool | None:
+        return self._call("get_mute")
+
+    def play_test_tone(self, frequency: int = 880, duration_ms: int = 300) -> None:
+        self._call("play_test_tone", frequency, duration_ms)
+
+
+def read_trace(path: str | Path) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """(header, entries) of a trace file."""
+    lines: list[dict[str, Any]] = []
+    with _open(Path(path), "r") as f:
+        try:
+            for line in f:
+                if line.strip():
+                    lines.append(json.loads(line))
+        except (EOFError, json.JSONDecodeError):
+            # Recording process died mid-write: keep the complete lines
+            pass
+    if not lines or lines[0].get("trace") != TRACE_VERSION:
+        raise ValueError(f"{path}: not a version {TRACE_VERSION} audio trace")
+    return lines[0], lines[1:]
+
+
+class ReplayBackend:
+    """AudioBackend serving the responses and timings of a recorded trace.
+
+    A call is answered by the next unused entry with the same method and
+    arguments, else by the next entry of the same method, else by repeating the
+    method's last entry. `speed` scales the replayed wall times (0 = no sleeping).
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str | Path, speed: float = 1.0, sleep: Callable[[float], None] = time.sleep) -> None:
+        self.path = Path(path)
+        self.header, entries = read_trace(self.path)
+        self.speed = speed
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._by_call: dict[str, deque] = defaultdict(deque)
+        self._by_method: dict[str, deque] = defaultdict(deque)
+        self._last: dict[str, dict[str, Any]] = {}
+        for entry in entries:
+            self._by_call[_call_key(entry["m"], entry["a"])].append(entry)
+            self._by_method[entry["m"]].append(entry)
+        self.last_hresult: int | None = None
+        self.served = 0
+        self.inexact = 0
+        self.missing = 0
+        self.replayed_s = 0.0
+
+    @classmethod
+    def from_spec(cls, options: str) -> "ReplayBackend":
+        """Build from "<path>[,speed=<factor>]"."""
+        path, *rest = options.split(",")
+        kwargs: dict[str, Any] = {}
+        for part in rest:
+            key, _, value = part.partition("=")
+            if key.strip() != "speed":
+                raise ValueError(f"unknown replay backend option {key.strip()!r}")
+            kwargs["speed"] = float(value)
+        if not path:
+            raise ValueError("replay backend needs a trace path: replay:<path>")
+        return cls(path, **kwargs)
+
+    def _next(self, method: str, args: list[Any]) -> dict[str, Any] | None:
+        with self._lock:
+            exact = self._by_call.get(_call_key(method, args))
+            if exact:
+                entry = exact.popleft()
+                self._by_method[method].remove(entry)
+            elif self._by_method.get(method):
+                entry = self._by_method[method].popleft()
+                self._by_call[_call_key(method, entry["a"])].remove(entry)
+                self.inexact += 1
+            else:
+                entry = self._last.get(method)
+                if entry is None:
+                    self.missing += 1
+                    return None
+                self.inexact += 1
+            self._last[method] = entry
+            self.served += 1
+            return entry
+
+    def _call(self, method: str, *args: Any) -> Any:
+        entry = self._next(method, _encode(list(args)))
+        if entry is None:
+            self.last_hresult = None
+            if method == "take_snapshot":
+                return DeviceSnapshot(taken_at=time.monotonic())
+            return _MISSING_RESULT.get(method)
+        wall = entry.get("w", 0) / 1e6 * self.speed
+        if wall > 0:
+            self._sleep(wall)
+        self.replayed_s += wall
+        self.last_hresult = entry.get("h")
+        if "x" in entry:
+            raise ReplayedError(entry["x"])
+        return _decode(entry.get("r"))
+
+    def stats(self) -> dict[str, Any]:
+        return {"served": self.served, "inexact": self.inexact, "missing": self.missing, "replayed_s": round(self.replayed_s, 6)}
+
+    # -- AudioBackend -----------------------------------------------------
+    def take_snapshot(self, force: bool = False) -> DeviceSnapshot:
+        return self._call("take_snapshot", *((True,) if force else ()))
+
+    def enumerate_endpoints(self, flow: int = E_ALL, state_mask: int = DEVICE_STATE_ACTIVE, fields: tuple[str, ...] = ("id", "name")) -> list[dict[str, Any]]:
+        return self._call("enumerate_endpoints", flow, state_mask, tuple(fields))
+
+    def resolve_device(self, identifier: str, flow: str | None = None) -> Any:
+        return self._call("resolve_device", identifier, flow)
+
+    def get_default_playback_id(self) -> str | None:
+        return self._call("get_default_playback_id")
+
+    def get_default_recording_id(self) -> str | None:
+        return self._call("get_default_recording_id")
+
+    def set_default_playback(self, device_identifier: str) -> bool:
+        return self._call("set_default_playback", device_identifier)
+
+    def set_default_recording(self, device_identifier: str) -> bool:
+        return self._call("set_default_recording", device_identifier)
+
+    def set_default_role(self, device_identifier: str, flow: str, role: int) -> bool:
+        return self._call("set_default_role", device_identifier, flow, int(role))
+
+    def set_master_volume(self, percent: int) -> bool:
+        return self._call("set_master_volume", percent)
+
+    def mute_master(self, mute: bool) -> bool:
+        return self._call("mute_master", mute)
+
+    def get_master_volume(self) -> int | None:
+        return self._call("get_master_volume")
+
+    def get_mute(self) -> bool | None:
+        return self._call("get_mute")
+
+    def play_test_tone(self, frequency: int = 880, duration_ms: int = 300) -> None:
+        self._call("play_test_tone", frequency, duration_ms)
@@ -1,25 +1,421 @@
-"""VoiceMeeter Banana control (stubs for Stufe 2).
+"""VoiceMeeter control through the Remote API (VoicemeeterRemote64.dll).
 
-This module will wrap pyVoicemeeter to connect, read/write strips/buses, and load presets.
-Currently placeholder functions are provided to establish the interface.
+One `VoicemeeterSession` per process (`session()`) logs in once and stays
+logged in until exit, instead of a login/logout per command. It keeps a shadow
+cache of the strip and bus parameters of the running edition (gain, mute, solo,
+routing), so `get()` is a dictionary lookup and never waits for the DLL. A
+poller thread asks the API whether parameters are dirty (VBVMR_IsParametersDirty,
+one cheap call) every `poll_interval` seconds and re-reads the shadowed
+parameters only when they are; writes go through to the API and update the
+shadow at once. `batch()` collects writes (last write per parameter wins) and
+sends them as one script call (VBVMR_SetParameters). The session remembers the
+last preset it loaded (`preset`) until it logs out, so a profile switch can skip
+reloading an unchanged preset.
+
+The Remote API is reached with ctypes (no pyVoicemeeter needed). With
+SSB_VOICEMEETER=simulated, `SimulatedVoicemeeter` (audio/simulated.py) stands
+in for it, e.g. for benchmarks and development on Linux.
 """
 
 from __future__ import annotations
 
+import atexit
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
 
-def is_available() -> bool:
+VOICEMEETER_ENV = "SSB_VOICEMEETER"
+
+# Seconds between dirty checks of the poller
+POLL_INTERVAL = 0.1
+
+# VBVMR_GetVoicemeeterType -> (edition, strips, buses); routing buses per strip
+EDITIONS = {
+    1: ("Voicemeeter", 3, 2, ("A1", "B1")),
+    2: ("Voicemeeter Banana", 5, 5, ("A1", "A2", "A3", "B1", "B2")),
+    3: ("Voicemeeter Potato", 8, 8, ("A1", "A2", "A3", "A4", "A5", "B1", "B2", "B3")),
+}
+STRIP_PARAMS = ("Gain", "Mute", "Solo")
+BUS_PARAMS = ("Gain", "Mute")
+
+
+def shadow_parameters(kind: int) -> list[str]:
+    """Parameter names mirrored for an edition (VBVMR_GetVoicemeeterType value)."""
+    _edition, strips, buses, routing = EDITIONS.get(kind, EDITIONS[2])
+    names = [f"Strip[{i}].{p}" for i in range(strips) for p in (*STRIP_PARAMS, *routing)]
+    names += [f"Bus[{i}].{p}" for i in range(buses) for p in BUS_PARAMS]
+    return names
+
+
+# -- Remote API ---------------------------------------------------------------
+def _dll_path() -> Path | None:
+    """VoicemeeterRemote(64).dll from the installation directory; None if not installed."""
+    if os.name != "nt":
+        return None
+    name = "VoicemeeterRemote64.dll" if sys.maxsize > 2**32 else "VoicemeeterRemote.dll"
+    candidates = []
     try:
-        import pyVoicemeeter  # type: ignore
+        import winreg
+
+        key = r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall\VB:Voicemeeter {17359A74-1236-5467}"
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key) as k:
+            uninstall = winreg.QueryValueEx(k, "UninstallString")[0]
+        candidates.append(Path(uninstall).parent / name)
+    except OSError:
+        pass
+    candidates.append(Path(os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)")) / "VB" / "Voicemeeter" / name)
+    return next((p for p in candidates if p.is_file()), None)
+
+
+class DllRemote:
+    """Thin ctypes binding of the VBVMR_* functions used here."""
+
+    def __init__(self, path: Path) -> None:
+        import ctypes
+
+        self._ct = ctypes
+        self._dll = ctypes.WinDLL(str(path))  # type: ignore[attr-defined]
+
+    def login(self) -> int:
+        # 0: ok, 1: ok but VoiceMeeter is not running, < 0: error
+        return int(self._dll.VBVMR_Login())
+
+    def logout(self) -> int:
+        return int(self._dll.VBVMR_Logout())
+
+    def voicemeeter_type(self) -> int | None:
+        value = self._ct.c_long()
+        return value.value if self._dll.VBVMR_GetVoicemeeterType(self._ct.byref(value)) == 0 else None
+
+    def is_parameters_dirty(self) -> bool | None:
+        res = self._dll.VBVMR_IsParametersDirty()
+        return None if res < 0 else res == 1
+
+    def get_float(self, name: str) -> float | None:
+        value = self._ct.c_float()
+        return value.value if self._dll.VBVMR_GetParameterFloat(name.encode("ascii"), self._ct.byref(value)) == 0 else None
+
+    def set_float(self, name: str, value: float) -> bool:
+        return self._dll.VBVMR_SetParameterFloat(name.encode("ascii"), self._ct.c_float(value)) == 0
 
+    def set_parameters(self, script: str) -> bool:
+        # > 0: script error in that line, < 0: API error
+        return self._dll.VBVMR_SetParametersW(self._ct.c_wchar_p(script)) == 0
+
+
+def remote_api() -> Any:
+    """The Remote API for this process: simulated (SSB_VOICEMEETER), the DLL, or None."""
+    if os.environ.get(VOICEMEETER_ENV, "").strip().lower() == "simulated":
+        from audio.simulated import SimulatedVoicemeeter
+
+        return SimulatedVoicemeeter()
+    path = _dll_path()
+    if path is None:
+        return None
+    try:
+        return DllRemote(path)
+    except OSError:
+        return None
+
+
+# -- session ------------------------------------------------------------------
+class VoicemeeterSession:
+    """Long-lived Remote API login with a dirty-flag refreshed parameter shadow."""
+
+    def __init__(self, api: Any = None, poll_interval: float = POLL_INTERVAL) -> None:
+        self._api = api
+        self.poll_interval = poll_interval
+        self._lock = threading.RLock()  # serialises Remote API calls
+        self._shadow: dict[str, float] = {}
+        self._names: list[str] = []
+        self._connected = False
+        self._atexit = False
+        self._stop = threading.Event()
+        self._poller: threading.Thread | None = None
+        self.kind: int | None = None
+        self.preset: str | None = None  # last preset loaded through this session
+        self.dirty_checks = 0
+        self.refreshes = 0
+        self.api_calls = 0
+        self.saved_calls = 0  # single-parameter calls replaced by batch scripts
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    def connect(self, poll: bool = True) -> bool:
+        """Log in (once per session) and fill the shadow; False if VoiceMeeter is unavailable."""
+        with self._lock:
+            if self._connected:
+                return True
+            if self._api is None:
+                self._api = remote_api()
+            if self._api is None:
+                return False
+            self.api_calls += 1
+            if self._api.login() < 0:
+                return False
+            self._connected = True
+            if not self._atexit:
+                self._atexit = True
+                atexit.register(self.disconnect)
+            self.api_calls += 1
+            self.kind = self._api.voicemeeter_type()
+            self._names = shadow_parameters(self.kind or 2)
+            # The DLL only updates its parameter copy in IsParametersDirty
+            self._check_dirty()
+            self.refresh()
+        if poll:
+            self.start_polling()
         return True
-    except Exception:
-        return False
+
+    def disconnect(self) -> None:
+        self.stop_polling()
+        with self._lock:
+            if self._connected:
+                self._connected = False
+                # After a new login VoiceMeeter may hold anything
+                self.preset = None
+                self.api_calls += 1
+                self._api.logout()
+
+    # -- shadow -----------------------------------------------------------
+    def _check_dirty(self) -> bool:
+        self.dirty_checks += 1
+        self.api_calls += 1
+        return bool(self._api.is_parameters_dirty())
+
+    def refresh(self) -> None:
+        """Re-read every shadowed parameter from the API."""
+        with self._lock:
+            if not self._connected:
+                return
+            shadow = {}
+            for name in self._names:
+                self.api_calls += 1
+                value = self._api.get_float(name)
+                if value is not None:
+                    shadow[name] = value
+            self.refreshes += 1
+            # Swapped in one assignment: readers never see a half-filled shadow
+            self._shadow = shadow
+
+    def poll(self) -> bool:
+        """One dirty check; refresh the shadow if the API reports changes. True if refreshed."""
+        with self._lock:
+            if not self._connected or not self._check_dirty():
+                return False
+            self.refresh()
+            return True
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception:
+                # A failing DLL call must not end the poller
+                continue
+
+    def start_polling(self) -> None:
+        if self._poller is not None and self._poller.is_alive():
+            return
+        self._stop.clear()
+        self._poller = threading.Thread(target=self._poll_loop, name="VoicemeeterPoll", daemon=True)
+        self._poller.start()
+
+    def stop_polling(self) -> None:
+        self._stop.set()
+        poller, self._poller = self._poller, None
+        if poller is not None and poller is not threading.current_thread():
+            poller.join(timeout=1.0)
+
+    # -- parameters -------------------------------------------------------
+    def get(self, name: str, default: float | None = None) -> float | None:
+        """Shadowed value of `name` (no API call); `default` if it is not shadowed."""
+        return self._shadow.get(name, default)
+
+    def parameters(self) -> dict[str, float]:
+        return dict(self._shadow)
+
+    def set(self, name: str, value: float) -> bool:
+        """Write `name` through to the API and the shadow."""
+        with self._lock:
+            if not self._connected:
+                return False
+            self.api_calls += 1
+            if not self._api.set_float(name, float(value)):
+                return False
+            if name in self._shadow or name in self._names:
+                self._shadow = {**self._shadow, name: float(value)}
+            return True
+
+    def run_script(self, script: str) -> bool:
+        """Several assignments in one call ("Strip[0].Gain=-6;Bus[0].Mute=1")."""
+        with self._lock:
+            if not self._connected:
+                return False
+            self.api_calls += 1
+            return bool(self._api.set_parameters(script))
+
+    def load_preset(self, path: str) -> bool:
+        """Load an XML preset; the shadow follows at the next dirty poll."""
+        if not self.run_script(f'Command.Load="{path}"'):
+            return False
+        self.preset = path
+        return True
+
+    @contextmanager
+    def batch(self) -> Iterator["WriteBatch"]:
+        """Collect writes and send them as one script when the block ends.
+
+        If the block raises, the pending writes are dropped. Whether the final
+        flush was accepted is in `batch.ok` afterwards (see WriteBatch).
+        """
+        batch = WriteBatch(self)
+        try:
+            yield batch
+        except BaseException:
+            batch.clear()
+            raise
+        batch.flush()
+
+    def _apply_script(self, values: dict[str, Any]) -> bool:
+        with self._lock:
+            if not self._connected:
+                return False
+            self.api_calls += 1
+            if not self._api.set_parameters(script_for(values)):
+                return False
+            if "Command.Load" in values:
+                self.preset = str(values["Command.Load"])
+            changed = {k: float(v) for k, v in values.items() if k in self._names and not isinstance(v, str)}
+            if changed:
+                self._shadow = {**self._shadow, **changed}
+            return True
+
+    def status(self) -> dict[str, Any]:
+        edition = EDITIONS.get(self.kind or 0, ("?",))[0] if self._connected else None
+        return {
+            "connected": self._connected,
+            "edition": edition,
+            "parameters": len(self._shadow),
+            "dirty_checks": self.dirty_checks,
+            "refreshes": self.refreshes,
+            "api_calls": self.api_calls,
+            "saved_calls": self.saved_calls,
+        }
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, str):
+        return f'"{value}"'
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    # Fixed point: the script parser does not take exponents such as 1e-05
+    text = f"{float(value):.6f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def script_for(values: dict[str, Any]) -> str:
+    """Remote API script for `values`: 'Strip[0].Gain=-6;Bus[1].Mute=1;Command.Load="x.xml"'."""
+    return ";".join(f"{name}={_format(value)}" for name, value in values.items())
+
+
+class WriteBatch:
+    """Pending parameter writes of a session, flushed as one VBVMR_SetParameters call.
+
+    A parameter written several times is sent once with its last value, at the
+    position of that last write. `saved_calls` counts the single-parameter
+    calls the flushes replaced. `ok` is None before the first flush, True while
+    every flush went through and False once the API rejected one; the rejected
+    writes are kept in `failed` for the caller to inspect or resend.
+    """
+
+    def __init__(self, session: VoicemeeterSession) -> None:
+        self.session = session
+        self._pending: dict[str, Any] = {}
+        self.writes = 0  # set() calls since the last flush
+        self.flushes = 0
+        self.saved_calls = 0
+        self.ok: bool | None = None
+        self.failed: dict[str, Any] = {}
+
+    def set(self, name: str, value: float | bool | str) -> None:
+        self._pending.pop(name, None)
+        self._pending[name] = value
+        self.writes += 1
+
+    def load_preset(self, path: str) -> None:
+        self.set("Command.Load", path)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def clear(self) -> None:
+        """Drop the pending writes without sending them."""
+        self._pending, self.writes = {}, 0
+
+    def flush(self) -> bool:
+        """Send the pending writes; True if there was nothing to send or the API accepted them."""
+        if not self._pending:
+            if self.ok is None:
+                self.ok = True
+            return True
+        pending, writes = self._pending, self.writes
+        self._pending, self.writes = {}, 0
+        if not self.session._apply_script(pending):
+            self.ok = False
+            self.failed.update(pending)
+            return False
+        if self.ok is None:
+            self.ok = True
+        self.flushes += 1
+        self.saved_calls += writes - 1
+        self.session.saved_calls += writes - 1
+        return True
+
+
+_session: VoicemeeterSession | None = None
+_session_lock = threading.Lock()
+
+
+def session() -> VoicemeeterSession:
+    """Process-wide VoiceMeeter session (stays logged in, e.g. in the daemon)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = VoicemeeterSession()
+        return _session
+
+
+def is_available() -> bool:
+    if os.environ.get(VOICEMEETER_ENV, "").strip().lower() == "simulated":
+        return True
+    return _dll_path() is not None
 
 
 def connect() -> bool:
-    return False
+    return session().connect()
+
+
+def disconnect() -> None:
+    session().disconnect()
+
+
+def get_status() -> dict[str, Any]:
+    return session().status()
+
+
+def loaded_preset() -> str | None:
+    """Preset last loaded by this process' session; None if unknown (no login, none loaded)."""
+    s = _session
+    return s.preset if s is not None and s.connected else None
 
 
 def load_preset(path: str) -> bool:
-    return False
+    s = session()
+    return s.connect() and s.load_preset(path)
 
@@ -1,20 +1,26 @@
 """Windows audio control primitives for Stufe 1.
 
-- Lists playback/recording devices (heuristic split via names when using pycaw)
+- Lists playback/recording devices from a single enumeration pass (DeviceSnapshot)
 - Sets master volume / mute via CoreAudio (pycaw)
 - Plays a simple test tone via winsound
-- Sets default devices using SoundVolumeView.exe if available (fallback)
+- Sets default devices via IPolicyConfig (COM), SoundVolumeView.exe as fallback
 
-Note: A pure COM solution for setting default endpoints (IPolicyConfig) will be
-added next. This module currently prefers the lightweight/fallback approach.
+COM dependencies (comtypes/pycaw) are imported lazily so the pure-Python parts
+(snapshot building, split by flow) can be exercised with a stubbed enumerator.
 """
 
 from __future__ import annotations
 
-from ctypes import HRESULT, c_int, c_void_p, c_ulong
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import cached_property, partial
 from pathlib import Path
 from typing import Any
-from comtypes import GUID
+
+from audio.deadline import DEFAULT_TIMEOUT, CallResult, CircuitBreaker, call_with_deadline, device_breaker
+from audio.metrics import incr, observe, timed
 
 # Local constants (avoid pycaw.constants for compatibility across versions)
 # EDataFlow
@@ -27,11 +33,224 @@ E_CONSOLE = 0
 E_MULTIMEDIA = 1
 E_COMMUNICATIONS = 2
 
+# Lookup order used when a single "default" id is requested
+DEFAULT_ROLE_ORDER = (E_MULTIMEDIA, E_CONSOLE, E_COMMUNICATIONS)
+
 # Device state flags
 DEVICE_STATE_ACTIVE = 0x00000001
+DEVICE_STATE_DISABLED = 0x00000002
+DEVICE_STATE_NOTPRESENT = 0x00000004
+DEVICE_STATE_UNPLUGGED = 0x00000008
+DEVICE_STATEMASK_ALL = 0x0000000F
 
 # CLSID for MMDeviceEnumerator
-CLSID_MMDeviceEnumerator = GUID("{BCDE0395-E52F-467C-8E3D-C4579291692E}")
+CLSID_MMDeviceEnumerator = "{BCDE0395-E52F-467C-8E3D-C4579291692E}"
+
+# PKEY_Device_FriendlyName (fmtid, pid)
+PKEY_DEVICE_FRIENDLY_NAME = ("{A45C254E-DF1C-4EFD-8020-67D146A850E0}", 14)
+# PKEY_AudioEndpoint_FormFactor (fmtid, pid): speakers, headset, microphone, ...
+PKEY_AUDIOENDPOINT_FORM_FACTOR = ("{1DA5D803-D492-4EDD-8C23-E0C0FFEE7F0E}", 0)
+
+# Fields enumerate_endpoints() can project; only the requested ones are read
+ENDPOINT_FIELDS = ("id", "name", "state", "form_factor")
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Remembers which PolicyConfig CLSID/interface pair works on this machine
+STRATEGY_PATH = PROJECT_ROOT / "config" / "com_strategy.json"
+
+# PolicyConfig CLSIDs (undocumented, stable since Vista)
+CLSID_PolicyConfigClient = "{870AF99C-171D-4F9E-AF0D-E63DF40C2BC9}"
+CLSID_CPolicyConfigVistaClient = "{294935CE-F637-4E7C-A41B-AB255460B862}"
+
+# HRESULTs meaning a cached COM object can no longer be used and must be recreated
+STALE_HRESULTS = frozenset(
+    {
+        0x80010007,  # RPC_E_SERVER_DIED
+        0x80010012,  # RPC_E_SERVER_DIED_DNE
+        0x80010108,  # RPC_E_DISCONNECTED
+        0x8001010E,  # RPC_E_WRONG_THREAD
+        0x800401FD,  # CO_E_OBJNOTCONNECTED
+        0x800706BA,  # RPC_S_SERVER_UNAVAILABLE
+        0x800706BE,  # RPC_S_CALL_FAILED
+        0x88890004,  # AUDCLNT_E_DEVICE_INVALIDATED
+    }
+)
+
+
+# COM interface definitions, built once per process. On hosts without comtypes
+# (Linux CI) they stay None and all COM paths report failure.
+try:
+    from ctypes import HRESULT, c_int, c_void_p
+    from ctypes.wintypes import BOOL, LPCWSTR
+
+    import comtypes
+    from comtypes import COMMETHOD, GUID
+
+    class IPolicyConfig(comtypes.IUnknown):
+        _iid_ = GUID("{F8679F50-850A-41CF-9C72-430F290290C8}")
+        _methods_ = [
+            COMMETHOD([], HRESULT, "SetDefaultEndpoint", ([], LPCWSTR, "wszDeviceId"), ([], c_int, "role")),
+        ]
+
+    # More complete Vista interface definition with correct vtable order
+    class IPolicyConfigVista(comtypes.IUnknown):
+        _iid_ = GUID("{568B9108-44BF-40B4-9006-86AFE5B5A620}")
+        _methods_ = [
+            COMMETHOD([], HRESULT, "GetMixFormat", ([], LPCWSTR, "dev"), ([], c_void_p, "ppFormat")),
+            COMMETHOD([], HRESULT, "GetDeviceFormat", ([], LPCWSTR, "dev"), ([], c_int, "bDefault"), ([], c_void_p, "ppFormat")),
+            COMMETHOD([], HRESULT, "SetDeviceFormat", ([], LPCWSTR, "dev"), ([], c_void_p, "pEndpointFormat"), ([], c_void_p, "pMixFormat")),
+            COMMETHOD([], HRESULT, "GetProcessingPeriod", ([], LPCWSTR, "dev"), ([], c_int, "bDefault"), ([], c_void_p, "pmftDefaultPeriod"), ([], c_void_p, "pmftMinimumPeriod")),
+            COMMETHOD([], HRESULT, "SetProcessingPeriod", ([], LPCWSTR, "dev"), ([], c_void_p, "pmftPeriod")),
+            COMMETHOD([], HRESULT, "GetShareMode", ([], LPCWSTR, "dev"), ([], c_void_p, "pMode")),
+            COMMETHOD([], HRESULT, "SetShareMode", ([], LPCWSTR, "dev"), ([], c_void_p, "pMode")),
+            COMMETHOD([], HRESULT, "GetPropertyValue", ([], LPCWSTR, "dev"), ([], c_void_p, "key"), ([], c_void_p, "pv")),
+            COMMETHOD([], HRESULT, "SetPropertyValue", ([], LPCWSTR, "dev"), ([], c_void_p, "key"), ([], c_void_p, "pv")),
+            COMMETHOD([], HRESULT, "SetDefaultEndpoint", ([], LPCWSTR, "wszDeviceId"), ([], c_int, "role")),
+            COMMETHOD([], HRESULT, "SetEndpointVisibility", ([], LPCWSTR, "dev"), ([], BOOL, "bVisible")),
+        ]
+
+except Exception:  # pragma: no cover - optional dependency path
+    IPolicyConfig = None  # type: ignore[assignment,misc]
+    IPolicyConfigVista = None  # type: ignore[assignment,misc]
+
+
+def _hresult_of(exc: BaseException) -> int | None:
+    """Extract an unsigned HRESULT from a COMError/OSError, if present."""
+    hr = getattr(exc, "hresult", None)
+    if hr is None:
+        hr = getattr(exc, "winerror", None)
+    if hr is None and exc.args and isinstance(exc.args[0], int):
+        hr = exc.args[0]
+    return hr & 0xFFFFFFFF if isinstance(hr, int) else None
+
+
+def _is_stale(exc: BaseException) -> bool:
+    return _hresult_of(exc) in STALE_HRESULTS
+
+
+# Most recent failing HRESULT per thread (read by trace recording, which clears
+# it before each call); work done on the VolumeController thread is handed back
+# to the thread waiting for it
+_hresults = threading.local()
+
+
+def _note_hresult(exc_or_hr: BaseException | int) -> None:
+    hr = exc_or_hr & 0xFFFFFFFF if isinstance(exc_or_hr, int) else _hresult_of(exc_or_hr)
+    if hr is not None:
+        _hresults.last = hr
+        incr("hresult", f"0x{hr:08X}")
+
+
+def last_hresult() -> int | None:
+    """The most recent failing HRESULT of a COM call made by this module on the calling thread, if any."""
+    return getattr(_hresults, "last", None)
+
+
+def set_last_hresult(value: int | None) -> None:
+    """Set (None: clear) the calling thread's last_hresult(), e.g. before a call."""
+    _hresults.last = value
+
+
+def _co_create(clsid: str, interface: Any) -> Any:
+    import comtypes.client as cc
+    from comtypes import GUID
+
+    return cc.CreateObject(GUID(clsid), interface=interface)
+
+
+def _ensure_com_initialized() -> None:
+    """CoInitialize the calling thread once (comtypes only does this for the importing thread)."""
+    if threading.current_thread() is threading.main_thread():
+        return
+    try:
+        import comtypes
+
+        comtypes.CoInitialize()
+    except Exception:
+        pass
+
+
+class ComObjectCache:
+    """Thread-affine cache of COM objects keyed by (clsid, interface).
+
+    COM objects are bound to the apartment of the thread that created them, so each
+    thread gets its own entries. Callers use `call()`, which drops the entry and
+    retries once when the object turned stale (see STALE_HRESULTS).
+    """
+
+    def __init__(self, factory: Any = None) -> None:
+        self._factory = factory or _co_create
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _objects(self) -> dict[tuple[str, Any], Any]:
+        objects = getattr(self._local, "objects", None)
+        if objects is None:
+            _ensure_com_initialized()
+            objects = self._local.objects = {}
+        return objects
+
+    def get(self, clsid: str, interface: Any) -> Any:
+        objects = self._objects()
+        key = (clsid, interface)
+        obj = objects.get(key)
+        if obj is not None:
+            with self._lock:
+                self.hits += 1
+            return obj
+        with self._lock:
+            self.misses += 1
+        obj = self._factory(clsid, interface)
+        objects[key] = obj
+        return obj
+
+    def invalidate(self, clsid: str | None = None, interface: Any = None) -> None:
+        """Drop this thread's cached objects (all, or one clsid/interface pair)."""
+        objects = self._objects()
+        keys = [k for k in objects if clsid is None or k == (clsid, interface)]
+        for k in keys:
+            del objects[k]
+        with self._lock:
+            self.invalidations += len(keys)
+
+    def call(self, clsid: str, interface: Any, fn: Any) -> Any:
+        """Run fn(obj) on the cached object; recreate it once on a stale HRESULT."""
+        try:
+            return fn(self.get(clsid, interface))
+        except Exception as e:
+            _note_hresult(e)
+            if not _is_stale(e):
+                raise
+            self.invalidate(clsid, interface)
+            return fn(self.get(clsid, interface))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "invalidations": self.invalidations}
+
+
+_com_cache = ComObjectCache()
+
+
+def com_cache_stats() -> dict[str, int]:
+    """Hit/miss/invalidation counters of the process-wide COM object cache."""
+    return _com_cache.stats()
+
+
+def reset_com_cache() -> None:
+    """Release the calling thread's cached COM objects."""
+    _com_cache.invalidate()
+
+
+def _mmdevice_enumerator_iface() -> Any:
+    from pycaw.pycaw import IMMDeviceEnumerator  # type: ignore
+
+    return IMMDeviceEnumerator
 
 
 def _safe_import_pycaw():
@@ -44,204 +263,980 @@ def _safe_import_pycaw():
         return None, None, None
 
 
-def _soundvolumeview_path() -> Path | None:
-    # Prefer local tools folder
-    candidate = Path("tools") / "SoundVolumeView.exe"
-    if candidate.exists():
-        return candidate
-    # As a fallback, rely on PATH (not resolved here); caller will attempt run
+def pregenerate_com_wrappers() -> dict[str, Any]:
+    """Generate the comtypes typelib wrappers (comtypes.gen) ahead of time.
+
+    comtypes writes them on the first `import comtypes.client` / pycaw import,
+    which makes the first CLI or GUI start after an install slow; `/init` calls
+    this once so later starts only import the cached modules.
+    """
+    import sys
+
+    try:
+        import comtypes.client  # type: ignore
+
+        comtypes.client.GetModule("stdole2.tlb")
+        import pycaw.pycaw  # type: ignore  # noqa: F401
+    except Exception as e:  # pragma: no cover - optional dependency path
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    modules = sorted(name for name in sys.modules if name.startswith("comtypes.gen."))
+    return {"ok": True, "gen_dir": str(getattr(comtypes.client, "gen_dir", "") or ""), "modules": modules}
+
+
+def _with_enumerator(fn: Any) -> Any:
+    """Run fn(enumerator) on the cached IMMDeviceEnumerator; None if COM is unavailable."""
+    try:
+        iface = _mmdevice_enumerator_iface()
+    except Exception:
+        return None
+    try:
+        return _com_cache.call(CLSID_MMDeviceEnumerator, iface, fn)
+    except Exception:
+        return None
+
+
+def _endpoint_id(endpoint: Any) -> str | None:
+    try:
+        return str(endpoint.GetId())
+    except Exception:
+        for attr in ("id", "Id"):
+            if hasattr(endpoint, attr):
+                try:
+                    return str(getattr(endpoint, attr))
+                except Exception:
+                    pass
     return None
 
 
-def _split_devices_by_flow(all_devices: list[Any]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
-    """Split devices into playback (Render) and recording (Capture) by checking endpoint IDs."""
-    render_ids = _ids_for_flow(E_RENDER)
-    capture_ids = _ids_for_flow(E_CAPTURE)
-    playback: list[dict[str, Any]] = []
-    recording: list[dict[str, Any]] = []
-    for dev in all_devices:
-        try:
-            name = str(dev.FriendlyName) if getattr(dev, "FriendlyName", None) is not None else "(Unbenannt)"
-            id_ = str(dev.id)
-            entry = {"id": id_, "name": name}
-            if id_ in render_ids:
-                playback.append(entry)
-            elif id_ in capture_ids:
-                recording.append(entry)
-            else:
-                # Fallback heuristic if ID wasn't found in either set
-                lname = name.lower()
-                if any(k in lname for k in ("microphone", "mikro", "aufnah", "record", "line-in", "line in", "eingang", "stereo mix", "output")):
-                    recording.append(entry)
-                else:
-                    playback.append(entry)
-        except Exception:
-            continue
-    # Consistent sort by name (case-insensitive)
-    playback.sort(key=lambda d: (d.get("name") or "").casefold())
-    recording.sort(key=lambda d: (d.get("name") or "").casefold())
-    return playback, recording
+class _PropertyKey:
+    """PROPERTYKEY stand-in for property stores that accept any fmtid/pid object (stubs)."""
 
+    __slots__ = ("fmtid", "pid")
 
-def list_playback_devices() -> list[dict[str, Any]]:
-    _, AudioUtilities, _ = _safe_import_pycaw()
-    if AudioUtilities is None:
-        return []
-    all_devices = AudioUtilities.GetAllDevices()  # type: ignore[attr-defined]
-    playback, _ = _split_devices_by_flow(all_devices)
-    return playback
+    def __init__(self, fmtid: str, pid: int) -> None:
+        self.fmtid = fmtid
+        self.pid = pid
 
 
-def list_recording_devices() -> list[dict[str, Any]]:
-    _, AudioUtilities, _ = _safe_import_pycaw()
-    if AudioUtilities is None:
-        return []
-    all_devices = AudioUtilities.GetAllDevices()  # type: ignore[attr-defined]
-    _, recording = _split_devices_by_flow(all_devices)
-    return recording
+_property_keys: dict[tuple[str, int], Any] = {}
 
 
-def _resolve_device_id(identifier: str) -> str | None:
-    """Try to resolve a user-supplied identifier (id or name) to an endpoint id."""
-    _, AudioUtilities, _ = _safe_import_pycaw()
-    if AudioUtilities is None:
+def _property_key(pkey: tuple[str, int]) -> Any:
+    """PROPERTYKEY for IPropertyStore.GetValue, built once per key."""
+    key = _property_keys.get(pkey)
+    if key is None:
+        fmtid, pid = pkey
+        try:
+            from comtypes import GUID
+            from pycaw.api.mmdeviceapi.depend.structures import PROPERTYKEY
+
+            key = PROPERTYKEY()
+            key.fmtid = GUID(fmtid)
+            key.pid = pid
+        except Exception:
+            key = _PropertyKey(fmtid, pid)
+        _property_keys[pkey] = key
+    return key
+
+
+def _read_property(store: Any, pkey: tuple[str, int]) -> Any:
+    """Read one property by key; walks the store if the direct lookup fails."""
+    try:
+        value = store.GetValue(_property_key(pkey))
+    except Exception:
+        # Some drivers' stores reject a foreign PROPERTYKEY: find the store's own key
+        fmtid, pid = pkey
+        value = None
+        try:
+            for j in range(store.GetCount()):
+                pk = store.GetAt(j)
+                if int(pk.pid) == pid and str(pk.fmtid).upper() == fmtid:
+                    value = store.GetValue(pk)
+                    break
+        except Exception:
+            return None
+        if value is None:
+            return None
+    try:
+        result = value.GetValue()
+    except Exception:
         return None
     try:
-        all_devices = AudioUtilities.GetAllDevices()  # type: ignore[attr-defined]
+        value.clear()
+    except Exception:
+        pass
+    return result
+
+
+def _friendly_name(dev: Any) -> str | None:
+    """Read PKEY_Device_FriendlyName of one endpoint."""
+    try:
+        name = _read_property(dev.OpenPropertyStore(0), PKEY_DEVICE_FRIENDLY_NAME)  # STGM_READ
     except Exception:
         return None
-    ident_lower = identifier.lower()
-    exact_id = None
-    by_name = None
-    for dev in all_devices:
+    return str(name) if name is not None else None
+
+
+def _project_endpoint(dev: Any, id_: str, fields: tuple[str, ...]) -> dict[str, Any]:
+    entry: dict[str, Any] = {"id": id_}
+    if "state" in fields:
         try:
-            dev_id = str(dev.id)
-            dev_name = str(dev.FriendlyName)
-            if identifier == dev_id:
-                exact_id = dev_id
-                break
-            if by_name is None and (ident_lower == dev_name.lower() or ident_lower in dev_name.lower()):
-                by_name = dev_id
+            entry["state"] = int(dev.GetState())
         except Exception:
-            continue
-    return exact_id or by_name
+            entry["state"] = None
+    if "name" in fields or "form_factor" in fields:
+        try:
+            store = dev.OpenPropertyStore(0)  # STGM_READ
+        except Exception:
+            store = None
+        if "name" in fields:
+            name = _read_property(store, PKEY_DEVICE_FRIENDLY_NAME) if store is not None else None
+            entry["name"] = str(name) if name is not None else "(Unbenannt)"
+        if "form_factor" in fields:
+            ff = _read_property(store, PKEY_AUDIOENDPOINT_FORM_FACTOR) if store is not None else None
+            entry["form_factor"] = int(ff) if ff is not None else None
+    return entry
+
+
+@timed("enumerate")
+def enumerate_endpoints(
+    flow: int = E_ALL,
+    state_mask: int = DEVICE_STATE_ACTIVE,
+    fields: tuple[str, ...] = ("id", "name"),
+    enumerator: Any | None = None,
+    breaker: CircuitBreaker | None = None,
+) -> list[dict[str, Any]]:
+    """Endpoints matching `flow`/`state_mask`, reading only the requested `fields`.
+
+    Unlike pycaw's AudioUtilities.GetAllDevices() this neither visits inactive
+    endpoints (unless `state_mask` asks for them) nor reads whole property
+    stores: each requested property is fetched by its PROPERTYKEY. "id" is always
+    included. With a breaker, endpoints whose property reads keep stalling are
+    skipped. Returns [] if COM is unavailable.
+    """
+    unknown = set(fields) - set(ENDPOINT_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown endpoint field(s): {', '.join(sorted(unknown))}")
+    return _enumerate_endpoints(flow, state_mask, tuple(fields), enumerator, breaker)
 
 
-def _get_default_id(flow: int) -> str | None:
-    try:
-        import comtypes.client as cc
-        from pycaw.pycaw import IMMDeviceEnumerator  # type: ignore
+def _enumerate_endpoints(flow: int, state_mask: int, fields: tuple[str, ...], enumerator: Any | None, breaker: CircuitBreaker | None) -> list[dict[str, Any]]:
+    def run(enum: Any) -> list[dict[str, Any]]:
+        entries: list[dict[str, Any]] = []
+        try:
+            coll = enum.EnumAudioEndpoints(flow, state_mask)
+            count = coll.GetCount()
+        except Exception as e:
+            if _is_stale(e):
+                raise
+            return entries
+        for i in range(count):
+            try:
+                dev = coll.Item(i)
+                id_ = _endpoint_id(dev)
+                if id_ is None:
+                    continue
+                if breaker is None:
+                    entries.append(_project_endpoint(dev, id_, fields))
+                elif breaker.allow(id_):
+                    with breaker.track(id_):
+                        entries.append(_project_endpoint(dev, id_, fields))
+            except Exception:
+                continue
+        return entries
 
-        enum = cc.CreateObject(CLSID_MMDeviceEnumerator, interface=IMMDeviceEnumerator)
-        # Try Multimedia, then Console, then Communications
-        for role in (E_MULTIMEDIA, E_CONSOLE, E_COMMUNICATIONS):
+    if enumerator is not None:
+        return run(enumerator)
+    return _with_enumerator(run) or []
+
+
+def _endpoints_for_flow(enum: Any, flow: int, breaker: CircuitBreaker | None = None) -> list[dict[str, Any]]:
+    """Active endpoints for one flow as {"id", "name"} entries sorted by name."""
+    entries = _enumerate_endpoints(flow, DEVICE_STATE_ACTIVE, ("id", "name"), enum, breaker)
+    # Consistent sort by name (case-insensitive)
+    entries.sort(key=lambda d: (d.get("name") or "").casefold())
+    return entries
+
+
+def _defaults_for_flow(enum: Any, flow: int, roles: tuple[int, ...] = (E_CONSOLE, E_MULTIMEDIA, E_COMMUNICATIONS)) -> dict[int, str | None]:
+    defaults: dict[int, str | None] = {}
+    for role in roles:
+        try:
+            defaults[role] = _endpoint_id(enum.GetDefaultAudioEndpoint(flow, role))
+        except Exception as e:
+            if _is_stale(e):
+                raise
+            defaults[role] = None
+    return defaults
+
+
+def _preferred_default(defaults: dict[int, str | None]) -> str | None:
+    for role in DEFAULT_ROLE_ORDER:
+        if defaults.get(role):
+            return defaults[role]
+    return None
+
+
+@dataclass(frozen=True)
+class DeviceSnapshot:
+    """Playback/recording endpoints and per-role defaults from one enumeration pass.
+
+    `defaults` maps "playback"/"recording" to {role: endpoint id or None}.
+    `taken_at` is a `time.monotonic()` timestamp.
+    """
+
+    playback: list[dict[str, Any]] = field(default_factory=list)
+    recording: list[dict[str, Any]] = field(default_factory=list)
+    defaults: dict[str, dict[int, str | None]] = field(default_factory=dict)
+    taken_at: float = 0.0
+
+    @property
+    def default_playback_id(self) -> str | None:
+        return _preferred_default(self.defaults.get("playback", {}))
+
+    @property
+    def default_recording_id(self) -> str | None:
+        return _preferred_default(self.defaults.get("recording", {}))
+
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+    @cached_property
+    def index(self) -> Any:
+        """Name/id resolver index over this snapshot (audio.resolver.DeviceIndex), built on first use."""
+        from audio.resolver import DeviceIndex
+
+        return DeviceIndex.from_snapshot(self)
+
+
+@timed("enumerate")
+def take_snapshot(enumerator: Any | None = None, breaker: CircuitBreaker | None = None) -> DeviceSnapshot:
+    """Enumerate playback/recording endpoints and defaults with one enumerator.
+
+    `enumerator` may be any object exposing EnumAudioEndpoints/GetDefaultAudioEndpoint
+    (e.g. a stub on non-Windows hosts); by default the cached COM IMMDeviceEnumerator
+    is used. `breaker` defaults to the process-wide device breaker, so endpoints that
+    keep stalling are left out until their cool-down expires. Returns an empty
+    snapshot if COM is unavailable.
+    """
+    breaker = breaker or device_breaker()
+
+    def build(enum: Any) -> DeviceSnapshot:
+        return DeviceSnapshot(
+            playback=_endpoints_for_flow(enum, E_RENDER, breaker),
+            recording=_endpoints_for_flow(enum, E_CAPTURE, breaker),
+            defaults={
+                "playback": _defaults_for_flow(enum, E_RENDER),
+                "recording": _defaults_for_flow(enum, E_CAPTURE),
+            },
+            taken_at=time.monotonic(),
+        )
+
+    if enumerator is not None:
+        return build(enumerator)
+    snap = _with_enumerator(build)
+    return snap if snap is not None else DeviceSnapshot(taken_at=time.monotonic())
+
+
+def _flow_from_id(device_id: str) -> int | None:
+    """Endpoint ids look like "{0.0.<flow>.00000000}.{guid}"; read the flow digit."""
+    if device_id.startswith("{0.0.") and len(device_id) > 5 and device_id[5] in "01":
+        return int(device_id[5])
+    return None
+
+
+def _describe_endpoint(device_id: str) -> dict[str, Any] | None:
+    """Read id, name, flow and state of a single endpoint via COM."""
+
+    def describe(enum: Any) -> dict[str, Any] | None:
+        dev = enum.GetDevice(device_id)
+        try:
+            state = int(dev.GetState())
+        except Exception:
+            state = 0
+        return {
+            "id": device_id,
+            "name": _friendly_name(dev) or "(Unbenannt)",
+            "flow": _flow_from_id(device_id),
+            "state": state,
+        }
+
+    return _with_enumerator(describe)
+
+
+@dataclass(frozen=True)
+class DeviceEvent:
+    """Base class of the change events published by DeviceTable."""
+
+    device_id: str | None
+
+
+@dataclass(frozen=True)
+class DeviceAdded(DeviceEvent):
+    flow: int | None = None
+    name: str | None = None
+
+
+@dataclass(frozen=True)
+class DeviceRemoved(DeviceEvent):
+    flow: int | None = None
+
+
+@dataclass(frozen=True)
+class DeviceStateChanged(DeviceEvent):
+    state: int = 0
+    flow: int | None = None
+
+
+@dataclass(frozen=True)
+class DeviceRenamed(DeviceEvent):
+    name: str | None = None
+    old_name: str | None = None
+    flow: int | None = None
+
+
+@dataclass(frozen=True)
+class DefaultDeviceChanged(DeviceEvent):
+    flow: int = E_RENDER
+    role: int = E_MULTIMEDIA
+
+
+class DeviceTable:
+    """In-memory endpoint table kept current by IMMNotificationClient callbacks.
+
+    Seed it with `load(snapshot)`; afterwards the `on_*` handlers apply each
+    notification incrementally and publish a typed DeviceEvent to subscribers.
+    Reads (`get`, `default_id`, `snapshot`) never touch COM. `describe(device_id)`
+    is only called for endpoints the table has not seen yet (OnDeviceAdded).
+    Notifications arrive on COM worker threads; subscribers run on that thread.
+    """
+
+    def __init__(self, describe: Any = None) -> None:
+        self._describe = describe or _describe_endpoint
+        self._lock = threading.RLock()
+        self._devices: dict[str, dict[str, Any]] = {}
+        self._defaults: dict[tuple[int, int], str | None] = {}
+        self._subscribers: list[Any] = []
+        self._snapshot: DeviceSnapshot | None = None
+        self._client: Any = None
+        self._enumerator: Any = None
+
+    # -- seeding / reads -------------------------------------------------
+    def load(self, snapshot: DeviceSnapshot) -> None:
+        with self._lock:
+            self._devices = {}
+            for flow, entries in ((E_RENDER, snapshot.playback), (E_CAPTURE, snapshot.recording)):
+                for entry in entries:
+                    self._devices[entry["id"]] = {"id": entry["id"], "name": entry["name"], "flow": flow, "state": DEVICE_STATE_ACTIVE}
+            self._defaults = {}
+            for flow, key in ((E_RENDER, "playback"), (E_CAPTURE, "recording")):
+                for role, id_ in snapshot.defaults.get(key, {}).items():
+                    self._defaults[(flow, role)] = id_
+            self._snapshot = None
+
+    def get(self, device_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            dev = self._devices.get(device_id)
+            return dict(dev) if dev else None
+
+    def default_id(self, flow: int, role: int | None = None) -> str | None:
+        with self._lock:
+            if role is not None:
+                return self._defaults.get((flow, role))
+            return _preferred_default({r: self._defaults.get((flow, r)) for r in DEFAULT_ROLE_ORDER})
+
+    def snapshot(self) -> DeviceSnapshot:
+        """Current table as a DeviceSnapshot (rebuilt only after a change)."""
+        with self._lock:
+            if self._snapshot is None:
+                lists: dict[int, list[dict[str, Any]]] = {E_RENDER: [], E_CAPTURE: []}
+                for dev in self._devices.values():
+                    if dev["state"] & DEVICE_STATE_ACTIVE and dev["flow"] in lists:
+                        lists[dev["flow"]].append({"id": dev["id"], "name": dev["name"]})
+                for entries in lists.values():
+                    entries.sort(key=lambda d: (d.get("name") or "").casefold())
+                roles = (E_CONSOLE, E_MULTIMEDIA, E_COMMUNICATIONS)
+                self._snapshot = DeviceSnapshot(
+                    playback=lists[E_RENDER],
+                    recording=lists[E_CAPTURE],
+                    defaults={
+                        "playback": {r: self._defaults.get((E_RENDER, r)) for r in roles},
+                        "recording": {r: self._defaults.get((E_CAPTURE, r)) for r in roles},
+                    },
+                    taken_at=time.monotonic(),
+                )
+            return self._snapshot
+
+    # -- subscribers -----------------------------------------------------
+    def subscribe(self, callback: Any) -> Any:
+        """Register callback(event); returns a function that unsubscribes it."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _publish(self, event: DeviceEvent) -> None:
+        with self._lock:
+            self._snapshot = None
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
             try:
-                endpoint = enum.GetDefaultAudioEndpoint(flow, role)
-                try:
-                    return str(endpoint.GetId())
-                except Exception:
-                    for attr in ("id", "Id"):
-                        if hasattr(endpoint, attr):
-                            try:
-                                return str(getattr(endpoint, attr))
-                            except Exception:
-                                pass
+                callback(event)
             except Exception:
                 continue
+
+    # -- notification handlers (IMMNotificationClient) --------------------
+    def on_device_added(self, device_id: str) -> None:
+        with self._lock:
+            known = device_id in self._devices
+        info = None if known else self._describe(device_id)
+        with self._lock:
+            if info:
+                self._devices[device_id] = {
+                    "id": device_id,
+                    "name": info.get("name") or "(Unbenannt)",
+                    "flow": info.get("flow", _flow_from_id(device_id)),
+                    "state": int(info.get("state", DEVICE_STATE_ACTIVE)),
+                }
+            dev = self._devices.get(device_id, {})
+        self._publish(DeviceAdded(device_id, flow=dev.get("flow"), name=dev.get("name")))
+
+    def on_device_removed(self, device_id: str) -> None:
+        with self._lock:
+            dev = self._devices.pop(device_id, None)
+        self._publish(DeviceRemoved(device_id, flow=dev.get("flow") if dev else _flow_from_id(device_id)))
+
+    def on_device_state_changed(self, device_id: str, new_state: int) -> None:
+        with self._lock:
+            dev = self._devices.get(device_id)
+            if dev is not None:
+                dev["state"] = int(new_state)
+            flow = dev["flow"] if dev else _flow_from_id(device_id)
+        if dev is None and new_state & DEVICE_STATE_ACTIVE:
+            # Endpoint was not in the table (e.g. seeded with active devices only)
+            self.on_device_added(device_id)
+            return
+        self._publish(DeviceStateChanged(device_id, state=int(new_state), flow=flow))
+
+    def on_default_device_changed(self, flow: int, role: int, device_id: str | None) -> None:
+        with self._lock:
+            self._defaults[(int(flow), int(role))] = device_id or None
+        self._publish(DefaultDeviceChanged(device_id or None, flow=int(flow), role=int(role)))
+
+    def on_property_value_changed(self, device_id: str, key: Any) -> None:
+        fmtid, pid = PKEY_DEVICE_FRIENDLY_NAME
+        try:
+            if int(key.pid) != pid or str(key.fmtid).upper() != fmtid:
+                return
+        except Exception:
+            return
+        info = self._describe(device_id)
+        with self._lock:
+            dev = self._devices.get(device_id)
+            if not info or dev is None or dev["name"] == info.get("name"):
+                return
+            old_name = dev["name"]
+            dev["name"] = info.get("name") or old_name
+            # Built under the lock: a concurrent handler may change the entry afterwards
+            event = DeviceRenamed(device_id, name=dev["name"], old_name=old_name, flow=dev["flow"])
+        self._publish(event)
+
+    # -- COM registration ------------------------------------------------
+    @property
+    def live(self) -> bool:
+        return self._client is not None
+
+    def start(self) -> bool:
+        """Register an IMMNotificationClient; False if COM notifications are unavailable."""
+        if self._client is not None:
+            return True
+        client_cls = _notification_client_class()
+        if client_cls is None:
+            return False
+        try:
+            iface = _mmdevice_enumerator_iface()
+            # Dedicated enumerator: it must outlive the registration
+            self._enumerator = _co_create(CLSID_MMDeviceEnumerator, iface)
+            client = client_cls(self)
+            self._enumerator.RegisterEndpointNotificationCallback(client)
+            self._client = client
+            return True
+        except Exception:
+            self._enumerator = None
+            return False
+
+    def stop(self) -> None:
+        if self._client is None:
+            return
+        try:
+            self._enumerator.UnregisterEndpointNotificationCallback(self._client)
+        except Exception:
+            pass
+        self._client = None
+        self._enumerator = None
+
+
+_notification_client_cls: Any = None
+
+
+def _notification_client_class() -> Any:
+    """COMObject implementing IMMNotificationClient that forwards to a DeviceTable."""
+    global _notification_client_cls
+    if _notification_client_cls is not None:
+        return _notification_client_cls
+    try:
+        import comtypes
+        from pycaw.api.mmdeviceapi import IMMNotificationClient  # type: ignore
     except Exception:
         return None
-    return None
 
+    class _NotificationClient(comtypes.COMObject):
+        _com_interfaces_ = [IMMNotificationClient]
+
+        def __init__(self, table: DeviceTable) -> None:
+            super().__init__()
+            self._table = table
+
+        def OnDeviceStateChanged(self, pwstrDeviceId: str, dwNewState: int) -> int:
+            self._table.on_device_state_changed(str(pwstrDeviceId), int(dwNewState))
+            return 0
+
+        def OnDeviceAdded(self, pwstrDeviceId: str) -> int:
+            self._table.on_device_added(str(pwstrDeviceId))
+            return 0
+
+        def OnDeviceRemoved(self, pwstrDeviceId: str) -> int:
+            self._table.on_device_removed(str(pwstrDeviceId))
+            return 0
+
+        def OnDefaultDeviceChanged(self, flow: int, role: int, pwstrDefaultDeviceId: str | None) -> int:
+            self._table.on_default_device_changed(flow, role, str(pwstrDefaultDeviceId) if pwstrDefaultDeviceId else None)
+            return 0
+
+        def OnPropertyValueChanged(self, pwstrDeviceId: str, key: Any) -> int:
+            self._table.on_property_value_changed(str(pwstrDeviceId), key)
+            return 0
+
+    _notification_client_cls = _NotificationClient
+    return _notification_client_cls
 
+
+def watch_devices(table: DeviceTable | None = None) -> DeviceTable:
+    """Seed a DeviceTable from a fresh snapshot and start COM notifications.
+
+    Check `table.live` to see whether notifications are active; if not, the table
+    still serves the seeded snapshot and can be reloaded with `load()`.
+    """
+    global _live_table
+    table = table or DeviceTable()
+    table.load(take_snapshot())
+    if table.start():
+        if _live_table is not table:
+            table.subscribe(_on_device_event)
+        _live_table = table
+    return table
+
+
+def list_playback_devices() -> list[dict[str, Any]]:
+    return list(take_snapshot().playback)
+
+
+def list_recording_devices() -> list[dict[str, Any]]:
+    return list(take_snapshot().recording)
+
+
+def take_snapshot_within(timeout: float = DEFAULT_TIMEOUT) -> CallResult:
+    """take_snapshot() bounded by `timeout`; CallResult.value is the DeviceSnapshot.
+
+    If the enumeration stalls, the endpoint being read at that moment is recorded
+    as a stall in the device breaker.
+    """
+    return call_with_deadline(take_snapshot, timeout=timeout)
+
+
+def set_default_within(device_identifier: str, flow: str, timeout: float = DEFAULT_TIMEOUT) -> CallResult:
+    """set_default_playback/recording bounded by `timeout`, with the per-device breaker.
+
+    flow: 'render' or 'capture'. Returns CallResult(skipped=True) while the endpoint's
+    breaker is open. The breaker is keyed by endpoint id, as take_snapshot() keys it;
+    a name is resolved against the cached snapshot first.
+    """
+    fn = set_default_playback if flow == "render" else set_default_recording
+    key = _resolve_device_id(device_identifier, flow="playback" if flow == "render" else "recording") or device_identifier
+    return call_with_deadline(fn, key, timeout=timeout, key=key)
+
+
+_snapshot_cache: DeviceSnapshot | None = None
+_live_table: DeviceTable | None = None
+
+
+def current_snapshot(max_age: float = 2.0) -> DeviceSnapshot:
+    """Snapshot for lookups: the live DeviceTable if watching, else a cached take_snapshot()."""
+    global _snapshot_cache
+    if _live_table is not None and _live_table.live:
+        return _live_table.snapshot()
+    snap = _snapshot_cache
+    if snap is None or snap.age() > max_age:
+        snap = _snapshot_cache = take_snapshot()
+    return snap
+
+
+@timed("resolve")
+def resolve_device(identifier: str, flow: str | None = None, snapshot: DeviceSnapshot | None = None) -> Any:
+    """Ranked candidates (audio.resolver.Resolution) for an id or name.
+
+    flow: "playback", "recording" or None for both.
+    """
+    snap = snapshot or current_snapshot()
+    return snap.index.resolve(identifier, flow=flow)
+
+
+def _resolve_device_id(identifier: str, flow: str | None = None) -> str | None:
+    """Try to resolve a user-supplied identifier (id or name) to an endpoint id."""
+    id_flow = _flow_from_id(identifier)
+    if id_flow is not None and (flow is None or (id_flow == E_RENDER) == (flow == "playback")):
+        # Already an endpoint id (SessionBackend, compiled plans): no snapshot needed
+        return identifier
+    # No retry across flows: a playback setter must never pick a recording endpoint
+    return resolve_device(identifier, flow=flow).device_id
+
+
+def _get_default_id(flow: int) -> str | None:
+    def lookup(enum: Any) -> str | None:
+        # Try Multimedia, then Console, then Communications
+        for role in DEFAULT_ROLE_ORDER:
+            try:
+                found = _endpoint_id(enum.GetDefaultAudioEndpoint(flow, role))
+            except Exception as e:
+                if _is_stale(e):
+                    raise
+                continue
+            if found:
+                return found
+        return None
+
+    return _with_enumerator(lookup)
+
+
+@timed("get_default")
 def get_default_playback_id() -> str | None:
     return _get_default_id(E_RENDER)
 
 
+@timed("get_default")
 def get_default_recording_id() -> str | None:
     return _get_default_id(E_CAPTURE)
 
 
+def _is_default(device_id: str, flow: str, role: int = E_MULTIMEDIA) -> bool:
+    """True if `device_id` is the default endpoint of `role` (SvvAction.verify)."""
+    data_flow = E_RENDER if flow == "render" else E_CAPTURE
+    return _with_enumerator(lambda enum: _endpoint_id(enum.GetDefaultAudioEndpoint(data_flow, role))) == device_id
+
+
 def _set_default_with_svv(device_name_or_id: str, flow: str) -> bool:
     """Try to set default device via SoundVolumeView.exe.
 
     flow: 'render' (playback) or 'capture' (recording)
     Uses Multimedia role by default.
     """
-    from subprocess import run
-
-    exe = _soundvolumeview_path()
-    cmd = None
-    if exe is not None:
-        # SoundVolumeView supports /SetDefault <Name> <Role> [Render/Capture]
-        # Role: 0=Console, 1=Multimedia, 2=Communications
-        role = 1
-        flow_arg = "Render" if flow == "render" else "Capture"
-        cmd = [str(exe), "/SetDefault", device_name_or_id, str(role), flow_arg]
-    else:
-        # Attempt relying on PATH if user placed it there
-        cmd = ["SoundVolumeView.exe", "/SetDefault", device_name_or_id, "1", "Render" if flow == "render" else "Capture"]
-    try:
-        proc = run(cmd, capture_output=True, text=True)
-        return proc.returncode == 0
-    except Exception:
-        return False
+    from audio.svv import SvvBatch
 
+    incr("fallback", "svv")
+    batch = SvvBatch()
+    batch.set_default(device_name_or_id, flow)
+    return all(r.ok for r in batch.run())
 
+
+@timed("set_default")
 def set_default_playback(device_identifier: str) -> bool:
-    """Set default playback device by name or id using SVV fallback.
+    """Set default playback device by name or id (COM, SVV as fallback).
 
     Returns False if the operation could not be performed.
     """
-    resolved = _resolve_device_id(device_identifier) or device_identifier
-    rep = _debug_try_set_default(resolved)
-    if rep.get("success"):
-        return True
-    return _set_default_with_svv(device_identifier, flow="render")
+    resolved = _resolve_device_id(device_identifier, flow="playback") or device_identifier
+    ok = _set_default_with_com(resolved) or _set_default_with_svv(device_identifier, flow="render")
+    if ok:
+        _default_playback_changed()
+    return ok
 
 
+@timed("set_default")
 def set_default_recording(device_identifier: str) -> bool:
-    """Set default recording device by name or id using SVV fallback.
+    """Set default recording device by name or id (COM, SVV as fallback).
 
     Returns False if the operation could not be performed.
     """
-    resolved = _resolve_device_id(device_identifier) or device_identifier
-    rep = _debug_try_set_default(resolved)
-    if rep.get("success"):
+    resolved = _resolve_device_id(device_identifier, flow="recording") or device_identifier
+    if _set_default_with_com(resolved):
         return True
     return _set_default_with_svv(device_identifier, flow="capture")
 
 
-def set_master_volume(percent: int) -> bool:
-    """Set endpoint master volume (0-100) for default playback device."""
-    CLSCTX_ALL, AudioUtilities, IAudioEndpointVolume = _safe_import_pycaw()
-    if not all((CLSCTX_ALL, AudioUtilities, IAudioEndpointVolume)):
-        return False
-    try:
-        speakers = AudioUtilities.GetSpeakers()  # type: ignore[attr-defined]
-        interface = speakers.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)  # type: ignore[attr-defined]
-        volume = interface.QueryInterface(IAudioEndpointVolume)
-        vol = max(0.0, min(1.0, percent / 100.0))
-        volume.SetMasterVolumeLevelScalar(vol, None)
+@timed("set_default")
+def set_default_role(device_identifier: str, flow: str, role: int) -> bool:
+    """Set the default device of one role (ERole) only; flow: 'playback' or 'recording'.
+
+    Used to restore captured per-role defaults, which set_default_playback/recording
+    would overwrite with a single device. COM first, SoundVolumeView as fallback.
+    """
+    resolved = _resolve_device_id(device_identifier, flow=flow) or device_identifier
+    svv_flow = "render" if flow == "playback" else "capture"
+    ok = _set_default_with_com(resolved, roles=(int(role),))
+    if not ok:
+        from audio.svv import SvvBatch
+
+        incr("fallback", "svv")
+        batch = SvvBatch()
+        batch.set_default(device_identifier, svv_flow, role=str(int(role)))
+        ok = all(r.ok for r in batch.run())
+    if ok:
+        _default_playback_changed(svv_flow, (int(role),))
+    return ok
+
+
+@timed("set_default")
+def set_default_devices(playback: str | None = None, recording: str | None = None) -> dict[str, bool]:
+    """Set default playback and/or recording device (by name or id).
+
+    Both go through COM first; whatever fails is handed to SoundVolumeView in one
+    batched process spawn. Returns {"playback": ok, "recording": ok} for the
+    requested flows.
+    """
+    from audio.svv import SvvBatch
+
+    results: dict[str, bool] = {}
+    batch = SvvBatch()
+    pending: dict[Any, str] = {}
+    for key, flow, identifier in (("playback", "render", playback), ("recording", "capture", recording)):
+        if identifier is None:
+            continue
+        resolved = _resolve_device_id(identifier, flow=key) or identifier
+        results[key] = _set_default_with_com(resolved)
+        if not results[key]:
+            incr("fallback", "svv")
+            pending[batch.set_default(identifier, flow, verify=partial(_is_default, resolved, flow))] = key
+    for res in batch.run():
+        results[pending[res.action]] = res.ok
+    if results.get("playback"):
+        _default_playback_changed()
+    return results
+
+
+def _bind_default_endpoint_volume() -> tuple[str | None, Any] | None:
+    """Activate IAudioEndpointVolume on the default (multimedia) playback endpoint."""
+    CLSCTX_ALL, _, IAudioEndpointVolume = _safe_import_pycaw()
+    if CLSCTX_ALL is None or IAudioEndpointVolume is None:
+        return None
+
+    def activate(enum: Any) -> tuple[str | None, Any]:
+        dev = enum.GetDefaultAudioEndpoint(E_RENDER, E_MULTIMEDIA)
+        interface = dev.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)  # type: ignore[attr-defined]
+        return _endpoint_id(dev), interface.QueryInterface(IAudioEndpointVolume)
+
+    return _with_enumerator(activate)
+
+
+class VolumeController:
+    """Owns the IAudioEndpointVolume handle of the default playback device.
+
+    All COM work happens on one worker thread. `submit_volume()`/`submit_mute()`
+    only store the latest requested value (latest value wins), so a burst of slider
+    events collapses into as many writes as the endpoint can absorb. The handle
+    stays bound until `invalidate()` (the default playback device changed: a
+    DeviceTable notification from watch_devices() or a set_default_* call in this
+    process) or until a write on it fails; writes do not look up the default.
+
+    `bind` returns (device_id, endpoint_volume) or None; defaults to COM.
+    """
+
+    def __init__(self, bind: Any = None) -> None:
+        self._bind_fn = bind or _bind_default_endpoint_volume
+        self._cond = threading.Condition()
+        self._pending: dict[str, Any] = {}
+        self._results: dict[str, bool] = {}
+        # kind -> failing HRESULT of its last write (None: succeeded or no HRESULT)
+        self._hresults: dict[str, int | None] = {}
+        self._seq = 0
+        self._applied_seq = 0
+        self._closed = False
+        self._worker: threading.Thread | None = None
+        self._device_id: str | None = None
+        self._endpoint: Any = None
+        self._last_read: tuple[int | None, bool | None] = (None, None)
+        self.submitted = 0
+        self.writes = 0
+        self.rebinds = 0
+
+    def submit_volume(self, percent: float) -> None:
+        """Queue a master volume change (0-100); returns immediately."""
+        self._submit("volume", max(0.0, min(1.0, float(percent) / 100.0)))
+
+    def submit_mute(self, mute: bool) -> None:
+        self._submit("mute", bool(mute))
+
+    def set_volume(self, percent: float, timeout: float = 2.0) -> bool:
+        """Write the master volume and wait for the result."""
+        self.submit_volume(percent)
+        return self._wait("volume", timeout)
+
+    def set_mute(self, mute: bool, timeout: float = 2.0) -> bool:
+        self.submit_mute(mute)
+        return self._wait("mute", timeout)
+
+    def read_state(self, timeout: float = 2.0) -> tuple[int | None, bool | None]:
+        """(master volume 0-100, mute) of the bound endpoint, read on the worker thread."""
+        self._submit("read", None)
+        if not self._wait("read", timeout):
+            return None, None
+        return self._last_read
+
+    def _wait(self, kind: str, timeout: float) -> bool:
+        """flush(), then the result of `kind`; its HRESULT becomes the caller's last_hresult()."""
+        if not self.flush(timeout):
+            return False
+        with self._cond:
+            ok, hr = self._results.get(kind, False), self._hresults.get(kind)
+        if hr is not None:
+            set_last_hresult(hr)
+        return ok
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything submitted so far has been written (or failed)."""
+        with self._cond:
+            target = self._seq
+            return self._cond.wait_for(lambda: self._applied_seq >= target or self._closed, timeout)
+
+    def invalidate(self) -> None:
+        """Force a rebind before the next write (e.g. after a device change notification)."""
+        with self._cond:
+            self._device_id = None
+            self._endpoint = None
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        return {"submitted": self.submitted, "writes": self.writes, "rebinds": self.rebinds}
+
+    def _submit(self, kind: str, value: Any) -> None:
+        with self._cond:
+            self._pending[kind] = value
+            self._seq += 1
+            self.submitted += 1
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="VolumeController", daemon=True)
+                self._worker.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        _ensure_com_initialized()
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if self._closed:
+                    return
+                pending, self._pending = self._pending, {}
+                seq = self._seq
+            results, hresults = {}, {}
+            for kind, value in pending.items():
+                set_last_hresult(None)
+                results[kind] = self._write(kind, value)
+                hresults[kind] = None if results[kind] else last_hresult()
+            with self._cond:
+                self._results.update(results)
+                self._hresults.update(hresults)
+                self._applied_seq = seq
+                self._cond.notify_all()
+
+    def _ensure_bound(self) -> bool:
+        if self._endpoint is not None:
+            return True
+        bound = self._bind_fn()
+        if not bound:
+            return False
+        self._device_id, self._endpoint = bound
+        self.rebinds += 1
         return True
-    except Exception:
+
+    def _write(self, kind: str, value: Any) -> bool:
+        for _attempt in range(2):
+            if not self._ensure_bound():
+                return False
+            t0 = time.perf_counter_ns()
+            try:
+                if kind == "read":
+                    level = self._endpoint.GetMasterVolumeLevelScalar()
+                    self._last_read = (int(round(float(level) * 100)), bool(self._endpoint.GetMute()))
+                    observe("volume_read", time.perf_counter_ns() - t0)
+                    return True
+                if kind == "volume":
+                    self._endpoint.SetMasterVolumeLevelScalar(value, None)
+                else:
+                    self._endpoint.SetMute(value, None)
+                observe(kind, time.perf_counter_ns() - t0)
+                self.writes += 1
+                return True
+            except Exception as e:
+                _note_hresult(e)
+                # Handle may belong to a removed/invalidated endpoint; rebind once
+                self.invalidate()
         return False
 
 
+_volume_controller: VolumeController | None = None
+_volume_controller_lock = threading.Lock()
+
+
+def volume_controller() -> VolumeController:
+    """Process-wide VolumeController for the default playback device."""
+    global _volume_controller
+    with _volume_controller_lock:
+        if _volume_controller is None:
+            _volume_controller = VolumeController()
+        return _volume_controller
+
+
+def _default_playback_changed(flow: str = "render", roles: tuple[int, ...] = (E_MULTIMEDIA,)) -> None:
+    """Make the VolumeController rebind (it is bound to the multimedia default)."""
+    ctl = _volume_controller
+    if ctl is not None and flow == "render" and E_MULTIMEDIA in roles:
+        ctl.invalidate()
+
+
+def _on_device_event(event: DeviceEvent) -> None:
+    if isinstance(event, DefaultDeviceChanged) and event.flow == E_RENDER:
+        _default_playback_changed(roles=(event.role,))
+
+
+def set_master_volume(percent: int) -> bool:
+    """Set endpoint master volume (0-100) for default playback device."""
+    return volume_controller().set_volume(percent)
+
+
 def mute_master(mute: bool) -> bool:
     """Mute/unmute the default playback device."""
-    CLSCTX_ALL, AudioUtilities, IAudioEndpointVolume = _safe_import_pycaw()
-    if not all((CLSCTX_ALL, AudioUtilities, IAudioEndpointVolume)):
-        return False
-    try:
-        speakers = AudioUtilities.GetSpeakers()  # type: ignore[attr-defined]
-        interface = speakers.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)  # type: ignore[attr-defined]
-        volume = interface.QueryInterface(IAudioEndpointVolume)
-        volume.SetMute(bool(mute), None)
-        return True
-    except Exception:
-        return False
+    return volume_controller().set_mute(mute)
+
+
+def get_master_volume() -> int | None:
+    """Master volume (0-100) of the default playback device; None if unavailable."""
+    return volume_controller().read_state()[0]
 
 
+def get_mute() -> bool | None:
+    """Mute state of the default playback device; None if unavailable."""
+    return volume_controller().read_state()[1]
+
+
+@timed("tone")
 def play_test_tone(frequency: int = 880, duration_ms: int = 300) -> None:
     """Play a short test tone using winsound.Beep (Windows only)."""
     try:
@@ -252,182 +1247,241 @@ def play_test_tone(frequency: int = 880, duration_ms: int = 300) -> None:
         pass
 
 
-def _set_default_with_com(device_id: str) -> bool:
+def _policy_config_candidates() -> list[tuple[str, Any, str]]:
+    """(clsid, interface, label) combinations known to expose SetDefaultEndpoint."""
+    if IPolicyConfig is None or IPolicyConfigVista is None:
+        return []
+    return [
+        (CLSID_PolicyConfigClient, IPolicyConfig, "PolicyConfigClient/IPolicyConfig"),
+        (CLSID_CPolicyConfigVistaClient, IPolicyConfigVista, "CPolicyConfigVistaClient/IPolicyConfigVista"),
+        (CLSID_CPolicyConfigVistaClient, IPolicyConfig, "CPolicyConfigVistaClient/IPolicyConfig (fallback)"),
+    ]
+
+
+_strategy_label: str | None = None
+_strategy_loaded = False
+_strategy_lock = threading.Lock()
+
+
+def get_com_strategy() -> str | None:
+    """Label of the PolicyConfig candidate that last worked (persisted in STRATEGY_PATH)."""
+    global _strategy_label, _strategy_loaded
+    with _strategy_lock:
+        if not _strategy_loaded:
+            _strategy_loaded = True
+            try:
+                with STRATEGY_PATH.open("r", encoding="utf-8") as f:
+                    _strategy_label = json.load(f).get("label")
+            except Exception:
+                _strategy_label = None
+        return _strategy_label
+
+
+def _remember_com_strategy(clsid: str, iface: Any, label: str | None) -> None:
+    global _strategy_label, _strategy_loaded
+    if get_com_strategy() == label:
+        return
+    with _strategy_lock:
+        _strategy_label = label
+        _strategy_loaded = True
+        try:
+            if label is None:
+                STRATEGY_PATH.unlink(missing_ok=True)
+                return
+            STRATEGY_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with STRATEGY_PATH.open("w", encoding="utf-8") as f:
+                json.dump({"clsid": clsid, "iface": iface.__name__, "label": label}, f, indent=2)
+        except Exception:
+            # Read-only install: keep the in-memory choice for this process
+            pass
+
+
+def reset_com_strategy() -> None:
+    """Forget the remembered strategy; the next switch sweeps all candidates again."""
+    _remember_com_strategy("", None, None)
+
+
+def _ordered_candidates() -> list[tuple[str, Any, str]]:
+    """PolicyConfig candidates with the remembered strategy first."""
+    candidates = _policy_config_candidates()
+    preferred = get_com_strategy()
+    return sorted(candidates, key=lambda c: c[2] != preferred)
+
+
+def _set_default_with_com(device_id: str, roles: tuple[int, ...] = (E_CONSOLE, E_MULTIMEDIA, E_COMMUNICATIONS)) -> bool:
     """Set default endpoint using IPolicyConfig via comtypes.
 
-    This sets all roles (Console, Multimedia, Communications) to the provided endpoint.
+    This sets `roles` (default: Console, Multimedia, Communications) to the provided endpoint.
     The device_id must be an endpoint ID string (IMMDevice id), which pycaw exposes as `dev.id`.
+    Candidates are tried remembered-strategy first and the sweep stops at the first one
+    that accepts the endpoint, so a known machine costs one COM object and three calls.
     """
-    try:
-        import comtypes
-        from comtypes import GUID
-        from comtypes import COMMETHOD
-        from ctypes.wintypes import LPCWSTR, BOOL
-        import comtypes.client as cc
-
-        class IPolicyConfig(comtypes.IUnknown):
-            _iid_ = GUID("{F8679F50-850A-41CF-9C72-430F290290C8}")
-            _methods_ = [
-                COMMETHOD([], HRESULT, "SetDefaultEndpoint", ([], LPCWSTR, "wszDeviceId"), ([], c_int, "role")),
-            ]
-
-        # More complete Vista interface definition with correct vtable order
-        class IPolicyConfigVista(comtypes.IUnknown):
-            _iid_ = GUID("{568B9108-44BF-40B4-9006-86AFE5B5A620}")
-            _methods_ = [
-                COMMETHOD([], HRESULT, "GetMixFormat", ([], LPCWSTR, "dev"), ([], c_void_p, "ppFormat")),
-                COMMETHOD([], HRESULT, "GetDeviceFormat", ([], LPCWSTR, "dev"), ([], c_int, "bDefault"), ([], c_void_p, "ppFormat")),
-                COMMETHOD([], HRESULT, "SetDeviceFormat", ([], LPCWSTR, "dev"), ([], c_void_p, "pEndpointFormat"), ([], c_void_p, "pMixFormat")),
-                COMMETHOD([], HRESULT, "GetProcessingPeriod", ([], LPCWSTR, "dev"), ([], c_int, "bDefault"), ([], c_void_p, "pmftDefaultPeriod"), ([], c_void_p, "pmftMinimumPeriod")),
-                COMMETHOD([], HRESULT, "SetProcessingPeriod", ([], LPCWSTR, "dev"), ([], c_void_p, "pmftPeriod")),
-                COMMETHOD([], HRESULT, "GetShareMode", ([], LPCWSTR, "dev"), ([], c_void_p, "pMode")),
-                COMMETHOD([], HRESULT, "SetShareMode", ([], LPCWSTR, "dev"), ([], c_void_p, "pMode")),
-                COMMETHOD([], HRESULT, "GetPropertyValue", ([], LPCWSTR, "dev"), ([], c_void_p, "key"), ([], c_void_p, "pv")),
-                COMMETHOD([], HRESULT, "SetPropertyValue", ([], LPCWSTR, "dev"), ([], c_void_p, "key"), ([], c_void_p, "pv")),
-                COMMETHOD([], HRESULT, "SetDefaultEndpoint", ([], LPCWSTR, "wszDeviceId"), ([], c_int, "role")),
-                COMMETHOD([], HRESULT, "SetEndpointVisibility", ([], LPCWSTR, "dev"), ([], BOOL, "bVisible")),
-            ]
-
-        CLSID_candidates = [
-            GUID("{870AF99C-171D-4F9E-AF0D-E63DF40C2BC9}"),  # PolicyConfigClient
-            GUID("{294935CE-F637-4E7C-A41B-AB255460B862}"),  # CPolicyConfigVistaClient
-        ]
-
-        # Create COM object and obtain interface (try candidates for compatibility)
-        obj = None
-        last_exc: Exception | None = None
-        for clsid in CLSID_candidates:
-            try:
-                # Try Vista interface first
-                try:
-                    obj = cc.CreateObject(clsid, interface=IPolicyConfigVista)
-                except Exception:
-                    obj = cc.CreateObject(clsid, interface=IPolicyConfig)
-                if obj is not None:
-                    break
-            except Exception as e:  # pragma: no cover
-                last_exc = e
-                obj = None
-        if obj is None:
-            if last_exc:
-                raise last_exc
-            return False
 
+    def set_all_roles(obj: Any) -> bool:
         # ERole: 0=Console, 1=Multimedia, 2=Communications
-        ok = True
-        for role in (E_CONSOLE, E_MULTIMEDIA, E_COMMUNICATIONS):
+        ok_any = False
+        for role in roles:
             try:
                 hr = obj.SetDefaultEndpoint(device_id, int(role))
-                if isinstance(hr, int) and hr != 0:
-                    ok = False
-            except Exception:
-                ok = False
-        return ok
-    except Exception:
-        return False
+                if not isinstance(hr, int) or hr == 0:
+                    ok_any = True
+                else:
+                    _note_hresult(hr)
+            except Exception as e:
+                _note_hresult(e)
+                if _is_stale(e):
+                    raise
+        return ok_any
+
+    for clsid, iface, label in _ordered_candidates():
+        try:
+            ok = _com_cache.call(clsid, iface, set_all_roles)
+        except Exception:
+            continue
+        if ok:
+            _remember_com_strategy(clsid, iface, label)
+            return True
+    return False
 
 
 def _debug_try_set_default(device_id: str) -> dict[str, Any]:
-    """Attempt to set default endpoint via both PolicyConfig interfaces and report HRESULTs."""
+    """Attempt to set default endpoint via all PolicyConfig candidates and report HRESULTs.
+
+    Full diagnostic sweep (no short-circuit); used by `--debug`. The first candidate
+    that succeeds becomes the remembered strategy.
+    """
     report: dict[str, Any] = {"device_id": device_id, "attempts": [], "success": False}
-    try:
-        import comtypes
-        from comtypes import GUID
-        from comtypes import COMMETHOD
-        from ctypes.wintypes import LPCWSTR, BOOL
-        import comtypes.client as cc
-
-        class IPolicyConfig(comtypes.IUnknown):
-            _iid_ = GUID("{F8679F50-850A-41CF-9C72-430F290290C8}")
-            _methods_ = [
-                COMMETHOD([], HRESULT, "SetDefaultEndpoint", ([], LPCWSTR, "wszDeviceId"), ([], c_int, "role")),
-            ]
-
-        class IPolicyConfigVista(comtypes.IUnknown):
-            _iid_ = GUID("{568B9108-44BF-40B4-9006-86AFE5B5A620}")
-            _methods_ = [
-                COMMETHOD([], HRESULT, "GetMixFormat", ([], LPCWSTR, "dev"), ([], c_void_p, "ppFormat")),
-                COMMETHOD([], HRESULT, "GetDeviceFormat", ([], LPCWSTR, "dev"), ([], c_int, "bDefault"), ([], c_void_p, "ppFormat")),
-                COMMETHOD([], HRESULT, "SetDeviceFormat", ([], LPCWSTR, "dev"), ([], c_void_p, "pEndpointFormat"), ([], c_void_p, "pMixFormat")),
-                COMMETHOD([], HRESULT, "GetProcessingPeriod", ([], LPCWSTR, "dev"), ([], c_int, "bDefault"), ([], c_void_p, "pmftDefaultPeriod"), ([], c_void_p, "pmftMinimumPeriod")),
-                COMMETHOD([], HRESULT, "SetProcessingPeriod", ([], LPCWSTR, "dev"), ([], c_void_p, "pmftPeriod")),
-                COMMETHOD([], HRESULT, "GetShareMode", ([], LPCWSTR, "dev"), ([], c_void_p, "pMode")),
-                COMMETHOD([], HRESULT, "SetShareMode", ([], LPCWSTR, "dev"), ([], c_void_p, "pMode")),
-                COMMETHOD([], HRESULT, "GetPropertyValue", ([], LPCWSTR, "dev"), ([], c_void_p, "key"), ([], c_void_p, "pv")),
-                COMMETHOD([], HRESULT, "SetPropertyValue", ([], LPCWSTR, "dev"), ([], c_void_p, "key"), ([], c_void_p, "pv")),
-                COMMETHOD([], HRESULT, "SetDefaultEndpoint", ([], LPCWSTR, "wszDeviceId"), ([], c_int, "role")),
-                COMMETHOD([], HRESULT, "SetEndpointVisibility", ([], LPCWSTR, "dev"), ([], BOOL, "bVisible")),
-            ]
-
-        candidates = [
-            (GUID("{870AF99C-171D-4F9E-AF0D-E63DF40C2BC9}"), IPolicyConfig, "PolicyConfigClient/IPolicyConfig"),
-            (GUID("{294935CE-F637-4E7C-A41B-AB255460B862}"), IPolicyConfigVista, "CPolicyConfigVistaClient/IPolicyConfigVista"),
-            (GUID("{294935CE-F637-4E7C-A41B-AB255460B862}"), IPolicyConfig, "CPolicyConfigVistaClient/IPolicyConfig (fallback)"),
-        ]
-        for clsid, iface, label in candidates:
-            entry: dict[str, Any] = {"clsid": str(clsid), "iface": iface.__name__, "label": label, "roles": []}
+    candidates = _policy_config_candidates()
+    if not candidates:
+        report["error"] = "unexpected: comtypes unavailable"
+        return report
+    for clsid, iface, label in candidates:
+        entry: dict[str, Any] = {"clsid": clsid, "iface": iface.__name__, "label": label, "roles": []}
+        try:
+            obj = _com_cache.get(clsid, iface)
+        except Exception as e:
+            entry["error"] = f"create_failed: {type(e).__name__}"
+            report["attempts"].append(entry)
+            continue
+        ok_all = True
+        ok_any = False
+        ok_mm = False
+        for role in (E_CONSOLE, E_MULTIMEDIA, E_COMMUNICATIONS):
             try:
-                obj = cc.CreateObject(clsid, interface=iface)
-            except Exception as e:
-                entry["error"] = f"create_failed: {type(e).__name__}"
-                report["attempts"].append(entry)
-                continue
-            ok_all = True
-            ok_any = False
-            ok_mm = False
-            for role in (E_CONSOLE, E_MULTIMEDIA, E_COMMUNICATIONS):
-                try:
-                    hr = obj.SetDefaultEndpoint(device_id, int(role))
-                    code = hr if isinstance(hr, int) else 0
-                    entry["roles"].append({"role": role, "hr": code})
-                    if code == 0:
-                        ok_any = True
-                        if role == E_MULTIMEDIA:
-                            ok_mm = True
-                    else:
-                        ok_all = False
-                except Exception as e:
-                    entry["roles"].append({"role": role, "error": type(e).__name__})
+                hr = obj.SetDefaultEndpoint(device_id, int(role))
+                code = hr if isinstance(hr, int) else 0
+                entry["roles"].append({"role": role, "hr": code})
+                if code == 0:
+                    ok_any = True
+                    if role == E_MULTIMEDIA:
+                        ok_mm = True
+                else:
                     ok_all = False
-            entry["ok_all"] = ok_all
-            entry["ok_any"] = ok_any
-            entry["ok_multimedia"] = ok_mm
-            report["attempts"].append(entry)
-            # Treat success if Multimedia role succeeded, else any role success as fallback
-            report["success"] = report.get("success", False) or ok_mm or ok_any
-    except Exception as e:
-        report["error"] = f"unexpected: {type(e).__name__}"
+            except Exception as e:
+                if _is_stale(e):
+                    _com_cache.invalidate(clsid, iface)
+                entry["roles"].append({"role": role, "error": type(e).__name__})
+                ok_all = False
+        entry["ok_all"] = ok_all
+        entry["ok_any"] = ok_any
+        entry["ok_multimedia"] = ok_mm
+        report["attempts"].append(entry)
+        # Treat success if Multimedia role succeeded, else any role success as fallback
+        if (ok_mm or ok_any) and not report["success"]:
+            _remember_com_strategy(clsid, iface, label)
+        report["success"] = report.get("success", False) or ok_mm or ok_any
+    report["strategy"] = get_com_strategy()
     return report
 
 
 def debug_set_default_endpoint(device_identifier: str, flow: str) -> dict[str, Any]:
     """Debug helper to test SetDefaultEndpoint and inspect HRESULTs.
 
-    flow: 'render' or 'capture' (used only for fallback message context)
+    flow: 'render' or 'capture'
     """
-    resolved = _resolve_device_id(device_identifier) or device_identifier
+    res = resolve_device(device_identifier, flow="playback" if flow == "render" else "recording")
+    resolved = res.device_id or _resolve_device_id(device_identifier) or device_identifier
     rep = _debug_try_set_default(resolved)
+    rep["resolution"] = res.as_dict()
     if not rep.get("success"):
         rep["fallback"] = {"svv_attempted": False, "hint": "Place SoundVolumeView.exe in tools/ to enable fallback"}
+    rep["com_cache"] = com_cache_stats()
     return rep
 
 
-def _ids_for_flow(flow: int) -> set[str]:
-    """Enumerate active endpoint IDs for given flow (eRender/eCapture)."""
-    try:
-        import comtypes.client as cc
-        from pycaw.pycaw import IMMDeviceEnumerator  # type: ignore
+class WindowsBackend:
+    """audio.backend.AudioBackend over the CoreAudio functions of this module.
 
-        enum = cc.CreateObject(CLSID_MMDeviceEnumerator, interface=IMMDeviceEnumerator)
-        coll = enum.EnumAudioEndpoints(flow, DEVICE_STATE_ACTIVE)
-        count = coll.GetCount()
-        ids: set[str] = set()
-        for i in range(count):
-            dev = coll.Item(i)
-            try:
-                ids.add(str(dev.GetId()))
-            except Exception:
-                continue
-        return ids
-    except Exception:
-        return set()
+    Beyond the protocol it exposes the Windows-only helpers the UI and CLI use
+    when present (device watching, the coalescing volume controller, endpoint
+    listing with inactive devices, the SetDefaultEndpoint debug report).
+    """
+
+    name = "windows"
+
+    @property
+    def last_hresult(self) -> int | None:
+        return last_hresult()
+
+    @last_hresult.setter
+    def last_hresult(self, value: int | None) -> None:
+        set_last_hresult(value)
+
+    def take_snapshot(self, force: bool = False) -> DeviceSnapshot:
+        # While watch_devices() keeps a live table, it is current without COM calls;
+        # `force` (explicit refresh) enumerates anyway and reseeds the table from it
+        global _snapshot_cache
+        table = _live_table
+        if table is not None and table.live and not force:
+            return table.snapshot()
+        snap = _snapshot_cache = take_snapshot()
+        if table is not None and table.live:
+            table.load(snap)
+        return snap
+
+    def resolve_device(self, identifier: str, flow: str | None = None) -> Any:
+        return resolve_device(identifier, flow=flow)
+
+    def get_default_playback_id(self) -> str | None:
+        return get_default_playback_id()
+
+    def get_default_recording_id(self) -> str | None:
+        return get_default_recording_id()
+
+    def set_default_playback(self, device_identifier: str) -> bool:
+        return set_default_playback(device_identifier)
+
+    def set_default_recording(self, device_identifier: str) -> bool:
+        return set_default_recording(device_identifier)
+
+    def set_master_volume(self, percent: int) -> bool:
+        return set_master_volume(percent)
+
+    def mute_master(self, mute: bool) -> bool:
+        return mute_master(mute)
+
+    def play_test_tone(self, frequency: int = 880, duration_ms: int = 300) -> None:
+        play_test_tone(frequency, duration_ms)
+
+    # -- optional capabilities -------------------------------------------
+    def set_default_role(self, device_identifier: str, flow: str, role: int) -> bool:
+        return set_default_role(device_identifier, flow, role)
+
+    def get_master_volume(self) -> int | None:
+        return get_master_volume()
+
+    def get_mute(self) -> bool | None:
+        return get_mute()
+
+    # -- Windows-only extras ---------------------------------------------
+    def enumerate_endpoints(self, flow: int = E_ALL, state_mask: int = DEVICE_STATE_ACTIVE, fields: tuple[str, ...] = ("id", "name")) -> list[dict[str, Any]]:
+        return enumerate_endpoints(flow, state_mask, fields)
+
+    def watch_devices(self) -> DeviceTable:
+        return watch_devices()
+
+    def volume_controller(self) -> VolumeController:
+        return volume_controller()
+
+    def debug_set_default_endpoint(self, device_identifier: str, flow: str) -> dict[str, Any]:
+        return debug_set_default_endpoint(device_identifier, flow)
@@ -0,0 +1,199 @@
+"""In-memory stand-ins for the CoreAudio COM objects used by audio/windows.py.
+
+Every method call is counted in a shared `collections.Counter`, so benchmarks can
+report how many COM round trips a code path issues without a Windows host.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+from typing import Any
+
+from audio.windows import (
+    DEVICE_STATE_ACTIVE,
+    DEVICE_STATE_DISABLED,
+    DEVICE_STATE_NOTPRESENT,
+    DEVICE_STATE_UNPLUGGED,
+    DEVICE_STATEMASK_ALL,
+    E_ALL,
+    E_CAPTURE,
+    E_RENDER,
+    PKEY_AUDIOENDPOINT_FORM_FACTOR,
+    PKEY_DEVICE_FRIENDLY_NAME,
+)
+
+
+class StubPropertyKey:
+    def __init__(self, fmtid: str, pid: int) -> None:
+        self.fmtid = fmtid
+        self.pid = pid
+
+    def __str__(self) -> str:
+        return f"{self.fmtid} {self.pid}"
+
+
+class StubPropVariant:
+    def __init__(self, calls: Counter, value: Any) -> None:
+        self._calls = calls
+        self._value = value
+
+    def GetValue(self) -> Any:
+        self._calls["PropVariant.GetValue"] += 1
+        return self._value
+
+    def clear(self) -> None:
+        self._calls["PropVariant.clear"] += 1
+
+
+class StubPropertyStore:
+    def __init__(self, calls: Counter, props: list[tuple[StubPropertyKey, Any]]) -> None:
+        self._calls = calls
+        self._props = props
+
+    def GetCount(self) -> int:
+        self._calls["PropertyStore.GetCount"] += 1
+        return len(self._props)
+
+    def GetAt(self, index: int) -> StubPropertyKey:
+        self._calls["PropertyStore.GetAt"] += 1
+        return self._props[index][0]
+
+    def GetValue(self, key: Any) -> StubPropVariant:
+        self._calls["PropertyStore.GetValue"] += 1
+        wanted = (str(key.fmtid).upper(), int(key.pid))
+        for pk, value in self._props:
+            if (pk.fmtid.upper(), pk.pid) == wanted:
+                return StubPropVariant(self._calls, value)
+        return StubPropVariant(self._calls, None)
+
+
+class StubDevice:
+    def __init__(self, calls: Counter, id_: str, name: str, flow: int, state: int = DEVICE_STATE_ACTIVE, extra_props: int = 24) -> None:
+        self._calls = calls
+        self.id_ = id_
+        self.name = name
+        self.flow = flow
+        self.state = state
+        # Seconds OpenPropertyStore blocks (models a stalling Bluetooth endpoint)
+        self.stall_s = 0.0
+        # Real endpoints carry a few dozen properties; the friendly name is one of them
+        self._props = [(StubPropertyKey(f"{{00000000-0000-0000-0000-{j:012d}}}", j), j) for j in range(extra_props)]
+        fmtid, pid = PKEY_DEVICE_FRIENDLY_NAME
+        self._props.insert(extra_props // 2, (StubPropertyKey(fmtid, pid), name))
+        fmtid, pid = PKEY_AUDIOENDPOINT_FORM_FACTOR
+        # FormFactor: 1 = Speakers, 4 = Microphone
+        self._props.append((StubPropertyKey(fmtid, pid), 1 if flow == E_RENDER else 4))
+
+    def rename(self, name: str) -> None:
+        """Change PKEY_Device_FriendlyName (what the user does in the Sound control panel)."""
+        fmtid, pid = PKEY_DEVICE_FRIENDLY_NAME
+        self.name = name
+        self._props = [(pk, name if (pk.fmtid, pk.pid) == (fmtid, pid) else value) for pk, value in self._props]
+
+    def GetId(self) -> str:
+        self._calls["Device.GetId"] += 1
+        return self.id_
+
+    def GetState(self) -> int:
+        self._calls["Device.GetState"] += 1
+        return self.state
+
+    def OpenPropertyStore(self, _mode: int) -> StubPropertyStore:
+        self._calls["Device.OpenPropertyStore"] += 1
+        if self.stall_s:
+            time.sleep(self.stall_s)
+        return StubPropertyStore(self._calls, self._props)
+
+
+class StubCollection:
+    def __init__(self, calls: Counter, devices: list[StubDevice]) -> None:
+        self._calls = calls
+        self._devices = devices
+
+    def GetCount(self) -> int:
+        self._calls["Collection.GetCount"] += 1
+        return len(self._devices)
+
+    def Item(self, index: int) -> StubDevice:
+        self._calls["Collection.Item"] += 1
+        return self._devices[index]
+
+
+class StubEnumerator:
+    """IMMDeviceEnumerator stand-in over a fixed device list."""
+
+    def __init__(self, calls: Counter, devices: list[StubDevice], defaults: dict[tuple[int, int], str]) -> None:
+        self._calls = calls
+        self._devices = devices
+        self._defaults = defaults
+
+    def EnumAudioEndpoints(self, flow: int, state_mask: int) -> StubCollection:
+        self._calls["Enumerator.EnumAudioEndpoints"] += 1
+        picked = [d for d in self._devices if (flow == E_ALL or d.flow == flow) and (d.state & state_mask)]
+        return StubCollection(self._calls, picked)
+
+    def GetDevice(self, device_id: str) -> StubDevice:
+        self._calls["Enumerator.GetDevice"] += 1
+        for dev in self._devices:
+            if dev.id_ == device_id:
+                return dev
+        raise OSError("element not found")
+
+    def GetDefaultAudioEndpoint(self, flow: int, role: int) -> StubDevice:
+        self._calls["Enumerator.GetDefaultAudioEndpoint"] += 1
+        wanted = self._defaults.get((flow, role))
+        for dev in self._devices:
+            if dev.id_ == wanted:
+                return dev
+        raise OSError("element not found")
+
+
+class StubSystem:
+    """A synthetic device topology; `new_enumerator()` counts as one CoCreateInstance."""
+
+    def __init__(self, playback: int = 6, recording: int = 4, inactive: int = 0, extra_props: int = 24) -> None:
+        self.calls: Counter = Counter()
+        self.devices: list[StubDevice] = []
+        for i in range(playback):
+            self.devices.append(StubDevice(self.calls, f"{{0.0.0.00000000}}.{{render-{i:04d}}}", f"Speakers {i}", E_RENDER, extra_props=extra_props))
+        for i in range(recording):
+            self.devices.append(StubDevice(self.calls, f"{{0.0.1.00000000}}.{{capture-{i:04d}}}", f"Microphone {i}", E_CAPTURE, extra_props=extra_props))
+        states = (DEVICE_STATE_DISABLED, DEVICE_STATE_NOTPRESENT, DEVICE_STATE_UNPLUGGED)
+        for i in range(inactive):
+            flow = E_RENDER if i % 2 == 0 else E_CAPTURE
+            self.devices.append(StubDevice(self.calls, f"{{0.0.{flow}.00000000}}.{{old-{i:04d}}}", f"USB Audio {i}", flow, state=states[i % 3], extra_props=extra_props))
+        first_pb = next((d.id_ for d in self.devices if d.flow == E_RENDER), "")
+        first_rec = next((d.id_ for d in self.devices if d.flow == E_CAPTURE), "")
+        self.defaults = {(flow, role): (first_pb if flow == E_RENDER else first_rec) for flow in (E_RENDER, E_CAPTURE) for role in (0, 1, 2)}
+
+    def new_enumerator(self) -> StubEnumerator:
+        self.calls["CoCreateInstance"] += 1
+        return StubEnumerator(self.calls, self.devices, self.defaults)
+
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def reset(self) -> None:
+        self.calls.clear()
+
+
+class StubEndpointVolume:
+    """IAudioEndpointVolume stand-in; every write sleeps `write_ms` and is logged."""
+
+    def __init__(self, write_ms: float = 0.0) -> None:
+        self.write_s = write_ms / 1000.0
+        self.log: list[tuple[float, str, Any]] = []
+        self.removed = False  # writes raise like on an unplugged endpoint
+
+    def SetMasterVolumeLevelScalar(self, level: float, _ctx: Any) -> None:
+        if self.removed:
+            raise OSError(-2004287484, "AUDCLNT_E_DEVICE_INVALIDATED")
+        if self.write_s:
+            time.sleep(self.write_s)
+        self.log.append((time.perf_counter(), "volume", level))
+
+    def SetMute(self, mute: bool, _ctx: Any) -> None:
+        if self.write_s:
+            time.sleep(self.write_s)
+        self.log.append((time.perf_counter(), "mute", mute))
@@ -0,0 +1,184 @@
+"""Concurrent reads through AsyncAudioControl vs. blocking calls on the event loop.
+
+Run: python -m benchmarks.async_control [--clients 50] [--latency-ms 5]
+
+The stub backend sleeps `--latency-ms` per call (a slow COM enumeration). Each
+client reads the snapshot, the default playback id and resolves a device name.
+"blocking" runs those calls directly on the event loop; "async" awaits them
+through the facade, where identical in-flight reads share one backend call.
+Loop lag is the worst delay seen by a 1 ms ticker task while the clients run.
+
+Checks (exit code 1 if one fails): a deadline shorter than the backend latency
+raises asyncio.TimeoutError, and close() with one call running and others queued
+lets the running call finish, fails the queued ones and later calls with
+RuntimeError at once, and one instance serves a full queue from two successive
+asyncio.run() loops.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+import time
+
+from audio.async_control import AsyncAudioControl
+from audio.windows import DeviceSnapshot
+
+
+class LatencyBackend:
+    """Stub with the audio/windows.py function names and a fixed per-call latency."""
+
+    def __init__(self, latency_ms: float) -> None:
+        self.latency_s = latency_ms / 1000.0
+        self.calls = 0
+        self.threads: set[str] = set()
+        self._snap = DeviceSnapshot(playback=[{"id": "{0.0.0.1}.{spk}", "name": "Speakers"}], recording=[{"id": "{0.0.1.1}.{mic}", "name": "Mic"}])
+
+    def _work(self) -> None:
+        self.calls += 1
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.latency_s)
+
+    def take_snapshot(self, force: bool = False) -> DeviceSnapshot:
+        self._work()
+        return self._snap
+
+    def get_default_playback_id(self) -> str | None:
+        self._work()
+        return "{0.0.0.1}.{spk}"
+
+    def resolve_device(self, identifier: str, flow: str | None = None):
+        self._work()
+        return self._snap.index.resolve(identifier, flow=flow)
+
+    def set_master_volume(self, percent: int) -> bool:
+        self._work()
+        return True
+
+
+async def _ticker(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - t0 - 0.001)
+
+
+async def run_blocking(clients: int, latency_ms: float) -> dict:
+    backend = LatencyBackend(latency_ms)
+    stop, lags = asyncio.Event(), []
+    tick = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(0)
+
+    async def client(i: int) -> None:
+        backend.take_snapshot()
+        backend.get_default_playback_id()
+        backend.resolve_device("Mic" if i % 2 else "Speakers")
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await tick
+    return {"elapsed_ms": elapsed * 1e3, "backend_calls": backend.calls, "max_lag_ms": max(lags or [elapsed]) * 1e3}
+
+
+async def run_async(clients: int, latency_ms: float) -> dict:
+    backend = LatencyBackend(latency_ms)
+    ctl = AsyncAudioControl(backend=backend, max_queue=16)
+    stop, lags = asyncio.Event(), []
+    tick = asyncio.create_task(_ticker(stop, lags))
+
+    async def client(i: int) -> None:
+        await asyncio.gather(ctl.snapshot(), ctl.default_playback_id(), ctl.resolve("Mic" if i % 2 else "Speakers"))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    elapsed = time.perf_counter() - t0
+
+    # Deadline shorter than the backend latency -> typed timeout, worker keeps going
+    timed_out = False
+    try:
+        await ctl.set_volume(30, timeout=latency_ms / 4000.0)
+    except asyncio.TimeoutError:
+        timed_out = True
+    stop.set()
+    await tick
+    ctl.close()
+    return {
+        "elapsed_ms": elapsed * 1e3,
+        "backend_calls": backend.calls,
+        "max_lag_ms": max(lags) * 1e3,
+        "coalesced": ctl.coalesced,
+        "threads": sorted(backend.threads),
+        "timeout_ok": timed_out,
+    }
+
+
+async def run_close(latency_ms: float) -> bool:
+    backend = LatencyBackend(latency_ms)
+    ctl = AsyncAudioControl(backend=backend)
+    running = asyncio.ensure_future(ctl.set_volume(30))
+    while backend.calls == 0:
+        await asyncio.sleep(0.0005)
+    queued = [asyncio.ensure_future(ctl.set_volume(p)) for p in range(3)]
+    await asyncio.sleep(0)
+    ctl.close(wait=False)
+    t0 = time.perf_counter()
+    try:
+        results = await asyncio.wait_for(asyncio.gather(*queued, return_exceptions=True), latency_ms / 1000.0)
+    except asyncio.TimeoutError:
+        return False
+    failed_fast = time.perf_counter() - t0 < latency_ms / 2000.0
+    try:
+        await ctl.snapshot()
+        rejected = False
+    except RuntimeError:
+        rejected = True
+    return (await running) is True and failed_fast and rejected and backend.calls == 1 and all(isinstance(r, RuntimeError) for r in results)
+
+
+def run_two_loops(latency_ms: float) -> bool:
+    """More calls than queue slots, once per asyncio.run(), on one instance."""
+    backend = LatencyBackend(latency_ms)
+    ctl = AsyncAudioControl(backend=backend, max_queue=2)
+
+    async def burst() -> list:
+        return await asyncio.gather(*(ctl.set_volume(p) for p in range(8)))
+
+    try:
+        ok = all(asyncio.run(burst()) + asyncio.run(burst()))
+    except RuntimeError:
+        ok = False
+    ctl.close()
+    return ok and backend.calls == 16
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.async_control")
+    p.add_argument("--clients", type=int, default=50)
+    p.add_argument("--latency-ms", type=float, default=5.0)
+    args = p.parse_args(argv)
+
+    blocking = asyncio.run(run_blocking(args.clients, args.latency_ms))
+    result = asyncio.run(run_async(args.clients, args.latency_ms))
+    ops = args.clients * 3
+    print(f"{args.clients} clients x 3 reads, backend latency {args.latency_ms} ms")
+    for label, res in (("blocking", blocking), ("async", result)):
+        print(
+            f"{label:>9}: {res['elapsed_ms']:8.1f} ms  {ops / res['elapsed_ms'] * 1e3:8.0f} ops/s  "
+            f"backend calls={res['backend_calls']:4d}  max loop lag={res['max_lag_ms']:7.1f} ms"
+        )
+    print(f"   async: coalesced={result['coalesced']} worker threads={result['threads']}")
+    checks = {
+        "deadline -> TimeoutError": result["timeout_ok"],
+        "close fails queued calls": asyncio.run(run_close(max(args.latency_ms, 20.0))),
+        "reuse across event loops": run_two_loops(1.0),
+    }
+    for name, ok in checks.items():
+        print(f"  {name:<26} {'ok' if ok else 'FAILED'}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
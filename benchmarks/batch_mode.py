@@ -0,0 +1,69 @@
+"""A provisioning script as one process per command vs. one `app.cli batch`.
+
+Run: python -m benchmarks.batch_mode [--commands 20] [--backend simulated:latency.enumerate=15]
+
+Both variants run the same command list (set-default, volume, mute, list)
+against the simulated backend; the enumerate latency stands in for COM
+activation and enumeration, which the batch pays once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def script(n: int) -> list[list[str]]:
+    cycle = [
+        ["win", "set-default-playback", "Simulated Speakers 1"],
+        ["win", "set-default-recording", "Simulated Microphone 2"],
+        ["win", "volume", "40"],
+        ["win", "mute", "off"],
+        ["win", "list"],
+    ]
+    return [cycle[i % len(cycle)] for i in range(n)]
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.batch_mode")
+    p.add_argument("--commands", type=int, default=20)
+    p.add_argument("--backend", default="simulated:latency.enumerate=15,latency.set_default=5")
+    args = p.parse_args(argv)
+
+    env = dict(os.environ, SSB_NO_DAEMON="1")
+    commands = script(args.commands)
+
+    t0 = time.perf_counter()
+    for cmd in commands:
+        subprocess.run([sys.executable, "-m", "app.cli", "--backend", args.backend, *cmd], cwd=PROJECT_ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    per_process = time.perf_counter() - t0
+
+    lines = "\n".join(shlex.join(cmd) for cmd in commands) + "\n"
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-m", "app.cli", "--backend", args.backend, "batch"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        input=lines,
+        text=True,
+        capture_output=True,
+        check=True,
+    )
+    batch = time.perf_counter() - t0
+
+    print(f"{len(commands)} commands")
+    print(f"  one process per command: {per_process * 1e3:8.1f} ms")
+    print(f"  app.cli batch          : {batch * 1e3:8.1f} ms  ({proc.stderr.strip()})")
+    print(f"  speed-up               : {per_process / batch:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,134 @@
+"""Hotkey profile switch: parse and resolve per apply vs. cached compiled plans.
+
+Run: python -m benchmarks.compiled_profiles [--profiles 200] [--switches 500]
+
+A temporary profiles/ directory holds --profiles profiles referring to devices
+by name. Each switch applies the next profile, either from scratch
+(find_profile + JSON + DeviceIndex resolution + diff plan) or through a warm
+ProfileCompiler (stat + cached CompiledProfile + diff plan). Both run in a warm
+process on a SessionBackend over SimulatedBackend (cached snapshot, as with the
+daemon's live device table).
+
+"prep" is the measured CPU time before the first audio write. "switch" adds the
+simulated endpoint latencies of the executed steps (virtual clock) and is checked
+against TARGET_MS, the latency target documented in profiles/compiler.py; the
+exit code is 1 if the compiled p99 exceeds it, if compiling parsed a profile
+file the catalog had already read, or if a cached plan survives two endpoints
+swapping names (same ids, so only the names tell the bindings changed).
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from audio.session import SessionBackend
+from audio.simulated import SimulatedBackend
+from benchmarks.simulated_backend import VirtualClock
+from profiles.apply import build_plan, device_target, execute_step, read_state, target_volume, voicemeeter_preset
+from profiles.compiler import ProfileCompiler
+from profiles.manager import checked_profile, find_profile, load_profile
+
+TARGET_MS = 50.0
+
+# Endpoint write latencies (ms) typical for CoreAudio on a laptop
+LATENCY_MS = {"set_default": ("lognormal", 12.0, 0.3), "volume": (0.3, 1.0), "mute": (0.3, 1.0), "get_volume": (0.1, 0.3)}
+
+
+def write_profiles(directory: Path, count: int, playback: int, recording: int) -> list[str]:
+    names = []
+    for i in range(count):
+        name = f"Room {i:04d}"
+        profile = {
+            "name": name,
+            "playback": f"Simulated Speakers {i % playback}",
+            "recording": f"Simulated Microphone {(i * 7) % recording}",
+            "volume": {"master": 20 + i % 60},
+            "mute": False,
+            "voicemeeter": None,
+        }
+        (directory / f"room-{i:04d}.json").write_text(json.dumps(profile, indent=2), encoding="utf-8")
+        names.append(name)
+    return names
+
+
+def _pct(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1e3
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.compiled_profiles")
+    p.add_argument("--profiles", type=int, default=200)
+    p.add_argument("--switches", type=int, default=500)
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args(argv)
+
+    directory = Path(tempfile.mkdtemp())
+    names = write_profiles(directory, args.profiles, playback=8, recording=6)
+    # Hotkeys cycle through a handful of profiles
+    hot = names[-6:]
+
+    def from_scratch(name: str, backend: SessionBackend) -> object:
+        # What applying cost before compiled plans: find, parse, validate, resolve, plan
+        profile = checked_profile(load_profile(find_profile(name, directory)))
+        volume, mute = target_volume(profile), profile.get("mute")
+        state = read_state(backend, volume=volume is not None, mute=mute is not None)
+        devices = {}
+        for kind in ("playback", "recording"):
+            identifier = device_target(profile, kind)
+            devices[kind] = (identifier, state.snapshot.index.resolve(identifier, flow=kind).device_id if identifier else None)
+        return build_plan(profile["name"], devices, volume, None if mute is None else bool(mute), voicemeeter_preset(profile), state)
+
+    # Plan cache outside the profiles directory, where the catalog would list it
+    compiler = ProfileCompiler(directory, cache_path=Path(tempfile.mkdtemp()) / "plans.json")
+
+    def compiled(name: str, backend: SessionBackend) -> object:
+        snapshot = backend.take_snapshot()
+        plan = compiler.get(name, snapshot)
+        return plan.plan(read_state(backend, volume=True, mute=True, snapshot=snapshot))
+
+    failed = False
+    for label, prepare in (("from scratch", from_scratch), ("compiled", compiled)):
+        clock = VirtualClock()
+        backend = SessionBackend(SimulatedBackend(playback=8, recording=6, latency=LATENCY_MS, seed=args.seed, sleep=clock.sleep))
+        backend.take_snapshot()
+        prep: list[float] = []
+        switch: list[float] = []
+        for i in range(args.switches):
+            t0 = time.perf_counter()
+            plan = prepare(hot[i % len(hot)], backend)
+            cpu = time.perf_counter() - t0
+            v0 = clock.now
+            for step in plan.operations:
+                execute_step(step, backend)
+            prep.append(cpu)
+            switch.append(cpu + (clock.now - v0))
+        line = f"{label:>12}: prep p50 {_pct(prep, 0.5):7.3f} ms  p99 {_pct(prep, 0.99):7.3f} ms | switch p50 {_pct(switch, 0.5):6.1f} ms  p99 {_pct(switch, 0.99):6.1f} ms"
+        if prepare is compiled:
+            ok = _pct(switch, 0.99) <= TARGET_MS
+            # Compiling reuses the catalog's parsed profiles: one parse per file
+            parses = compiler.catalog.parses
+            failed = not ok or parses != args.profiles
+            line += f"  (target {TARGET_MS:.0f} ms: {'ok' if ok else 'MISSED'}; {compiler.stats()}, catalog parses {parses})"
+        print(line)
+    print(f"{args.profiles} profiles in {directory}, {args.switches} switches over {len(hot)} hot profiles")
+
+    # Two endpoints swap names: a plan bound by name must follow the name
+    snapshot = backend.take_snapshot()
+    before = compiler.get(hot[0], snapshot)
+    target = next(d for d in snapshot.playback if d["id"] == before.playback_id)
+    other = next(d for d in snapshot.playback if d["id"] != target["id"])
+    swapped = [{**d, "name": other["name"] if d is target else target["name"] if d is other else d["name"]} for d in snapshot.playback]
+    after = compiler.get(hot[0], dataclasses.replace(snapshot, playback=swapped))
+    rebound = after.playback_id == other["id"]
+    print(f"renamed endpoints: plan rebound to the new name's endpoint {'ok' if rebound else 'FAILED'}")
+    return 1 if failed or not rebound else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,194 @@
+"""Cold CLI invocations vs. requests to a resident daemon.
+
+Run: python -m benchmarks.daemon_roundtrip [--runs 15] [--backend simulated:latency.enumerate=15]
+
+Starts `app.cli daemon` on a private Unix socket with the simulated backend and
+compares, per hotkey-style command (`win list`, `win set-default-playback`):
+
+  cold       python -m app.cli --backend ... <cmd>   (new process, new backend)
+  forwarded  python -m app.cli <cmd>                 (new process, daemon does the work)
+  rpc        one JSON-RPC request on an open client connection
+
+The backend latencies stand in for COM activation and enumeration. The simulated
+backend pays them on every call, so the rpc numbers are an upper bound; on
+Windows the daemon's device watcher serves `win list` without COM calls.
+POSIX only (Unix socket).
+
+Checks (exit code 1 if one fails), counted by the daemon's request counter:
+a plain `win list` is forwarded, also with SSB_BACKEND equal to the daemon's
+spec and with SSB_NO_DAEMON=0; with another SSB_BACKEND, an SSB_RECORD or
+SSB_NO_DAEMON=1 it runs locally.
+A daemon whose `cli` request fails must not make the client re-run the command
+locally (forward() reports rc 1). A `cli` reply holds the command's output and
+argparse errors, but nothing another thread prints meanwhile.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.daemon import STATE_ENV, AudioDaemon, DaemonClient, forward
+from audio.simulated import SimulatedBackend
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+COMMANDS = {
+    "win list": ["win", "list"],
+    "win set-default-playback": ["win", "set-default-playback", "Simulated Speakers 2"],
+}
+
+
+def _run(argv: list[str], env: dict[str, str]) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "app.cli", *argv], cwd=PROJECT_ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def _forwarded(client: DaemonClient, argv: list[str], env: dict[str, str]) -> bool:
+    """Run `argv` in a new process; True if the daemon handled a request for it."""
+    before = client.call("ping")["requests"]
+    _run(argv, env)
+    # The second ping is one request itself
+    return client.call("ping")["requests"] - before > 1
+
+
+class _FailingDaemon(AudioDaemon):
+    """Accepts `cli` requests and fails them after "running" the command."""
+
+    def __init__(self) -> None:
+        super().__init__(SimulatedBackend())
+        self.ran = 0
+
+    def _cli(self, argv: list[str]) -> dict:
+        self.ran += 1
+        raise RuntimeError("command failed halfway")
+
+
+def _check_no_local_rerun(tmp: Path) -> bool:
+    """forward() against a daemon that fails after accepting the request."""
+    import contextlib
+    import io
+    import threading
+
+    state = os.environ[STATE_ENV]
+    os.environ[STATE_ENV] = str(tmp / "failing.json")
+    daemon = _FailingDaemon()
+    thread = threading.Thread(target=daemon.serve, args=(f"unix:{tmp / 'failing.sock'}", False), daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not Path(os.environ[STATE_ENV]).exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with contextlib.redirect_stderr(io.StringIO()):
+            rc = forward(["win", "list"])
+        with DaemonClient.connect() as client:
+            client.call("shutdown")
+        thread.join(timeout=5)
+    finally:
+        os.environ[STATE_ENV] = state
+    return rc == 1 and daemon.ran == 1
+
+
+def _check_reply_isolated() -> bool:
+    """`cli` replies while another thread keeps printing to sys.stdout."""
+    import contextlib
+    import io
+    import threading
+
+    # The enumeration latency keeps each command running while the thread prints
+    daemon = AudioDaemon(SimulatedBackend(latency={"enumerate": 5.0}))
+    stop = threading.Event()
+
+    def chatter() -> None:
+        while not stop.is_set():
+            print("[lane] unrelated output")
+            time.sleep(0.0005)
+
+    with contextlib.redirect_stdout(io.StringIO()) as process_out:
+        noise = threading.Thread(target=chatter)
+        noise.start()
+        try:
+            replies = [daemon.dispatch("cli", {"argv": ["win", "list"]}) for _ in range(20)]
+            bad = daemon.dispatch("cli", {"argv": ["win", "no-such-command"]})
+        finally:
+            stop.set()
+            noise.join()
+    isolated = all(r["rc"] == 0 and "Playback devices:" in r["output"] and "[lane]" not in r["output"] for r in replies)
+    return isolated and bad["rc"] == 2 and "invalid choice" in bad["error_output"] and "invalid choice" not in process_out.getvalue()
+
+
+def _fmt(samples: list[float]) -> str:
+    return f"median {statistics.median(samples) * 1e3:8.2f} ms  min {min(samples) * 1e3:8.2f} ms"
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.daemon_roundtrip")
+    p.add_argument("--runs", type=int, default=15)
+    p.add_argument("--backend", default="simulated:latency.enumerate=15,latency.set_default=5")
+    args = p.parse_args(argv)
+
+    tmp = Path(tempfile.mkdtemp())
+    env = dict(os.environ, **{STATE_ENV: str(tmp / "daemon.json")})
+    env.pop("SSB_NO_DAEMON", None)
+    os.environ[STATE_ENV] = env[STATE_ENV]
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "app.cli", "--backend", args.backend, "daemon", "--address", f"unix:{tmp / 'daemon.sock'}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        client = None
+        deadline = time.monotonic() + 10
+        while client is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+            client = DaemonClient.connect()
+        if client is None:
+            print("daemon did not start")
+            return 1
+        with client:
+            print(f"daemon: {client.call('ping')}")
+            for label, cmd in COMMANDS.items():
+                cold = [_run(["--backend", args.backend, *cmd], env) for _ in range(args.runs)]
+                forwarded = [_run(cmd, env) for _ in range(args.runs)]
+                rpc = []
+                for _ in range(args.runs):
+                    t0 = time.perf_counter()
+                    client.call("cli", {"argv": cmd})
+                    rpc.append(time.perf_counter() - t0)
+                print(f"{label}:")
+                print(f"  {'cold':>9}: {_fmt(cold)}")
+                print(f"  {'forwarded':>9}: {_fmt(forwarded)}")
+                print(f"  {'rpc':>9}: {_fmt(rpc)}")
+
+            cmd = COMMANDS["win list"]
+            checks = {
+                "forwarded": _forwarded(client, cmd, env),
+                "same SSB_BACKEND forwarded": _forwarded(client, cmd, {**env, "SSB_BACKEND": args.backend}),
+                "other SSB_BACKEND local": not _forwarded(client, cmd, {**env, "SSB_BACKEND": "simulated:seed=99"}),
+                "SSB_RECORD local": not _forwarded(client, cmd, {**env, "SSB_BACKEND": "simulated", "SSB_RECORD": str(tmp / "t.jsonl")}),
+                "SSB_NO_DAEMON local": not _forwarded(client, cmd, {**env, "SSB_NO_DAEMON": "1"}),
+                "SSB_NO_DAEMON=0 forwarded": _forwarded(client, cmd, {**env, "SSB_NO_DAEMON": "0"}),
+            }
+            client.call("shutdown")
+        daemon.wait(timeout=5)
+    finally:
+        if daemon.poll() is None:
+            daemon.terminate()
+            daemon.wait(timeout=5)
+    checks["no local re-run after send"] = _check_no_local_rerun(tmp)
+    checks["reply without other threads"] = _check_reply_isolated()
+    for name, ok in checks.items():
+        print(f"  {name:<28} {'ok' if ok else 'FAILED'}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
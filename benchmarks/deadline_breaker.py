@@ -0,0 +1,129 @@
+"""Tail latency of a refresh with one stalling endpoint: no deadline vs. deadline + breaker.
+
+Run: python -m benchmarks.deadline_breaker [--stall-ms 1500] [--timeout-ms 300] [--rounds 6]
+
+One endpoint of the stub topology blocks in OpenPropertyStore for `--stall-ms`
+(a flaky Bluetooth headset). Without a deadline every refresh pays the stall. With
+call_with_deadline() the first refreshes return a typed timeout after
+`--timeout-ms`; once the breaker opens for that endpoint, refreshes skip it and
+complete normally until the cool-down expires.
+
+Checks (exit code 1 if one fails): the refreshes stay within the deadline; a
+timed-out call records a stall only for the keys its own worker was tracking,
+not for a call tracked on another thread at the same time; one stall counts as
+one failure, also when the call is keyed and tracks the same key inside and
+when the abandoned call returns later; set_default_within()
+keys the breaker by endpoint id, so a name is skipped once the breaker opened
+for its endpoint during an enumeration.
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+
+from audio import windows as win
+from audio.deadline import CircuitBreaker, call_with_deadline, device_breaker
+from audio.windows import DeviceSnapshot, take_snapshot
+from benchmarks._stubs import StubSystem
+
+
+def check_other_thread(timeout_s: float) -> bool:
+    """A timeout must not count a stall for a key another thread is tracking."""
+    breaker = CircuitBreaker(threshold=1, stall_after=10.0)
+    inside, release = threading.Event(), threading.Event()
+
+    def other_call() -> None:
+        with breaker.track("{other}"):
+            inside.set()
+            release.wait(5.0)
+
+    def stuck_call() -> None:
+        with breaker.track("{stuck}"):
+            time.sleep(timeout_s * 3)
+
+    other = threading.Thread(target=other_call)
+    other.start()
+    inside.wait(5.0)
+    res = call_with_deadline(stuck_call, timeout=timeout_s, breaker=breaker)
+    isolated = res.timed_out and breaker.state("{stuck}") == "open" and breaker.state("{other}") == "closed"
+    release.set()
+    other.join()
+    return isolated and breaker.open_keys() == ["{stuck}"]
+
+
+def check_one_stall(timeout_s: float) -> bool:
+    """An abandoned call counts one failure for its key, however it is tracked."""
+    counts = []
+    for key in (None, "{dev}"):
+        breaker = CircuitBreaker(threshold=3, stall_after=timeout_s / 2)
+        returned = threading.Event()
+
+        def slow() -> None:
+            with breaker.track("{dev}"):
+                time.sleep(timeout_s * 2)
+            returned.set()
+
+        res = call_with_deadline(slow, timeout=timeout_s, key=key, breaker=breaker)
+        returned.wait(5.0)
+        time.sleep(0.01)  # let the outer track() of the keyed call finish as well
+        counts.append((res.timed_out, breaker._failures.get("{dev}"), breaker.state("{dev}")))
+    return counts == [(True, 1, "closed")] * 2
+
+
+def check_name_keyed_by_id() -> bool:
+    """set_default_within(name) consults the breaker entry of the endpoint id."""
+    device_id = "{0.0.0.00000000}.{breaker-check}"
+    breaker = device_breaker()
+    previous = win._snapshot_cache
+    win._snapshot_cache = DeviceSnapshot(playback=[{"id": device_id, "name": "Breaker Check Speakers"}], taken_at=time.monotonic())
+    try:
+        for _ in range(breaker.threshold):
+            breaker.record_failure(device_id)
+        return win.set_default_within("Breaker Check Speakers", "render").skipped
+    finally:
+        breaker.record_success(device_id)
+        win._snapshot_cache = previous
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.deadline_breaker")
+    p.add_argument("--stall-ms", type=float, default=1500.0)
+    p.add_argument("--timeout-ms", type=float, default=300.0)
+    p.add_argument("--rounds", type=int, default=6)
+    p.add_argument("--cooldown-s", type=float, default=60.0)
+    args = p.parse_args(argv)
+
+    system = StubSystem(playback=6, recording=4)
+    flaky = system.devices[2]
+    flaky.stall_s = args.stall_ms / 1000.0
+
+    t0 = time.perf_counter()
+    snap = take_snapshot(system.new_enumerator(), breaker=CircuitBreaker())
+    print(f"no deadline:   {(time.perf_counter() - t0) * 1e3:7.1f} ms, {len(snap.playback)} playback devices")
+
+    breaker = CircuitBreaker(cooldown=args.cooldown_s, stall_after=args.timeout_ms / 2000.0)
+    worst = 0.0
+    for i in range(args.rounds):
+        t0 = time.perf_counter()
+        res = call_with_deadline(take_snapshot, system.new_enumerator(), breaker, timeout=args.timeout_ms / 1000.0, breaker=breaker)
+        elapsed = (time.perf_counter() - t0) * 1e3
+        worst = max(worst, elapsed)
+        listed = len(res.value.playback) if res.ok else "-"
+        print(f"round {i + 1}:       {elapsed:7.1f} ms, timed_out={res.timed_out!s:5} playback={listed}  breaker[{flaky.name}]={breaker.state(flaky.id_)}")
+    print(f"worst refresh with deadline: {worst:.1f} ms (bound {args.timeout_ms:.0f} ms)")
+
+    checks = {
+        "within deadline": worst < args.timeout_ms + 100,
+        "other thread's key kept": check_other_thread(args.timeout_ms / 1000.0),
+        "one stall = one failure": check_one_stall(args.timeout_ms / 1000.0),
+        "name keyed by endpoint id": check_name_keyed_by_id(),
+    }
+    for name, ok in checks.items():
+        print(f"  {name:<26} {'ok' if ok else 'FAILED'}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
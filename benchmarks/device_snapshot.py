@@ -0,0 +1,107 @@
+"""COM calls per UI refresh: legacy enumeration vs. DeviceSnapshot.
+
+Run: python -m benchmarks.device_snapshot [--playback N] [--recording N] [--inactive N]
+
+The legacy path is modelled on the pre-snapshot code: `App.refresh_devices` called
+list_playback_devices() and list_recording_devices() (each: pycaw GetAllDevices plus
+_ids_for_flow for render and capture), then get_default_playback_id() and
+get_default_recording_id().
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from audio import windows as win
+from benchmarks._stubs import DEVICE_STATEMASK_ALL, StubSystem
+
+
+def _pycaw_create_device(dev) -> None:
+    # pycaw AudioUtilities.CreateDevice reads the id, state and every property
+    dev.GetId()
+    dev.GetState()
+    store = dev.OpenPropertyStore(0)
+    for j in range(store.GetCount()):
+        pk = store.GetAt(j)
+        value = store.GetValue(pk)
+        value.GetValue()
+        value.clear()
+
+
+def _legacy_get_all_devices(system: StubSystem) -> None:
+    coll = system.new_enumerator().EnumAudioEndpoints(win.E_ALL, DEVICE_STATEMASK_ALL)
+    for i in range(coll.GetCount()):
+        dev = coll.Item(i)
+        # GetAllDevices builds every AudioDevice twice (filter + append)
+        _pycaw_create_device(dev)
+        _pycaw_create_device(dev)
+
+
+def _legacy_ids_for_flow(system: StubSystem, flow: int) -> None:
+    coll = system.new_enumerator().EnumAudioEndpoints(flow, win.DEVICE_STATE_ACTIVE)
+    for i in range(coll.GetCount()):
+        coll.Item(i).GetId()
+
+
+def _legacy_get_default_id(system: StubSystem, flow: int) -> None:
+    system.new_enumerator().GetDefaultAudioEndpoint(flow, win.E_MULTIMEDIA).GetId()
+
+
+def legacy_refresh(system: StubSystem) -> None:
+    for _list_call in range(2):
+        _legacy_get_all_devices(system)
+        _legacy_ids_for_flow(system, win.E_RENDER)
+        _legacy_ids_for_flow(system, win.E_CAPTURE)
+    _legacy_get_default_id(system, win.E_RENDER)
+    _legacy_get_default_id(system, win.E_CAPTURE)
+
+
+def snapshot_refresh(system: StubSystem) -> win.DeviceSnapshot:
+    return win.take_snapshot(system.new_enumerator())
+
+
+def _measure(label: str, system: StubSystem, fn, repeat: int) -> dict:
+    system.reset()
+    fn(system)
+    calls = dict(system.calls)
+    total = system.total_calls()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(system)
+    elapsed_us = (time.perf_counter() - t0) / repeat * 1e6
+    return {"label": label, "total": total, "calls": calls, "us_per_refresh": elapsed_us}
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.device_snapshot")
+    p.add_argument("--playback", type=int, default=8)
+    p.add_argument("--recording", type=int, default=6)
+    p.add_argument("--inactive", type=int, default=10)
+    p.add_argument("--repeat", type=int, default=200)
+    args = p.parse_args(argv)
+
+    system = StubSystem(playback=args.playback, recording=args.recording, inactive=args.inactive)
+    snap = snapshot_refresh(system)
+    assert len(snap.playback) == args.playback and len(snap.recording) == args.recording
+    assert snap.default_playback_id and snap.default_recording_id
+
+    rows = [
+        _measure("legacy", system, legacy_refresh, args.repeat),
+        _measure("snapshot", system, snapshot_refresh, args.repeat),
+    ]
+    print(f"devices: {args.playback} playback, {args.recording} recording, {args.inactive} inactive")
+    for row in rows:
+        calls = row["calls"]
+        print(
+            f"{row['label']:>8}: {row['total']:5d} COM calls/refresh, "
+            f"{calls.get('CoCreateInstance', 0)} enumerators, "
+            f"{calls.get('Enumerator.EnumAudioEndpoints', 0)} EnumAudioEndpoints, "
+            f"{row['us_per_refresh']:.1f} us/refresh (stub)"
+        )
+    print(f"reduction: {rows[0]['total'] / max(1, rows[1]['total']):.1f}x fewer COM calls")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+"""DeviceTable under synthetic notifications: incremental updates vs. re-enumeration.
+
+Run: python -m benchmarks.device_table [--events 2000] [--seed 1]
+
+A stub topology (benchmarks/_stubs.py) is changed step by step the way Windows
+reports it: an endpoint is plugged in, removed, disabled/re-enabled, renamed, or
+a default role moves to another endpoint (removing or disabling a default also
+moves the default, as Windows does). After every change the matching
+IMMNotificationClient callback is fed to a DeviceTable seeded from the initial
+snapshot.
+
+Checks (exit code 1 if one fails): after every event the table's snapshot equals
+a fresh take_snapshot() of the stub topology (endpoints, names, order, per-role
+defaults), and every callback publishes the typed DeviceEvent it stands for.
+The COM calls of the incremental path are compared with re-enumerating per event.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any
+
+from audio import windows as win
+from benchmarks._stubs import StubDevice, StubPropertyKey, StubSystem
+
+KINDS = ("add", "remove", "state", "default", "rename")
+ROLES = (win.E_CONSOLE, win.E_MULTIMEDIA, win.E_COMMUNICATIONS)
+
+
+def _describe(system: StubSystem) -> Any:
+    """DeviceTable describe() over the stub, mirroring audio.windows._describe_endpoint."""
+
+    def describe(device_id: str) -> dict[str, Any] | None:
+        try:
+            dev = system.new_enumerator().GetDevice(device_id)
+        except OSError:
+            return None
+        return {"id": device_id, "name": win._friendly_name(dev) or "(Unbenannt)", "flow": win._flow_from_id(device_id), "state": int(dev.GetState())}
+
+    return describe
+
+
+def _active(system: StubSystem, flow: int) -> list[StubDevice]:
+    return [d for d in system.devices if d.flow == flow and d.state & win.DEVICE_STATE_ACTIVE]
+
+
+def _move_defaults(system: StubSystem, table: win.DeviceTable, flow: int) -> None:
+    """Reassign roles whose default is gone or inactive (OnDefaultDeviceChanged per role)."""
+    active = _active(system, flow)
+    ids = {d.id_ for d in active}
+    for role in ROLES:
+        if system.defaults.get((flow, role)) in ids:
+            continue
+        new = active[0].id_ if active else None
+        system.defaults[(flow, role)] = new
+        table.on_default_device_changed(flow, role, new)
+
+
+def step(rng: random.Random, system: StubSystem, table: win.DeviceTable, n: int) -> tuple[str, type | None]:
+    """Apply one random change to `system` and feed its notification(s) to `table`.
+
+    Returns the kind of change and the DeviceEvent type the table should publish
+    first (None: nothing). The table is seeded with active endpoints only, so an
+    unknown endpoint that becomes active is published as DeviceAdded and renaming
+    one is ignored; renaming a known endpoint is published as DeviceRenamed.
+    """
+    kind = rng.choice(KINDS)
+    if kind != "add" and not system.devices:
+        kind = "add"
+    if kind == "add":
+        flow = rng.choice((win.E_RENDER, win.E_CAPTURE))
+        dev = StubDevice(system.calls, f"{{0.0.{flow}.00000000}}.{{hotplug-{n:05d}}}", f"Hotplug {n}", flow)
+        system.devices.append(dev)
+        table.on_device_added(dev.id_)
+        return kind, win.DeviceAdded
+    if kind == "remove":
+        dev = rng.choice(system.devices)
+        system.devices.remove(dev)
+        table.on_device_removed(dev.id_)
+        _move_defaults(system, table, dev.flow)
+        return kind, win.DeviceRemoved
+    if kind == "state":
+        dev = rng.choice(system.devices)
+        known = table.get(dev.id_) is not None
+        dev.state = win.DEVICE_STATE_DISABLED if dev.state & win.DEVICE_STATE_ACTIVE else win.DEVICE_STATE_ACTIVE
+        table.on_device_state_changed(dev.id_, dev.state)
+        _move_defaults(system, table, dev.flow)
+        return kind, win.DeviceAdded if not known and dev.state & win.DEVICE_STATE_ACTIVE else win.DeviceStateChanged
+    if kind == "rename":
+        dev = rng.choice(system.devices)
+        known = table.get(dev.id_) is not None
+        dev.rename(f"Renamed {n}")
+        table.on_property_value_changed(dev.id_, StubPropertyKey(*win.PKEY_DEVICE_FRIENDLY_NAME))
+        return kind, win.DeviceRenamed if known else None
+    flow = rng.choice((win.E_RENDER, win.E_CAPTURE))
+    active = _active(system, flow)
+    if not active:
+        # Nothing to move the default to; feed a no-op change instead
+        table.on_default_device_changed(flow, win.E_MULTIMEDIA, system.defaults.get((flow, win.E_MULTIMEDIA)))
+        return kind, win.DefaultDeviceChanged
+    role, dev = rng.choice(ROLES), rng.choice(active)
+    system.defaults[(flow, role)] = dev.id_
+    table.on_default_device_changed(flow, role, dev.id_)
+    return kind, win.DefaultDeviceChanged
+
+
+def _same(a: win.DeviceSnapshot, b: win.DeviceSnapshot) -> bool:
+    return a.playback == b.playback and a.recording == b.recording and a.defaults == b.defaults
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.device_table")
+    p.add_argument("--events", type=int, default=2000)
+    p.add_argument("--playback", type=int, default=6)
+    p.add_argument("--recording", type=int, default=4)
+    p.add_argument("--inactive", type=int, default=6)
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    system = StubSystem(playback=args.playback, recording=args.recording, inactive=args.inactive)
+    table = win.DeviceTable(describe=_describe(system))
+    table.load(win.take_snapshot(system.new_enumerator()))
+    published: list[win.DeviceEvent] = []
+    table.subscribe(published.append)
+
+    counts = dict.fromkeys(KINDS, 0)
+    mismatches: list[str] = []
+    wrong_event: list[str] = []
+    table_calls = enum_calls = 0
+    table_s = enum_s = 0.0
+    for n in range(args.events):
+        published.clear()
+        system.reset()
+        t0 = time.perf_counter()
+        kind, expected = step(rng, system, table, n)
+        got = table.snapshot()
+        table_s += time.perf_counter() - t0
+        table_calls += system.total_calls()
+        counts[kind] += 1
+        if (type(published[0]) if published else None) is not expected:
+            wrong_event.append(f"event {n} ({kind}): expected {expected.__name__ if expected else 'none'}, got {published[:1]}")
+        elif isinstance(published[0] if published else None, win.DeviceRenamed) and published[0].name != (table.get(published[0].device_id) or {}).get("name"):
+            wrong_event.append(f"event {n} ({kind}): rename published {published[0].name!r}, table has {table.get(published[0].device_id)}")
+
+        system.reset()
+        t0 = time.perf_counter()
+        fresh = win.take_snapshot(system.new_enumerator())
+        enum_s += time.perf_counter() - t0
+        enum_calls += system.total_calls()
+        if not _same(got, fresh):
+            mismatches.append(f"event {n} ({kind}): table {got.playback}/{got.recording}/{got.defaults} != fresh {fresh.playback}/{fresh.recording}/{fresh.defaults}")
+
+    print(f"events: {args.events} ({', '.join(f'{k} {v}' for k, v in counts.items())})")
+    print(f"{'table':>12}: {table_calls / args.events:6.1f} COM calls/event, {table_s / args.events * 1e6:7.1f} us/event (stub)")
+    print(f"{'re-enumerate':>12}: {enum_calls / args.events:6.1f} COM calls/event, {enum_s / args.events * 1e6:7.1f} us/event (stub)")
+
+    checks = {
+        "matches fresh snapshot": not mismatches,
+        "typed events": not wrong_event,
+    }
+    for name, ok in checks.items():
+        print(f"  {name:<24} {'ok' if ok else 'FAILED'}")
+    for line in (mismatches + wrong_event)[:3]:
+        print(f"    {line}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""Endpoint enumeration on a machine with many stale endpoints: pycaw vs. enumerate_endpoints().
+
+Run: python -m benchmarks.endpoint_enumeration [--active N] [--inactive N] [--call-us US]
+
+The pycaw path is AudioUtilities.GetAllDevices() followed by the old
+_split_devices_by_flow filter: every endpoint in DEVICE_STATEMASK_ALL is visited
+and its whole property store is read (twice, see device_snapshot.py).
+enumerate_endpoints() asks EnumAudioEndpoints for active endpoints only and reads
+just the projected fields by PROPERTYKEY. `--call-us` estimates wall time on a
+real host, where each COM round trip costs tens of microseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from audio import windows as win
+from benchmarks._stubs import DEVICE_STATEMASK_ALL, StubSystem
+from benchmarks.device_snapshot import _pycaw_create_device
+
+
+def pycaw_path(system: StubSystem) -> list[dict]:
+    enum = system.new_enumerator()
+    coll = enum.EnumAudioEndpoints(win.E_ALL, DEVICE_STATEMASK_ALL)
+    devices = []
+    for i in range(coll.GetCount()):
+        dev = coll.Item(i)
+        _pycaw_create_device(dev)
+        _pycaw_create_device(dev)
+        devices.append(dev)
+    # _split_devices_by_flow: keep active endpoints, then only id + name are used
+    return [{"id": d.GetId(), "name": d.name} for d in devices if d.GetState() == win.DEVICE_STATE_ACTIVE]
+
+
+def projected_path(system: StubSystem, fields: tuple[str, ...] = ("id", "name")) -> list[dict]:
+    return win.enumerate_endpoints(win.E_ALL, win.DEVICE_STATE_ACTIVE, fields, enumerator=system.new_enumerator(), breaker=None)
+
+
+def _measure(system: StubSystem, fn, repeat: int) -> tuple[int, float]:
+    system.reset()
+    fn(system)
+    calls = system.total_calls()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(system)
+    return calls, (time.perf_counter() - t0) / repeat * 1e3
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.endpoint_enumeration")
+    p.add_argument("--active", type=int, default=8)
+    p.add_argument("--inactive", type=int, default=300)
+    p.add_argument("--props", type=int, default=40, help="properties per endpoint")
+    p.add_argument("--call-us", type=float, default=20.0, help="assumed cost of one COM call on Windows")
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args(argv)
+
+    system = StubSystem(playback=args.active // 2, recording=args.active - args.active // 2, inactive=args.inactive, extra_props=args.props)
+    expected = sorted(d["id"] for d in pycaw_path(system))
+    assert sorted(d["id"] for d in projected_path(system)) == expected
+
+    rows = [
+        ("pycaw GetAllDevices", lambda s: pycaw_path(s)),
+        ("projected id,name", lambda s: projected_path(s)),
+        ("projected all fields", lambda s: projected_path(s, win.ENDPOINT_FIELDS)),
+    ]
+    print(f"endpoints: {args.active} active, {args.inactive} inactive, {args.props} properties each")
+    baseline = None
+    for label, fn in rows:
+        calls, ms = _measure(system, fn, args.repeat)
+        est_ms = calls * args.call_us / 1000.0
+        baseline = baseline or est_ms
+        print(f"{label:>22}: {calls:7d} COM calls, {ms:8.2f} ms (stub), ~{est_ms:8.1f} ms est. ({baseline / max(est_ms, 1e-9):.0f}x)")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""Import-time budget for `app.cli --help` and `app.cli /doctor`.
+
+Run: python -m benchmarks.import_budget [--runs 3]
+
+Each command runs under `python -X importtime`; the summed self time of all
+imports (best of --runs) must stay under its budget, and modules a command does
+not need (json/subprocess for --help, the audio backends for /doctor) must not
+be imported at all. `--help` only prints the argparse usage, so json (config
+files, daemon protocol) is on its forbidden list; what the bare interpreter
+already imports at startup (`python -c pass`, e.g. a .pth file in site-packages
+pulling in json) is not held against the command. Exits with 1 when a budget is
+exceeded. Nothing runs it automatically: run it by hand after changing imports
+in app/ (see README_DEV.md). Linux only: on Windows the optional COM stack
+changes what gets imported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+from app.cli import parse_importtime
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# argv -> (budget in ms of summed import self time, modules that must not be imported)
+BUDGETS: dict[tuple[str, ...], tuple[float, tuple[str, ...]]] = {
+    ("--help",): (50.0, ("json", "subprocess", "socket", "audio", "app.daemon", "comtypes")),
+    ("/doctor",): (70.0, ("socket", "asyncio", "audio.windows", "audio.backend", "app.daemon")),
+}
+
+
+def measure(argv: tuple[str, ...]) -> tuple[float, set[str]]:
+    return _importtime(["-m", "app.cli", *argv])
+
+
+def _importtime(args: list[str]) -> tuple[float, set[str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    rows = parse_importtime(proc.stderr)
+    return sum(r[1] for r in rows) / 1000, {r[0] for r in rows}
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.import_budget")
+    p.add_argument("--runs", type=int, default=3)
+    args = p.parse_args(argv)
+
+    if sys.platform == "win32":
+        print("skipped: the import budget is defined for Linux")
+        return 0
+    startup = _importtime(["-c", "pass"])[1]
+    failed = False
+    for cmd, (budget_ms, forbidden) in BUDGETS.items():
+        samples = [measure(cmd) for _ in range(args.runs)]
+        best_ms = min(ms for ms, _ in samples)
+        modules = samples[0][1]
+        unwanted = sorted(m for m in modules - startup if any(m == f or m.startswith(f + ".") for f in forbidden))
+        ok = best_ms <= budget_ms and not unwanted
+        failed |= not ok
+        print(f"app.cli {' '.join(cmd):<8} {best_ms:6.1f} ms / {budget_ms:.0f} ms budget, {len(modules)} modules  {'ok' if ok else 'OVER BUDGET'}")
+        if unwanted:
+            print(f"  unexpected imports: {', '.join(unwanted)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+"""Per-call cost of the always-on instrumentation (audio/metrics.py).
+
+Run: python -m benchmarks.metrics_overhead [--calls 1000000]
+
+Compares a no-op function with the same function under @timed(...), and times
+incr(). The variants are timed in alternating short rounds; the overhead is
+the median over rounds of (variant - bare call in the same round), so a
+frequency change or a busy neighbour shifts both sides of a difference alike. The budget is 1 µs per instrumented
+call; the script exits non-zero if it is exceeded, so it can serve as a CI gate. It also exits non-zero if
+threads updating one histogram and one counter concurrently lose a sample.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import threading
+import time
+from typing import Any
+
+from audio.metrics import Metrics
+
+BUDGET_NS = 1000
+
+
+def _overhead_ns(bare: Any, fns: dict[str, Any], calls: int, rounds: int = 40) -> tuple[float, dict[str, float]]:
+    """Median bare per-call time and median per-round overhead of each of `fns` over it."""
+    per_round = max(calls // rounds, 1)
+    samples: dict[str, list[float]] = {name: [] for name in ("bare", *fns)}
+    for _ in range(rounds):
+        for name, fn in (("bare", bare), *fns.items()):
+            t0 = time.perf_counter_ns()
+            for _ in range(per_round):
+                fn()
+            samples[name].append((time.perf_counter_ns() - t0) / per_round)
+    base = samples.pop("bare")
+    return statistics.median(base), {name: statistics.median(t - b for t, b in zip(times, base)) for name, times in samples.items()}
+
+
+def check_threads(threads: int = 8, calls: int = 20_000) -> bool:
+    """Concurrent @timed calls, observe() and incr() from several threads: no lost updates."""
+    m = Metrics()
+    instrumented = m.timed("volume")(lambda: None)
+
+    def work() -> None:
+        for _ in range(calls):
+            instrumented()
+            m.observe("mute", 1_000)
+            m.incr("timeout", "set_default")
+
+    pool = [threading.Thread(target=work) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    summary = m.summary()
+    expected = threads * calls
+    return summary["volume"]["count"] == expected and summary["mute"]["count"] == expected and m.counters["timeout"]["set_default"] == expected
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.metrics_overhead")
+    p.add_argument("--calls", type=int, default=200_000, help="calls per variant")
+    args = p.parse_args(argv)
+
+    m = Metrics()
+
+    def bare() -> None:
+        return None
+
+    instrumented = m.timed("enumerate")(bare)
+
+    def count() -> None:
+        m.incr("hresult", "0x80070490")
+
+    base, overhead = _overhead_ns(bare, {"timed": instrumented, "incr": count}, args.calls * 4)
+    timed_ns, incr_ns = overhead["timed"], overhead["incr"]
+    print(f"bare call:        {base:7.1f} ns")
+    print(f"@timed overhead:  {timed_ns:7.1f} ns/call (budget {BUDGET_NS} ns)")
+    print(f"incr() overhead:  {incr_ns:7.1f} ns/call")
+    threads_ok = check_threads()
+    print(f"8 threads, no lost updates: {'ok' if threads_ok else 'FAILED'}")
+    return 0 if max(timed_ns, incr_ns) < BUDGET_NS and threads_ok else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+"""Profile apply: write every setting vs. the diff-based plan (profiles/apply.py).
+
+Run: python -m benchmarks.profile_apply [--iterations 500] [--seed 1]
+
+Two profiles alternate ("switch") and each is applied again right after
+("re-apply"), against SimulatedBackend on a virtual clock. "naive" sets both
+defaults, volume and mute every time; "diff" reads the state once and only
+executes the steps whose target differs, planned like `profile apply` does
+(ProfileCompiler, CompiledProfile.plan) over a temporary profiles directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from audio.simulated import SimulatedBackend
+from benchmarks.simulated_backend import LATENCY_MS, VirtualClock, _percentiles
+from profiles.apply import Plan, State, execute_step, read_state
+from profiles.compiler import ProfileCompiler
+
+PROFILES = [
+    {"name": "Dictation", "playback": "Simulated Speakers 1", "recording": "Simulated Microphone 2", "volume": 35, "mute": False},
+    {"name": "Meeting", "playback": "Simulated Speakers 3", "recording": "Simulated Microphone 2", "volume": {"master": 60}, "mute": False},
+]
+
+
+def apply_naive(profile: dict, backend: SimulatedBackend) -> None:
+    backend.set_default_playback(profile["playback"])
+    backend.set_default_recording(profile["recording"])
+    volume = profile["volume"]
+    backend.set_master_volume(volume["master"] if isinstance(volume, dict) else volume)
+    backend.mute_master(profile["mute"])
+
+
+def profile_compiler_for(profiles: list[dict]) -> ProfileCompiler:
+    """ProfileCompiler over a temporary directory holding `profiles` (memory cache only)."""
+    directory = Path(tempfile.mkdtemp())
+    for i, profile in enumerate(profiles):
+        (directory / f"profile-{i}.json").write_text(json.dumps(profile), encoding="utf-8")
+    return ProfileCompiler(directory, cache_path=None)
+
+
+def plan_for(compiler: ProfileCompiler, name: str, backend: Any, state: State | None = None) -> Plan:
+    """Plan of profile `name` the way app.cli `profile apply` builds it."""
+    snapshot = state.snapshot if state is not None else backend.take_snapshot()
+    compiled = compiler.get(name, snapshot)
+    if state is None:
+        state = read_state(backend, volume=compiled.volume is not None, mute=compiled.mute is not None, snapshot=snapshot)
+    return compiled.plan(state)
+
+
+def apply_diff(profile: dict, backend: SimulatedBackend, compiler: ProfileCompiler) -> None:
+    for step in plan_for(compiler, profile["name"], backend).operations:
+        execute_step(step, backend)
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.profile_apply")
+    p.add_argument("--iterations", type=int, default=500)
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args(argv)
+
+    latency = dict(LATENCY_MS, get_volume=(0.2, 0.5))
+    compiler = profile_compiler_for(PROFILES)
+    for label, apply in (("naive", apply_naive), ("diff", lambda profile, backend: apply_diff(profile, backend, compiler))):
+        clock = VirtualClock()
+        backend = SimulatedBackend(playback=8, recording=6, latency=latency, seed=args.seed, sleep=clock.sleep)
+        samples: dict[str, list[float]] = {"switch": [], "re-apply": []}
+        for i in range(args.iterations):
+            profile = PROFILES[i % len(PROFILES)]
+            for scenario in ("switch", "re-apply"):
+                t0 = clock.now
+                apply(profile, backend)
+                samples[scenario].append(clock.now - t0)
+        writes = sum(backend.calls[op] for op in ("set_default", "volume", "mute"))
+        print(f"{label}:")
+        for scenario, values in samples.items():
+            print(f"  {scenario:>8}: {_percentiles(values)}")
+        print(f"  writes: {writes} for {2 * args.iterations} applies, calls: {dict(backend.calls)}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
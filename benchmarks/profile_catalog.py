@@ -0,0 +1,113 @@
+"""Profile catalog with 1,000 profiles: scan, incremental refresh, queries, `profile list`.
+
+Run: python -m benchmarks.profile_catalog [--profiles 1000] [--repeat 50]
+
+A temporary directory holds --profiles room/user profiles with tags and device
+names. Measured (wall clock, real files):
+
+  find_profile    the pre-catalog lookup (glob + parse until the "name" matches)
+  cold scan       first ProfileCatalog query: stat + parse every file
+  refresh         no file changed: stat only, nothing parsed
+  refresh (edit)  10 files rewritten: only those are parsed again
+  tag / device    index lookups ("meeting", one device name)
+  list (warm)     `app.cli profile list` in-process on the warm catalog (daemon)
+  list (process)  `python -m app.cli profile list` as a new process
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.simulated_backend import _percentiles
+from profiles.manager import ProfileCatalog, find_profile
+
+TAGS = ("meeting", "dictation", "music", "gaming", "late")
+
+
+def write_profiles(directory: Path, count: int) -> None:
+    for i in range(count):
+        profile = {
+            "name": f"Room {i:04d}",
+            "playback": f"Speakers {i % 12}",
+            "recording": f"Microphone {(i * 7) % 9}",
+            "volume": {"master": 20 + i % 60},
+            "mute": False,
+            "tags": [TAGS[i % len(TAGS)], f"floor-{i % 4}"],
+            "voicemeeter": None,
+        }
+        (directory / f"room-{i:04d}.json").write_text(json.dumps(profile, indent=2), encoding="utf-8")
+
+
+def _time(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.profile_catalog")
+    p.add_argument("--profiles", type=int, default=1000)
+    p.add_argument("--repeat", type=int, default=50)
+    args = p.parse_args(argv)
+
+    directory = Path(tempfile.mkdtemp())
+    write_profiles(directory, args.profiles)
+    last = f"Room {args.profiles - 1:04d}"
+
+    rows = [("find_profile", _time(lambda: find_profile(last, directory), max(1, args.repeat // 10)))]
+
+    t0 = time.perf_counter()
+    catalog = ProfileCatalog(directory)
+    n = len(catalog)
+    rows.append(("cold scan", [time.perf_counter() - t0]))
+    rows.append(("refresh", _time(catalog.refresh, args.repeat)))
+
+    edits = []
+    for r in range(args.repeat):
+        for i in range(10):
+            path = directory / f"room-{(r * 10 + i) % args.profiles:04d}.json"
+            data = json.loads(path.read_text(encoding="utf-8"))
+            data["volume"]["master"] = r % 100
+            path.write_text(json.dumps(data, indent=2) + " " * (r % 2), encoding="utf-8")
+        t0 = time.perf_counter()
+        stats = catalog.refresh()
+        edits.append(time.perf_counter() - t0)
+        assert stats["parsed"] == 10, stats
+    rows.append(("refresh (edit)", edits))
+    rows.append(("tag", _time(lambda: catalog.tagged("meeting"), args.repeat)))
+    rows.append(("device", _time(lambda: catalog.using_device("speakers 3"), args.repeat)))
+    rows.append(("find", _time(lambda: catalog.find(last), args.repeat)))
+
+    from app import cli
+
+    def list_warm() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.main(["profile", "list", "--directory", str(directory)], backend=object())
+
+    list_warm()
+    rows.append(("list (warm)", _time(list_warm, args.repeat)))
+    env = dict(os.environ, SSB_NO_DAEMON="1")
+    cmd = [sys.executable, "-m", "app.cli", "profile", "list", "--tag", "meeting", "--directory", str(directory)]
+    root = Path(__file__).resolve().parents[1]
+    rows.append(("list (process)", _time(lambda: subprocess.run(cmd, cwd=root, env=env, capture_output=True, check=True), 5)))
+
+    for label, values in rows:
+        print(f"{label:>15}: {_percentiles(values)}")
+    print(f"{n} profiles in {directory}, {len(catalog.tagged('meeting'))} tagged meeting, {catalog.parses} parses")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,151 @@
+"""Profile switch end to end: sequential steps vs. the transaction executor.
+
+Run: python -m benchmarks.profile_transaction [--iterations 40] [--seed 1]
+
+Two profiles with default devices, volume, mute and a VoiceMeeter preset
+alternate against SimulatedBackend and a fake VoiceMeeter (FakeVoicemeeter,
+PRESET_MS per preset load). Unlike the other profile benchmarks this one
+sleeps for real: parallel lanes only pay off in wall-clock time.
+
+  sequential    execute_step for each step in turn: the sum of all steps
+  transaction   run_transaction: playback, recording and VoiceMeeter lanes concurrently
+
+Then four checks, each reported as ok/FAILED (exit code 1 if one fails):
+
+  rollback      the volume write fails: the previous default devices are restored
+                role by role (Communications starts on another device than
+                Console/Multimedia)
+  deadline      the preset load hangs past --deadline: the switch returns at the
+                deadline and the Windows steps are undone
+  stuck undo    set-default calls hang: the switch returns after deadline plus
+                rollback timeout and reports the undo steps as unfinished
+  reapply       applying the active profile again does not reload its preset
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from audio.simulated import SimulatedBackend
+from audio.windows import E_COMMUNICATIONS
+from benchmarks.simulated_backend import _percentiles
+from benchmarks.profile_apply import plan_for, profile_compiler_for
+from profiles.apply import execute_step, read_state
+from profiles.transaction import run_transaction
+
+LATENCY_MS = {"set_default": ("lognormal", 15.0, 0.3), "volume": (0.3, 1.0), "mute": (0.3, 1.0), "get_volume": (0.1, 0.3)}
+PRESET_MS = 35.0
+
+PROFILES = [
+    {"name": "Dictation", "playback": "Simulated Speakers 1", "recording": "Simulated Microphone 2", "volume": 35, "mute": False, "voicemeeter": "dictation.xml"},
+    {"name": "Meeting", "playback": "Simulated Speakers 3", "recording": "Simulated Microphone 0", "volume": 60, "mute": False, "voicemeeter": "meeting.xml"},
+]
+
+
+class FakeVoicemeeter:
+    """connect()/load_preset() with a fixed load time, like audio/voicemeeter.py."""
+
+    def __init__(self, preset_ms: float = PRESET_MS) -> None:
+        self.preset_ms = preset_ms
+        self.loaded: list[str] = []
+
+    def connect(self) -> bool:
+        return True
+
+    def load_preset(self, path: str) -> bool:
+        time.sleep(self.preset_ms / 1e3)
+        self.loaded.append(path)
+        return True
+
+    def loaded_preset(self) -> str | None:
+        return self.loaded[-1] if self.loaded else None
+
+
+def _state(backend: SimulatedBackend) -> tuple:
+    return dict(backend.defaults), backend.volume, backend.muted
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.profile_transaction")
+    p.add_argument("--iterations", type=int, default=40)
+    p.add_argument("--deadline", type=float, default=0.15)
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args(argv)
+
+    vm = FakeVoicemeeter()
+    compiler = profile_compiler_for(PROFILES)
+
+    def plan_profile(profile: dict, backend: SimulatedBackend, state=None):
+        return plan_for(compiler, profile["name"], backend, state)
+
+    def sequential(profile: dict, backend: SimulatedBackend) -> bool:
+        return all(execute_step(step, backend, voicemeeter=vm) for step in plan_profile(profile, backend).operations)
+
+    def transaction(profile: dict, backend: SimulatedBackend) -> bool:
+        state = read_state(backend, volume=True, mute=True, preset=True, voicemeeter=vm)
+        return run_transaction(plan_profile(profile, backend, state), backend, state, voicemeeter=vm).ok
+
+    for label, switch in (("sequential", sequential), ("transaction", transaction)):
+        backend = SimulatedBackend(playback=6, recording=4, latency=LATENCY_MS, seed=args.seed)
+        samples = []
+        for i in range(args.iterations):
+            t0 = time.perf_counter()
+            if not switch(PROFILES[i % len(PROFILES)], backend):
+                print(f"{label}: switch {i} failed")
+                return 1
+            samples.append(time.perf_counter() - t0)
+        print(f"{label:>12}: {_percentiles(samples)}")
+
+    failed = False
+    backend = SimulatedBackend(playback=6, recording=4, latency=LATENCY_MS, seed=args.seed)
+    backend.set_default_role("Simulated Speakers 5", "playback", E_COMMUNICATIONS)
+    before = _state(backend)
+    state = read_state(backend, volume=True, mute=True)
+    plan = plan_profile(PROFILES[1], backend, state)
+    backend.fail_next("volume")
+    result = run_transaction(plan, backend, state, voicemeeter=vm)
+    ok = not result.ok and _state(backend) == before
+    failed |= not ok
+    print(f"{'rollback':>12}: {' | '.join(result.describe())} -> {'ok' if ok else 'FAILED'}")
+
+    backend = SimulatedBackend(playback=6, recording=4, latency=LATENCY_MS, seed=args.seed)
+    before = _state(backend)
+    state = read_state(backend, volume=True, mute=True)
+    plan = plan_profile(PROFILES[0], backend, state)
+    slow = FakeVoicemeeter(preset_ms=args.deadline * 1e3 * 3)
+    result = run_transaction(plan, backend, state, deadline=args.deadline, voicemeeter=slow)
+    ok = not result.ok and "voicemeeter" in result.timed_out and _state(backend) == before and result.elapsed < args.deadline + 0.1
+    failed |= not ok
+    print(f"{'deadline':>12}: {' | '.join(result.describe())} -> {'ok' if ok else 'FAILED'}")
+
+    # Last: the hung set-default calls keep the lane workers busy after returning
+    hang_s = args.deadline * 4
+    backend = SimulatedBackend(playback=6, recording=4, latency={**LATENCY_MS, "set_default": hang_s * 1e3}, seed=args.seed)
+    state = read_state(backend, volume=True, mute=True)
+    plan = plan_profile(PROFILES[0], backend, state)
+    result = run_transaction(plan, backend, state, deadline=args.deadline, rollback_timeout=args.deadline, voicemeeter=vm)
+    ok = (
+        not result.ok
+        and sorted(result.rollback_unfinished) == ["playback", "recording"]
+        and not any(result.rolled_back.values())
+        and result.elapsed < 2 * args.deadline + 0.1
+    )
+    failed |= not ok
+    print(f"{'stuck undo':>12}: {' | '.join(result.describe())} -> {'ok' if ok else 'FAILED'}")
+
+    backend = SimulatedBackend(playback=6, recording=4, latency=LATENCY_MS, seed=args.seed)
+    fresh = FakeVoicemeeter()
+    plans = []
+    for _ in range(2):
+        state = read_state(backend, volume=True, mute=True, preset=True, voicemeeter=fresh)
+        plans.append(plan_profile(PROFILES[0], backend, state))
+        run_transaction(plans[-1], backend, state, voicemeeter=fresh)
+    ok = fresh.loaded == [PROFILES[0]["voicemeeter"]] and not plans[1].operations
+    failed |= not ok
+    print(f"{'reapply':>12}: {plans[1].describe()[0]}, presets loaded: {len(fresh.loaded)} -> {'ok' if ok else 'FAILED'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
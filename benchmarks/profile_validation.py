@@ -0,0 +1,113 @@
+"""Schema validation and lazy migration of 1,000 profiles (profiles/manager.py).
+
+Run: python -m benchmarks.profile_validation [--profiles 1000] [--repeat 20]
+
+A temporary directory holds --profiles profiles: half in the old version 1
+format (no "version", short forms), half in version 2, and every 50th one
+invalid. Measured (wall clock, real files):
+
+  scan + validate   new ProfileCatalog: parse every file, then validate() once
+  validate (warm)   validate() again: cached per file, nothing is checked
+  validate (edit)   validate() after 10 files changed: only those are checked
+  validators        the compiled validators alone over all parsed profiles
+  migrate (first)   profile() for every name: v1 profiles are migrated
+  migrate (cached)  profile() again: served from the cache
+
+The exit code is 1 if "scan + validate" exceeds BUDGET_MS or the number of
+invalid profiles found is wrong.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.simulated_backend import _percentiles
+from profiles.manager import ProfileCatalog, validate_profile
+
+BUDGET_MS = 250.0
+
+
+def make_profile(i: int) -> dict:
+    if i % 50 == 49:
+        return {"name": f"Room {i:04d}", "volume": 140, "mute": "no"}
+    if i % 2:
+        return {
+            "name": f"Room {i:04d}",
+            "playback": f"Speakers {i % 12}",
+            "recording": f"Microphone {i % 9}",
+            "volume": 20 + i % 60,
+            "tags": "meeting",
+            "voicemeeter": "presets/room.xml",
+        }
+    return {
+        "version": 2,
+        "name": f"Room {i:04d}",
+        "playback": f"Speakers {i % 12}",
+        "recording": f"Microphone {i % 9}",
+        "volume": {"master": 20 + i % 60},
+        "mute": False,
+        "tags": ["dictation", f"floor-{i % 4}"],
+        "voicemeeter": None,
+    }
+
+
+def _time(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.profile_validation")
+    p.add_argument("--profiles", type=int, default=1000)
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args(argv)
+
+    directory = Path(tempfile.mkdtemp())
+    for i in range(args.profiles):
+        (directory / f"room-{i:04d}.json").write_text(json.dumps(make_profile(i), indent=2), encoding="utf-8")
+    expected_invalid = sum(1 for i in range(args.profiles) if i % 50 == 49)
+
+    t0 = time.perf_counter()
+    catalog = ProfileCatalog(directory)
+    invalid = catalog.validate()
+    cold = time.perf_counter() - t0
+    rows = [("scan + validate", [cold])]
+    rows.append(("validate (warm)", _time(catalog.validate, args.repeat)))
+
+    edits = []
+    for r in range(args.repeat):
+        for i in range(10):
+            n = (r * 10 + i) % args.profiles
+            (directory / f"room-{n:04d}.json").write_text(json.dumps(make_profile(n)) + " " * (r % 2), encoding="utf-8")
+        t0 = time.perf_counter()
+        catalog.refresh()
+        catalog.validate()
+        edits.append(time.perf_counter() - t0)
+    rows.append(("validate (edit)", edits))
+
+    parsed = [e.data for e in catalog.entries() if e.data is not None]
+    rows.append(("validators", _time(lambda: [validate_profile(d) for d in parsed], args.repeat)))
+    names = [e.name for e in catalog.entries()]
+    rows.append(("migrate (first)", _time(lambda: [catalog.profile(n) for n in names], 1)))
+    rows.append(("migrate (cached)", _time(lambda: [catalog.profile(n) for n in names], args.repeat)))
+
+    for label, values in rows:
+        print(f"{label:>16}: {_percentiles(values)}")
+    ok = cold * 1e3 <= BUDGET_MS and len(invalid) == expected_invalid
+    print(
+        f"{len(catalog)} profiles, {len(invalid)} invalid (expected {expected_invalid}), {catalog.migrations} migrated;"
+        f" scan + validate {cold * 1e3:.1f} ms (budget {BUDGET_MS:.0f} ms): {'ok' if ok else 'FAILED'}"
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
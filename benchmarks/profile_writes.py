@@ -0,0 +1,117 @@
+"""Profile writes: in-place rewrite vs. atomic change-detecting writes (profiles/manager.py).
+
+Run: python -m benchmarks.profile_writes [--profiles 1000]
+
+Saves --profiles profiles to a temporary directory four ways (real files, wall
+clock):
+
+  in place        open("w") + json.dump(indent=2) per file (the old save_profile)
+  save_profile    per file: canonical JSON, temp file, fsync, rename, directory fsync
+  save_profiles   one batch: same per file, one directory fsync at the end
+  unchanged       save_profiles again with identical data: hash compare, no writes
+
+It also checks that the unchanged pass neither rewrote a file (mtime_ns) nor
+left temp files behind, and that threads saving the same profile at once never
+fail or leave a mix of their contents; the exit code is 1 otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from profiles.manager import save_profile, save_profiles
+
+
+def make_profiles(directory: Path, count: int, revision: int = 0) -> dict[Path, dict]:
+    return {
+        directory / f"room-{i:04d}.json": {
+            "name": f"Room {i:04d}",
+            "playback": f"Speakers {i % 12}",
+            "recording": f"Microphone {(i * 7) % 9}",
+            "volume": {"master": (20 + i + revision) % 100},
+            "mute": False,
+            "tags": ["meeting" if i % 3 else "dictation"],
+            "voicemeeter": None,
+        }
+        for i in range(count)
+    }
+
+
+def save_in_place(path: Path, data: dict) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def check_concurrent_saves(directory: Path, threads: int = 8, saves: int = 30) -> bool:
+    """Threads saving one profile with different contents: no errors, one whole payload wins."""
+    path = directory / "shared.json"
+    payloads = [{"name": "Shared", "tags": [f"thread-{t}-{i}" for i in range(5000)]} for t in range(threads)]
+    errors: list[BaseException] = []
+
+    def work(data: dict) -> None:
+        for _ in range(saves):
+            try:
+                save_profile(path, data)
+            except OSError as e:
+                errors.append(e)
+                return
+
+    pool = [threading.Thread(target=work, args=(data,)) for data in payloads]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    try:
+        final = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return False
+    return not errors and final in payloads and not list(directory.glob("*.tmp"))
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.profile_writes")
+    p.add_argument("--profiles", type=int, default=1000)
+    args = p.parse_args(argv)
+
+    root = Path(tempfile.mkdtemp())
+    results = []
+    for revision, (label, save) in enumerate(
+        (
+            ("in place", lambda profiles: [save_in_place(path, data) for path, data in profiles.items()]),
+            ("save_profile", lambda profiles: [save_profile(path, data) for path, data in profiles.items()]),
+            ("save_profiles", save_profiles),
+        )
+    ):
+        directory = root / label.replace(" ", "_")
+        directory.mkdir()
+        profiles = make_profiles(directory, args.profiles, revision)
+        t0 = time.perf_counter()
+        save(profiles)
+        results.append((label, time.perf_counter() - t0, len(profiles)))
+
+    mtimes = {path: path.stat().st_mtime_ns for path in directory.iterdir()}
+    t0 = time.perf_counter()
+    counts = save_profiles(make_profiles(directory, args.profiles, revision))
+    results.append(("unchanged", time.perf_counter() - t0, counts["written"]))
+
+    for label, seconds, writes in results:
+        print(f"{label:>14}: {seconds * 1e3:8.1f} ms  ({seconds * 1e6 / args.profiles:6.1f} us/profile, {writes} written)")
+
+    rewritten = [path.name for path, mtime in mtimes.items() if path.stat().st_mtime_ns != mtime]
+    leftovers = [path.name for path in root.rglob("*.tmp")]
+    ok = counts == {"written": 0, "unchanged": args.profiles} and not rewritten and not leftovers
+    print(f"unchanged pass: {counts}, rewritten: {len(rewritten)}, temp files left: {len(leftovers)} -> {'ok' if ok else 'FAILED'}")
+    concurrent = root / "concurrent"
+    concurrent.mkdir()
+    concurrent_ok = check_concurrent_saves(concurrent)
+    print(f"concurrent saves of one profile: {'ok' if concurrent_ok else 'FAILED'}")
+    return 0 if ok and concurrent_ok else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+"""Device-name resolution over 500 synthetic endpoints: linear scan vs. DeviceIndex.
+
+Run: python -m benchmarks.resolver_index [--endpoints 500] [--rounds 200]
+
+"legacy" is the old _resolve_device_id matching loop (exact id, else the first
+name containing the query) over an already enumerated list, i.e. it excludes the
+GetAllDevices() cost the old code paid on every call.
+
+Checks (exit code 1 if one fails): typo and miss queries (fuzzy pass) are not
+slower than the scan at p50; the Windows setters' resolution (_resolve_device_id)
+takes an endpoint id of the requested flow as is, without a snapshot
+(SessionBackend passes resolved ids), and never falls back to an endpoint of the
+other flow.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from audio import windows as win
+from audio.resolver import DeviceIndex
+from audio.windows import DeviceSnapshot
+
+VENDORS = ["Realtek", "Jabra", "UMC204HD", "Focusrite", "Logitech", "Elgato", "NVIDIA", "Steinberg", "RODE", "Shure"]
+KINDS = ["Speakers", "Headphones", "Headset Earphone", "Line Out", "Digital Output", "Microphone", "Line In", "Mic", "Stereo Mix", "CABLE Output"]
+
+
+def synthetic_snapshot(n: int, seed: int = 7) -> DeviceSnapshot:
+    rng = random.Random(seed)
+    playback, recording = [], []
+    for i in range(n):
+        kind = KINDS[i % len(KINDS)]
+        name = f"{kind} {i} ({rng.choice(VENDORS)} {rng.randint(1, 99)})"
+        entry = {"id": f"{{0.0.{i % 2}.00000000}}.{{{i:08x}-0000-0000-0000-000000000000}}", "name": name}
+        (playback if i % 2 == 0 else recording).append(entry)
+    return DeviceSnapshot(playback=playback, recording=recording)
+
+
+def legacy_resolve(devices: list[dict], identifier: str) -> str | None:
+    ident_lower = identifier.lower()
+    by_name = None
+    for dev in devices:
+        if identifier == dev["id"]:
+            return dev["id"]
+        if by_name is None and (ident_lower == dev["name"].lower() or ident_lower in dev["name"].lower()):
+            by_name = dev["id"]
+    return by_name
+
+
+def _queries(snap: DeviceSnapshot, rng: random.Random) -> dict[str, list[str]]:
+    devices = snap.playback + snap.recording
+    picks = rng.sample(devices, 20)
+    return {
+        "id": [d["id"] for d in picks],
+        "name": [d["name"].upper() for d in picks],
+        "prefix": [d["name"][: len(d["name"]) // 2] for d in picks],
+        "token": [" ".join(d["name"].split()[1:3]) for d in picks],
+        "typo": [d["name"].split()[0][:-1] + "x" for d in picks],
+        "miss": [f"no such device {i}" for i in range(20)],
+    }
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    ordered = sorted(samples)
+    return ordered[len(ordered) // 2], ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.resolver_index")
+    p.add_argument("--endpoints", type=int, default=500)
+    p.add_argument("--rounds", type=int, default=20)
+    args = p.parse_args(argv)
+
+    snap = synthetic_snapshot(args.endpoints)
+    devices = snap.playback + snap.recording
+    t0 = time.perf_counter()
+    index = DeviceIndex.from_snapshot(snap)
+    build_ms = (time.perf_counter() - t0) * 1e3
+    print(f"{args.endpoints} endpoints, index build {build_ms:.2f} ms (once per snapshot)")
+
+    queries = _queries(snap, random.Random(11))
+    print(f"{'query':>7} {'legacy p50':>11} {'p99':>9} {'index p50':>11} {'p99':>9}  resolved")
+    p50: dict[str, tuple[float, float]] = {}
+    for kind, qs in queries.items():
+        legacy, indexed = [], []
+        resolved = 0
+        for _ in range(args.rounds):
+            for q in qs:
+                t0 = time.perf_counter()
+                legacy_resolve(devices, q)
+                legacy.append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                res = index.resolve(q)
+                indexed.append(time.perf_counter() - t0)
+                resolved += res.device_id is not None
+        l50, l99 = _percentiles(legacy)
+        i50, i99 = _percentiles(indexed)
+        p50[kind] = (l50, i50)
+        print(f"{kind:>7} {l50 * 1e6:9.1f}us {l99 * 1e6:7.1f}us {i50 * 1e6:9.1f}us {i99 * 1e6:7.1f}us  {resolved / (args.rounds * len(qs)):.0%}")
+
+    # Without COM every snapshot here is empty: an id only comes back if no snapshot was consulted
+    speakers, mic = queries["id"][0].replace("{0.0.1.", "{0.0.0."), queries["id"][0].replace("{0.0.0.", "{0.0.1.")
+    as_is = win._resolve_device_id(speakers, flow="playback") == speakers and win._resolve_device_id(mic) == mic
+    previous = win._snapshot_cache
+    win._snapshot_cache = DeviceSnapshot(recording=[{"id": mic, "name": "Only Recording"}], taken_at=time.monotonic())
+    try:
+        same_flow_only = win._resolve_device_id(mic, flow="playback") is None and win._resolve_device_id("Only Recording", flow="playback") is None
+        same_flow_only &= win._resolve_device_id("Only Recording", flow="recording") == mic
+    finally:
+        win._snapshot_cache = previous
+    checks = {
+        "typo/miss vs. scan": all(p50[kind][1] <= p50[kind][0] for kind in ("typo", "miss")),
+        "endpoint id as is": as_is,
+        "no cross-flow match": same_flow_only,
+    }
+    for name, ok in checks.items():
+        print(f"  {name:<22} {'ok' if ok else 'FAILED'}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
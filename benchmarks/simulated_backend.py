@@ -0,0 +1,91 @@
+"""UI refresh and profile switch latency against SimulatedBackend.
+
+Run: python -m benchmarks.simulated_backend [--iterations 2000] [--fail-rate 0.02] [--seed 1]
+
+Latencies are drawn from per-operation distributions (roughly what CoreAudio
+shows on a laptop with Bluetooth endpoints) and accumulated on a virtual clock,
+so the numbers are deterministic for a seed and the run takes milliseconds.
+A refresh is one enumeration plus both default reads (App.refresh_devices);
+a switch sets default playback, default recording and the master volume.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from audio.simulated import SimulatedBackend
+
+LATENCY_MS = {
+    "enumerate": ("lognormal", 8.0, 0.5),
+    "get_default": (0.2, 0.6),
+    "set_default": ("lognormal", 15.0, 0.7),
+    "volume": (0.3, 1.0),
+    "mute": (0.3, 1.0),
+}
+
+
+class VirtualClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1e3
+
+    return f"p50 {pct(0.50):6.1f} ms  p95 {pct(0.95):6.1f} ms  p99 {pct(0.99):6.1f} ms  max {ordered[-1] * 1e3:6.1f} ms"
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.simulated_backend")
+    p.add_argument("--playback", type=int, default=8)
+    p.add_argument("--recording", type=int, default=6)
+    p.add_argument("--iterations", type=int, default=2000)
+    p.add_argument("--fail-rate", type=float, default=0.02, help="failure probability of set_default")
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args(argv)
+
+    clock = VirtualClock()
+    backend = SimulatedBackend(
+        playback=args.playback,
+        recording=args.recording,
+        latency=LATENCY_MS,
+        failures={"set_default": args.fail_rate},
+        seed=args.seed,
+        sleep=clock.sleep,
+    )
+    snap = backend.take_snapshot()
+    speakers = [d["name"] for d in snap.playback]
+    mics = [d["name"] for d in snap.recording]
+
+    refresh: list[float] = []
+    switch: list[float] = []
+    failed_switches = 0
+    for i in range(args.iterations):
+        t0 = clock.now
+        backend.take_snapshot()
+        backend.get_default_playback_id()
+        backend.get_default_recording_id()
+        refresh.append(clock.now - t0)
+
+        t0 = clock.now
+        ok = backend.set_default_playback(speakers[i % len(speakers)])
+        ok = backend.set_default_recording(mics[i % len(mics)]) and ok
+        ok = backend.set_master_volume(20 + i % 60) and ok
+        switch.append(clock.now - t0)
+        failed_switches += not ok
+
+    print(f"devices: {args.playback} playback, {args.recording} recording; {args.iterations} iterations, seed {args.seed}")
+    print(f"refresh: {_percentiles(refresh)}")
+    print(f" switch: {_percentiles(switch)}  ({failed_switches} with an injected failure)")
+    print(f"calls: {dict(backend.calls)}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,135 @@
+"""SoundVolumeView fallback: one spawn per action vs. one batched spawn.
+
+Run: python -m benchmarks.svv_batch [--actions 6] [--startup-ms 80]
+
+Uses a fake SoundVolumeView (a Python script written to a temp dir) that records
+the argv it receives, applies every /SetDefault whose device name does not
+contain "FAIL" (recorded in a state file), sleeps `--startup-ms` to model process
+start-up and exits non-zero if any argument contains "FAIL" (or sleeps forever
+on "HANG").
+
+Checks (exit code 1 if one fails): the batched command line is exactly the
+actions' arguments in order; a failed batch re-runs only the action that did not
+take effect (SvvAction.verify reads the fake's state), and the others are not
+repeated; a hung tool is reported as timed out.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from audio.svv import SvvBatch
+
+FAKE_SVV = """#!{python}
+import json, sys, time
+with open({log!r}, "a", encoding="utf-8") as f:
+    f.write(json.dumps(sys.argv[1:]) + "\\n")
+args = sys.argv[1:]
+with open({state!r}, "a", encoding="utf-8") as f:
+    for i, a in enumerate(args):
+        if a == "/SetDefault" and "FAIL" not in args[i + 1]:
+            f.write(args[i + 1] + "\\n")
+if any("HANG" in a for a in sys.argv[1:]):
+    time.sleep(3600)
+time.sleep({startup_s})
+sys.exit(1 if any("FAIL" in a for a in sys.argv[1:]) else 0)
+"""
+
+
+def write_fake_svv(directory: Path, startup_ms: float) -> tuple[Path, Path, Path]:
+    """Returns the fake exe, its argv log (one JSON list per spawn) and its applied-devices file."""
+    log, state = directory / "argv.log", directory / "applied.txt"
+    exe = directory / "SoundVolumeView"
+    exe.write_text(FAKE_SVV.format(python=sys.executable, log=str(log), state=str(state), startup_s=startup_ms / 1000.0), encoding="utf-8")
+    os.chmod(exe, 0o755)
+    return exe, log, state
+
+
+def _lines(path: Path) -> list[str]:
+    return path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+
+
+def _actions(n: int, fail_at: int | None = None) -> list[tuple[str, str]]:
+    out = []
+    for i in range(n):
+        name = f"Device {i}" + (" FAIL" if i == fail_at else "")
+        out.append((name, "render" if i % 2 == 0 else "capture"))
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.svv_batch")
+    p.add_argument("--actions", type=int, default=6)
+    p.add_argument("--startup-ms", type=float, default=80.0)
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        exe, log, state = write_fake_svv(Path(tmp), args.startup_ms)
+
+        t0 = time.perf_counter()
+        for name, flow in _actions(args.actions):
+            single = SvvBatch(exe=exe)
+            single.set_default(name, flow)
+            single.run()
+        per_action_s = time.perf_counter() - t0
+
+        batch = SvvBatch(exe=exe)
+        for name, flow in _actions(args.actions):
+            batch.set_default(name, flow)
+        t0 = time.perf_counter()
+        results = batch.run()
+        batched_s = time.perf_counter() - t0
+        batched_ok = all(r.ok for r in results) and batch.spawns == 1
+
+        print(f"{args.actions} actions, fake start-up {args.startup_ms:.0f} ms")
+        print(f"  one spawn per action: {per_action_s * 1e3:8.1f} ms ({args.actions} spawns)")
+        print(f"  batched:              {batched_s * 1e3:8.1f} ms ({batch.spawns} spawn)")
+
+        cmdline = SvvBatch(exe=exe)
+        cmdline.set_default("Speakers (Realtek)", "render")
+        cmdline.set_default("{0.0.1.00000000}.{mic}", "capture", role="2")
+        cmdline.run()
+        expected = ["/SetDefault", "Speakers (Realtek)", "1", "Render", "/SetDefault", "{0.0.1.00000000}.{mic}", "2", "Capture"]
+        argv_ok = json.loads(_lines(log)[-1]) == expected
+
+        state.unlink()
+        spawned = len(_lines(log))
+        failing = SvvBatch(exe=exe)
+        for name, flow in _actions(4, fail_at=2):
+            failing.set_default(name, flow, verify=lambda name=name: name in _lines(state))
+        results = failing.run()
+        retried = [json.loads(line) for line in _lines(log)[spawned + 1 :]]
+        print(f"  failure isolation:    {[r.ok for r in results]} ({failing.spawns} spawns)")
+        isolated = (
+            [r.ok for r in results] == [True, True, False, True]
+            and failing.spawns == 2
+            and retried == [["/SetDefault", "Device 2 FAIL", "1", "Render"]]
+            and sorted(_lines(state)) == ["Device 0", "Device 1", "Device 3"]
+        )
+
+        hanging = SvvBatch(exe=exe, timeout=0.5)
+        hanging.set_default("HANG", "render")
+        t0 = time.perf_counter()
+        res = hanging.run()[0]
+        hang_ms = (time.perf_counter() - t0) * 1e3
+        print(f"  hung tool:            timed_out={res.timed_out} after {hang_ms:.0f} ms")
+
+    checks = {
+        "one spawn per batch": batched_ok,
+        "command line": argv_ok,
+        "only failed re-run": isolated,
+        "hung tool times out": res.timed_out and not res.ok and hang_ms < 2000,
+    }
+    for name, ok in checks.items():
+        print(f"  {name:<22} {'ok' if ok else 'FAILED'}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+"""Replay a recorded backend trace through the refresh and set-default paths.
+
+Run: python -m benchmarks.trace_replay [--trace field.jsonl.gz] [--rounds 20]
+
+Without --trace a session is first recorded from SimulatedBackend (laptop-like
+latencies, one flaky set-default) so the script is self-contained. The trace is
+then replayed on a virtual clock: each scenario reports the latency it would
+have had with the user's recorded timings, so two code versions can be compared
+with exact numbers on the same trace.
+
+Check (exit code 1 if it fails): recording the Windows backend, each entry
+carries the HRESULT of its own call only, not that of an earlier failure or of
+a call failing on another thread at the same time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+
+from audio import windows as win
+from audio.simulated import SimulatedBackend
+from audio.trace import RecordingBackend, ReplayBackend, read_trace
+
+
+def record_sample(path: Path, rounds: int) -> None:
+    sim = SimulatedBackend(
+        playback=6,
+        recording=4,
+        latency={"enumerate": ("lognormal", 12.0, 0.4), "get_default": 0.4, "set_default": ("lognormal", 25.0, 0.6), "volume": 0.8},
+        failures={"set_default": 0.05},
+        seed=7,
+    )
+    rec = RecordingBackend(sim, path)
+    snap = rec.take_snapshot()
+    for i in range(rounds):
+        rec.take_snapshot()
+        rec.set_default_playback(snap.playback[i % len(snap.playback)]["name"])
+        rec.get_default_playback_id()
+        rec.get_default_recording_id()
+        rec.set_master_volume(30 + i)
+    rec.close()
+
+
+class VirtualClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def refresh_devices(backend) -> None:
+    # App.refresh_devices: one snapshot for both lists and the default markers
+    backend.take_snapshot()
+
+
+def set_default_playback(backend, name: str) -> None:
+    # App.set_default_playback: set, then re-read the defaults for the labels
+    backend.set_default_playback(name)
+    backend.get_default_playback_id()
+    backend.get_default_recording_id()
+
+
+class _HresultBackend(win.WindowsBackend):
+    """WindowsBackend whose set-default fails with an HRESULT for "bad" (no COM calls)."""
+
+    def __init__(self) -> None:
+        self.inside, self.release = threading.Event(), threading.Event()
+
+    def set_default_playback(self, device_identifier: str) -> bool:
+        if device_identifier == "slow":
+            self.inside.set()
+            self.release.wait(5.0)
+        if device_identifier == "bad":
+            win._note_hresult(0x88890004)
+            return False
+        return True
+
+
+def check_hresults(directory: Path) -> bool:
+    """Trace entries carry their own call's HRESULT (per thread, cleared per call)."""
+    inner = _HresultBackend()
+    rec = RecordingBackend(inner, directory / "hresults.jsonl")
+    rec.set_default_playback("bad")
+    rec.set_default_playback("good")  # after a failure on the same thread
+
+    def slow() -> None:
+        rec.set_default_playback("slow")
+
+    other = threading.Thread(target=slow)
+    other.start()
+    inner.inside.wait(5.0)
+    rec.set_default_playback("bad")  # fails while "slow" runs on the other thread
+    inner.release.set()
+    other.join()
+    rec.close()
+    # Entries are written as calls finish: "slow" last
+    hresults = [(e["a"][0], e.get("h")) for e in read_trace(rec.path)[1]]
+    return hresults == [("bad", 0x88890004), ("good", None), ("bad", 0x88890004), ("slow", None)]
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.trace_replay")
+    p.add_argument("--trace", type=Path, default=None)
+    p.add_argument("--rounds", type=int, default=20)
+    args = p.parse_args(argv)
+
+    trace = args.trace
+    if trace is None:
+        trace = Path(tempfile.mkdtemp()) / "sample.jsonl.gz"
+        record_sample(trace, args.rounds)
+    header, entries = read_trace(trace)
+    per_method = Counter(e["m"] for e in entries)
+    print(f"trace: {trace} ({trace.stat().st_size} bytes, {len(entries)} calls, backend {header['backend']})")
+    print(f"recorded: {dict(per_method)}")
+
+    clock = VirtualClock()
+    backend = ReplayBackend(trace, sleep=clock.sleep)
+    names = [d["name"] for d in backend.take_snapshot().playback]
+    scenarios = {"refresh_devices": [], "set_default_playback": []}
+    for i in range(args.rounds):
+        t0 = clock.now
+        refresh_devices(backend)
+        scenarios["refresh_devices"].append(clock.now - t0)
+        t0 = clock.now
+        set_default_playback(backend, names[i % len(names)] if names else "")
+        scenarios["set_default_playback"].append(clock.now - t0)
+    for label, samples in scenarios.items():
+        ordered = sorted(samples)
+        print(f"{label:>21}: mean {sum(ordered) / len(ordered) * 1e3:7.2f} ms  max {ordered[-1] * 1e3:7.2f} ms")
+    print(f"replay: {backend.stats()}")
+    ok = check_hresults(trace.parent if args.trace is None else Path(tempfile.mkdtemp()))
+    print(f"  {'HRESULT per call':<20} {'ok' if ok else 'FAILED'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
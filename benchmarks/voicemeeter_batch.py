@@ -0,0 +1,128 @@
+"""VoiceMeeter writes: one call per parameter vs. batched scripts (WriteBatch).
+
+Run: python -m benchmarks.voicemeeter_batch [--rounds 200] [--seed 1]
+
+Against SimulatedVoicemeeter (Potato layout: 8 strips, 8 buses), which counts
+every Remote API call, with latencies on a virtual clock. Each round sets gain,
+mute and routing on all strips and gain/mute on all buses; a gain "ramp" writes
+the first strip's gain 10 times, which a batch collapses to its last value.
+
+  single    session.set() per parameter: one VBVMR_SetParameterFloat each
+  batched   `with session.batch() as b`: one VBVMR_SetParameters per round
+
+Checks (exit code 1 if one fails): a batched round is exactly one API call,
+saved_calls equals the writes minus one, the last write to a parameter wins,
+and the API, the shadow and the single-call run end in the same state. An
+explicit flush() inside the block, an exception (pending writes dropped), a
+script the API rejects (batch.ok False, writes kept in batch.failed) and
+fixed-point number formatting are checked as well.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+
+from audio.simulated import SimulatedVoicemeeter
+from audio.voicemeeter import EDITIONS, VoicemeeterSession, script_for
+from benchmarks.simulated_backend import VirtualClock
+
+LATENCY_MS = {"login": 40.0, "dirty": 0.02, "get": 0.01, "set": (0.05, 0.2), "script": (0.1, 0.4)}
+POTATO = 3
+
+
+def round_writes(rng: random.Random) -> list[tuple[str, float]]:
+    _edition, strips, buses, routing = EDITIONS[POTATO]
+    writes = [("Strip[0].Gain", float(g)) for g in range(-20, 0, 2)]
+    for i in range(strips):
+        writes.append((f"Strip[{i}].Gain", float(rng.randrange(-60, 12))))
+        writes.append((f"Strip[{i}].Mute", float(rng.random() < 0.2)))
+        writes += [(f"Strip[{i}].{bus}", float(rng.random() < 0.5)) for bus in routing]
+    for i in range(buses):
+        writes.append((f"Bus[{i}].Gain", float(rng.randrange(-60, 12))))
+        writes.append((f"Bus[{i}].Mute", float(rng.random() < 0.1)))
+    return writes
+
+
+def _session(clock: VirtualClock, seed: int) -> tuple[SimulatedVoicemeeter, VoicemeeterSession]:
+    api = SimulatedVoicemeeter(kind=POTATO, latency=LATENCY_MS, seed=seed, sleep=clock.sleep)
+    s = VoicemeeterSession(api)
+    s.connect(poll=False)
+    api.calls.clear()
+    return api, s
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.voicemeeter_batch")
+    p.add_argument("--rounds", type=int, default=200)
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args(argv)
+    rounds = [round_writes(random.Random(args.seed + r)) for r in range(args.rounds)]
+    writes = sum(len(w) for w in rounds)
+
+    clock = VirtualClock()
+    single_api, single = _session(clock, args.seed)
+    for round_ in rounds:
+        for name, value in round_:
+            single.set(name, value)
+    single_ms, single_calls = clock.now * 1e3, sum(single_api.calls.values())
+
+    clock = VirtualClock()
+    api, s = _session(clock, args.seed)
+    one_call = True
+    for round_ in rounds:
+        before = sum(api.calls.values())
+        with s.batch() as b:
+            for name, value in round_:
+                b.set(name, value)
+        one_call &= sum(api.calls.values()) - before == 1
+    batched_ms, batched_calls = clock.now * 1e3, sum(api.calls.values())
+
+    print(f"{'single':>8}: {single_calls:6d} API calls, {single_ms / args.rounds:7.3f} ms/round")
+    print(f"{'batched':>8}: {batched_calls:6d} API calls, {batched_ms / args.rounds:7.3f} ms/round, saved_calls {s.saved_calls}")
+
+    expected = dict(single_api.params)
+    last_wins = all(api.params[name] == value for name, value in dict(rounds[-1]).items())
+    same_state = api.params == expected and all(s.get(n) == api.params[n] for n in api.params)
+    saved_ok = s.saved_calls == writes - args.rounds
+
+    # Explicit flush inside the block, then an empty block end; an exception drops pending writes
+    api.calls.clear()
+    with s.batch() as b:
+        b.set("Bus[0].Gain", -3.0)
+        b.set("Bus[0].Gain", -4.0)
+        flushed = b.flush() and len(b) == 0 and b.saved_calls == 1
+    flushed &= api.calls["script"] == 1 and api.params["Bus[0].Gain"] == -4.0
+    try:
+        with s.batch() as b:
+            b.set("Bus[0].Gain", 6.0)
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+    dropped = api.params["Bus[0].Gain"] == -4.0 and api.calls["script"] == 1
+
+    with s.batch() as b:
+        b.set("Bus[0].Gain", 2.0)
+        b.set("Bus[99].Gain", 1.0)  # no such bus: the API rejects the whole script
+    rejected = b.ok is False and b.failed == {"Bus[0].Gain": 2.0, "Bus[99].Gain": 1.0} and api.params["Bus[0].Gain"] == -4.0
+    with s.batch() as b:
+        b.set("Bus[0].Gain", -0.00001)
+    formatted = script_for({"a": 0.00001, "b": -12.5, "c": 1e7, "d": -0.0}) == "a=0.00001;b=-12.5;c=10000000;d=0" and b.ok is True and api.params["Bus[0].Gain"] == -0.00001
+
+    checks = {
+        "one call per round": one_call,
+        "saved_calls": saved_ok,
+        "last write wins": last_wins,
+        "same end state": same_state,
+        "explicit flush": flushed,
+        "exception drops": dropped,
+        "rejected script": rejected,
+        "fixed-point values": formatted,
+    }
+    for name, ok in checks.items():
+        print(f"  {name:<20} {'ok' if ok else 'FAILED'}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+"""VoiceMeeter: login per command vs. one session with a dirty-flag shadow cache.
+
+Run: python -m benchmarks.voicemeeter_session [--commands 500] [--seconds 60] [--seed 1]
+
+Uses SimulatedVoicemeeter (Banana layout, 50 shadowed parameters) with
+Remote API latencies on a virtual clock, so runs are deterministic and fast.
+
+  per command   each command logs in, checks dirty, reads 5 parameters, writes 1, logs out
+  session       one login; reads come from the shadow, the write goes through
+  polling       --seconds of polling at POLL_INTERVAL while the VoiceMeeter
+                window changes a parameter about once per second: dirty-flag
+                polling vs. re-reading every parameter on each poll
+  coherence     random external changes and writes between polls; after every
+                poll the shadow must equal the API's parameters, and a write
+                must be visible at once (exit code 1 otherwise). Finally the
+                real poller thread is started and must pick up a change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from audio.simulated import SimulatedVoicemeeter
+from audio.voicemeeter import POLL_INTERVAL, VoicemeeterSession
+from benchmarks.simulated_backend import VirtualClock
+
+# Remote API call latencies (ms)
+LATENCY_MS = {"login": ("lognormal", 40.0, 0.3), "dirty": 0.02, "get": 0.01, "set": 0.05, "script": 0.1}
+
+READS = ("Strip[0].Gain", "Strip[0].Mute", "Strip[1].A1", "Bus[0].Gain", "Bus[0].Mute")
+
+
+def _api(clock: VirtualClock, seed: int) -> SimulatedVoicemeeter:
+    return SimulatedVoicemeeter(latency=LATENCY_MS, seed=seed, sleep=clock.sleep)
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.voicemeeter_session")
+    p.add_argument("--commands", type=int, default=500)
+    p.add_argument("--seconds", type=int, default=60)
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    # -- per command vs. session ---------------------------------------------
+    clock = VirtualClock()
+    api = _api(clock, args.seed)
+    for i in range(args.commands):
+        api.login()
+        api.is_parameters_dirty()  # makes the DLL fetch current values
+        _ = [api.get_float(name) for name in READS]
+        api.set_float("Strip[0].Gain", -(i % 12))
+        api.logout()
+    per_command = (clock.now, sum(api.calls.values()))
+
+    clock = VirtualClock()
+    api = _api(clock, args.seed)
+    s = VoicemeeterSession(api)
+    s.connect(poll=False)
+    for i in range(args.commands):
+        _ = [s.get(name) for name in READS]
+        s.set("Strip[0].Gain", -(i % 12))
+    session = (clock.now, sum(api.calls.values()))
+    for label, (seconds, calls) in (("per command", per_command), ("session", session)):
+        print(f"{label:>12}: {seconds * 1e3 / args.commands:7.3f} ms/command, {calls / args.commands:6.1f} API calls/command")
+
+    # -- polling cost ---------------------------------------------------------
+    polls = int(args.seconds / POLL_INTERVAL)
+    for label, dirty_flag in (("dirty flag", True), ("re-read all", False)):
+        clock = VirtualClock()
+        api = _api(clock, args.seed)
+        s = VoicemeeterSession(api)
+        s.connect(poll=False)
+        api.calls.clear()
+        t0 = clock.now
+        for i in range(polls):
+            if rng.random() < POLL_INTERVAL:
+                api.external_change(f"Strip[{rng.randrange(5)}].Gain", rng.uniform(-60, 12))
+            if dirty_flag:
+                s.poll()
+            else:
+                s.refresh()
+        busy = clock.now - t0
+        print(
+            f"{'polling':>12}: {label:<11} {sum(api.calls.values()) / args.seconds:7.1f} API calls/s,"
+            f" {busy * 1e3 / args.seconds:6.3f} ms/s busy, {s.refreshes - 1} refreshes in {polls} polls"
+        )
+
+    # -- coherence --------------------------------------------------------------
+    clock = VirtualClock()
+    api = _api(clock, args.seed)
+    s = VoicemeeterSession(api)
+    s.connect(poll=False)
+    names = list(api.params)
+    stale = immediate = 0
+    for i in range(args.commands):
+        for _ in range(rng.randrange(3)):
+            api.external_change(rng.choice(names), rng.uniform(-60, 12))
+        if rng.random() < 0.5:
+            name, value = rng.choice(names), float(rng.randrange(-60, 12))
+            s.set(name, value)
+            immediate += s.get(name) != value
+        s.poll()
+        stale += any(s.get(n) != api.params[n] for n in names)
+
+    window = SimulatedVoicemeeter()
+    live = VoicemeeterSession(window, poll_interval=0.01)
+    live.connect()
+    window.external_change("Bus[2].Mute", 1.0)
+    deadline = time.monotonic() + 1.0
+    while live.get("Bus[2].Mute") != 1.0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    picked_up = live.get("Bus[2].Mute") == 1.0
+    live.disconnect()
+
+    ok = stale == 0 and immediate == 0 and picked_up
+    print(
+        f"{'coherence':>12}: {args.commands} rounds, stale after poll: {stale}, writes not visible: {immediate},"
+        f" poller thread picked up change: {picked_up} -> {'ok' if ok else 'FAILED'}"
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
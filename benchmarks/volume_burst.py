@@ -0,0 +1,137 @@
+"""Slider bursts against a stub endpoint: per-event COM writes vs. VolumeController.
+
+Run: python -m benchmarks.volume_burst [--events 200] [--interval-ms 1] [--write-ms 4] [--bind-ms 6]
+
+"legacy" models the old set_master_volume: every motion event re-activates the
+endpoint (GetSpeakers/Activate/QueryInterface, `--bind-ms`) and writes synchronously
+on the Tk thread. "controller" submits each event to VolumeController.
+Reported: COM writes issued, p99 time the caller (Tk thread) is blocked per event,
+and p99 time from event to the level being applied.
+
+Checks (exit code 1 if one fails): the controller binds once per burst (no
+default-device lookup per write) and rebinds only after invalidate(), a
+DefaultDeviceChanged notification for playback, or a failed write.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from audio import windows as win
+from audio.windows import VolumeController
+from benchmarks._stubs import StubEndpointVolume
+
+
+def _p99(values: list[float]) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else 0.0
+
+
+def _levels(events: int) -> list[float]:
+    # Distinct, increasing levels so every write maps back to the events it covers
+    return [100.0 * (i + 1) / events for i in range(events)]
+
+
+def run_legacy(events: int, interval_s: float, write_ms: float, bind_ms: float) -> dict:
+    endpoint = StubEndpointVolume(write_ms)
+    blocked: list[float] = []
+    for pct in _levels(events):
+        t0 = time.perf_counter()
+        time.sleep(bind_ms / 1000.0)
+        endpoint.SetMasterVolumeLevelScalar(pct / 100.0, None)
+        blocked.append(time.perf_counter() - t0)
+        time.sleep(interval_s)
+    return {"writes": len(endpoint.log), "caller_p99_ms": _p99(blocked) * 1e3, "apply_p99_ms": _p99(blocked) * 1e3}
+
+
+def run_controller(events: int, interval_s: float, write_ms: float, bind_ms: float) -> dict:
+    endpoint = StubEndpointVolume(write_ms)
+
+    def bind():
+        time.sleep(bind_ms / 1000.0)
+        return "{stub-speakers}", endpoint
+
+    ctl = VolumeController(bind=bind)
+    levels = _levels(events)
+    submitted_at: list[float] = []
+    blocked: list[float] = []
+    for pct in levels:
+        t0 = time.perf_counter()
+        ctl.submit_volume(pct)
+        t1 = time.perf_counter()
+        submitted_at.append(t0)
+        blocked.append(t1 - t0)
+        time.sleep(interval_s)
+    ctl.flush(timeout=10.0)
+    ctl.close()
+
+    # Event i is applied by the first write whose level is >= its own level
+    writes = [(t, round(v * events)) for t, kind, v in endpoint.log if kind == "volume"]
+    applied: list[float] = []
+    w = 0
+    for i, t_sub in enumerate(submitted_at):
+        while writes[w][1] < i + 1:
+            w += 1
+        applied.append(writes[w][0] - t_sub)
+    assert writes[-1][1] == events, "last slider value must be written"
+    return {"writes": len(writes), "caller_p99_ms": _p99(blocked) * 1e3, "apply_p99_ms": _p99(applied) * 1e3, "rebinds": ctl.rebinds}
+
+
+def check_rebinds() -> dict[str, bool]:
+    """When the controller rebinds: notifications and failed writes only."""
+    endpoints = {"{speakers}": StubEndpointVolume(), "{headset}": StubEndpointVolume()}
+    default = ["{speakers}"]
+
+    def bind():
+        return default[0], endpoints[default[0]]
+
+    ctl = VolumeController(bind=bind)
+    for pct in (10, 20, 30):
+        ctl.set_volume(pct)
+    checks = {"one bind per burst": ctl.rebinds == 1}
+
+    previous, win._volume_controller = win._volume_controller, ctl
+    try:
+        default[0] = "{headset}"
+        win._on_device_event(win.DefaultDeviceChanged("{headset}", flow=win.E_CAPTURE))
+        ctl.set_volume(40)
+        ignored = ctl.rebinds == 1
+        win._on_device_event(win.DefaultDeviceChanged("{headset}", flow=win.E_RENDER))
+        ctl.set_volume(50)
+    finally:
+        win._volume_controller = previous
+    checks["rebind on notification"] = ignored and ctl.rebinds == 2 and endpoints["{headset}"].log[-1][2] == 0.5
+
+    endpoints["{headset}"].removed = True
+    default[0] = "{speakers}"
+    ok = ctl.set_volume(60)
+    checks["rebind on failed write"] = ok and ctl.rebinds == 3 and endpoints["{speakers}"].log[-1][2] == 0.6
+    ctl.close()
+    return checks
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="benchmarks.volume_burst")
+    p.add_argument("--events", type=int, default=200)
+    p.add_argument("--interval-ms", type=float, default=1.0)
+    p.add_argument("--write-ms", type=float, default=4.0)
+    p.add_argument("--bind-ms", type=float, default=6.0)
+    args = p.parse_args(argv)
+
+    interval_s = args.interval_ms / 1000.0
+    print(f"burst: {args.events} events every {args.interval_ms} ms, write {args.write_ms} ms, bind {args.bind_ms} ms")
+    for label, fn in (("legacy", run_legacy), ("controller", run_controller)):
+        res = fn(args.events, interval_s, args.write_ms, args.bind_ms)
+        print(
+            f"{label:>10}: writes={res['writes']:4d}  caller p99={res['caller_p99_ms']:8.3f} ms  "
+            f"apply p99={res['apply_p99_ms']:8.3f} ms"
+        )
+    checks = check_rebinds()
+    for name, ok in checks.items():
+        print(f"  {name:<24} {'ok' if ok else 'FAILED'}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -3,7 +3,6 @@ from __future__ import annotations
 import json
 import os
 import platform
-import subprocess
 import sys
 from pathlib import Path
 from typing import Any
@@ -61,6 +60,8 @@ def _check_voicemeeter_presence() -> dict[str, Any]:
     running = False
     try:
         if platform.system() == "Windows":
+            import subprocess
+
             proc = subprocess.run(["tasklist"], capture_output=True, text=True, check=False)
             out = (proc.stdout or "") + (proc.stderr or "")
             running = ("voicemeeter" in out.lower()) or ("vb-audio" in out.lower())
@@ -69,6 +70,16 @@ def _check_voicemeeter_presence() -> dict[str, Any]:
     return {"module": available, "process_running": running}
 
 
+def _metrics_summary() -> dict[str, Any]:
+    try:
+        from audio.metrics import load_persisted
+
+        stats = load_persisted()
+        return {"operations": stats.summary(), "counters": stats.counters}
+    except Exception as e:
+        return {"error": type(e).__name__}
+
+
 def run_basic_checks(project_root: Path | None = None) -> dict[str, Any]:
     project_root = project_root or Path(__file__).resolve().parents[1]
     results: dict[str, Any] = {}
@@ -79,6 +90,7 @@ def run_basic_checks(project_root: Path | None = None) -> dict[str, Any]:
     results["pycaw_devices"] = _list_devices_with_pycaw()
     results["voicemeeter"] = _check_voicemeeter_presence()
     results["tools"] = _check_tools(project_root)
+    results["metrics"] = _metrics_summary()
     return results
 
 
@@ -103,6 +115,15 @@ def format_checks_for_cli(results: dict[str, Any]) -> str:
     lines.append(
         f"tools: dir={tools.get('tools_dir')}, SoundVolumeView={'yes' if tools.get('soundvolumeview') else 'no'}, NirCmd={'yes' if tools.get('nircmd') else 'no'}"
     )
+    ops = results.get("metrics", {}).get("operations") or {}
+    if ops:
+        parts = [f"{op} n={m['count']} mean={m['mean_ms']}ms p99<={m['p99_le_ms']}ms" for op, m in ops.items()]
+        lines.append(f"metrics: {'; '.join(parts)}")
+    else:
+        lines.append("metrics: none recorded yet (see `app.cli stats`)")
+    counters = results.get("metrics", {}).get("counters") or {}
+    if counters:
+        lines.append(f"events: {counters}")
     lines.append("Raw JSON below (for debugging):")
     lines.append(json.dumps(results, indent=2))
     return "\n".join(lines)
@@ -0,0 +1,175 @@
+"""Diff-based profile application.
+
+A profile (profiles/*.json: "playback", "recording", optional "volume", "mute",
+"voicemeeter") becomes a Plan against the current state, which is read once:
+one snapshot for both default devices, one volume/mute read if the profile sets
+them, and the preset the VoiceMeeter session loaded last. Steps whose target already holds are skipped, so re-applying the active
+profile issues no writes and a switch only touches what differs. Device steps
+run before volume and mute, which act on the default playback device.
+
+Profiles reach `build_plan` through profiles/compiler.py (CompiledProfile.plan)
+and the plan is executed by profiles/transaction.py, one `execute_step` per step.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from audio.windows import DeviceSnapshot
+
+# Master volume difference (percent points) treated as "already set"
+DEFAULT_VOLUME_TOLERANCE = 1
+
+
+@dataclass
+class Step:
+    kind: str  # "playback", "recording", "volume", "mute" or "voicemeeter"
+    target: Any  # identifier, percent, bool or preset path
+    current: Any = None
+    device_id: str | None = None  # resolved endpoint id (device steps)
+    label: str = ""
+    skip: str | None = None  # why no operation is needed
+
+    @property
+    def needed(self) -> bool:
+        return self.skip is None
+
+
+@dataclass
+class Plan:
+    profile: str
+    steps: list[Step] = field(default_factory=list)
+
+    @property
+    def operations(self) -> list[Step]:
+        return [s for s in self.steps if s.needed]
+
+    def describe(self) -> list[str]:
+        lines = [f'Profile "{self.profile}": {len(self.operations)} operation(s)']
+        for s in self.steps:
+            detail = s.skip if s.skip else f"current: {s.current if s.current is not None else 'unknown'}"
+            lines.append(f"  {'skip' if s.skip else 'set':<5} {s.kind:<11} {s.label or s.target or '-'}  ({detail})")
+        return lines
+
+
+@dataclass
+class State:
+    snapshot: DeviceSnapshot
+    volume: int | None = None
+    mute: bool | None = None
+    preset: str | None = None  # VoiceMeeter preset loaded last; None if unknown
+
+
+def target_volume(profile: dict[str, Any]) -> int | None:
+    volume = profile.get("volume")
+    if isinstance(volume, dict):
+        volume = volume.get("master")
+    return None if volume is None else max(0, min(100, int(volume)))
+
+
+def voicemeeter_preset(profile: dict[str, Any]) -> str | None:
+    vm = profile.get("voicemeeter")
+    if isinstance(vm, dict):
+        vm = vm.get("preset")
+    return str(vm) if vm else None
+
+
+def read_state(
+    backend: Any,
+    volume: bool = False,
+    mute: bool = False,
+    snapshot: DeviceSnapshot | None = None,
+    preset: bool = False,
+    voicemeeter: Any = None,
+) -> State:
+    """Current defaults (one snapshot) and, if asked and supported, volume/mute and the loaded preset.
+
+    `voicemeeter` replaces audio.voicemeeter as in `execute_step`.
+    """
+    state = State(snapshot=snapshot or backend.take_snapshot())
+    if volume and hasattr(backend, "get_master_volume"):
+        state.volume = backend.get_master_volume()
+    if mute and hasattr(backend, "get_mute"):
+        state.mute = backend.get_mute()
+    if preset:
+        if voicemeeter is None:
+            from audio import voicemeeter
+        loaded = getattr(voicemeeter, "loaded_preset", None)
+        state.preset = loaded() if loaded is not None else None
+    return state
+
+
+def _device_step(kind: str, identifier: str | None, device_id: str | None, snap: DeviceSnapshot) -> Step:
+    if not identifier:
+        return Step(kind, identifier, skip="not set in profile")
+    names = {d["id"]: d.get("name") for d in (snap.playback if kind == "playback" else snap.recording)}
+    roles = snap.defaults.get(kind) or {}
+    current_id = snap.default_playback_id if kind == "playback" else snap.default_recording_id
+    step = Step(kind, identifier, current=names.get(current_id, current_id), device_id=device_id, label=names.get(device_id, identifier))
+    # set_default_* switches all roles, so "already default" means every known role
+    if device_id is not None and (all(v == device_id for v in roles.values()) if roles else current_id == device_id):
+        step.skip = "already default"
+    return step
+
+
+def device_target(profile: dict[str, Any], kind: str) -> str | None:
+    """Device identifier of a profile; None if unset or an /init placeholder."""
+    identifier = profile.get(kind)
+    if not identifier or str(identifier).startswith("<"):
+        return None
+    return str(identifier)
+
+
+def build_plan(
+    name: str,
+    devices: dict[str, tuple[str | None, str | None]],
+    volume: int | None,
+    mute: bool | None,
+    preset: str | None,
+    state: State,
+    tolerance: int = DEFAULT_VOLUME_TOLERANCE,
+) -> Plan:
+    """Plan from resolved targets; `devices` maps playback/recording to (identifier, endpoint id)."""
+    plan = Plan(name)
+    for kind in ("playback", "recording"):
+        identifier, device_id = devices.get(kind, (None, None))
+        plan.steps.append(_device_step(kind, identifier, device_id, state.snapshot))
+    # After a playback switch the values read belong to the previous endpoint: always write
+    switching = plan.steps[0].needed and plan.steps[0].device_id is not None
+    if volume is not None:
+        step = Step("volume", volume, current=state.volume, label=f"{volume}%")
+        if not switching and state.volume is not None and abs(state.volume - volume) <= tolerance:
+            step.skip = f"within ±{tolerance}"
+        plan.steps.append(step)
+    if mute is not None:
+        current = None if state.mute is None else ("on" if state.mute else "off")
+        step = Step("mute", bool(mute), current=current, label="on" if mute else "off")
+        if not switching and state.mute is not None and state.mute == bool(mute):
+            step.skip = "unchanged"
+        plan.steps.append(step)
+    if preset:
+        # Only what the session loaded itself is known; an unknown preset is always loaded
+        step = Step("voicemeeter", preset, current=state.preset, label=preset)
+        if state.preset == preset:
+            step.skip = "already loaded"
+        plan.steps.append(step)
+    return plan
+
+
+def execute_step(step: Step, backend: Any, voicemeeter: Any = None) -> bool:
+    """Run one step; `voicemeeter` replaces audio.voicemeeter (e.g. a fake in benchmarks)."""
+    if step.kind == "playback":
+        return bool(backend.set_default_playback(step.device_id or step.target))
+    if step.kind == "recording":
+        return bool(backend.set_default_recording(step.device_id or step.target))
+    if step.kind == "volume":
+        return bool(backend.set_master_volume(step.target))
+    if step.kind == "mute":
+        return bool(backend.mute_master(step.target))
+    if step.kind == "voicemeeter":
+        if voicemeeter is None:
+            from audio import voicemeeter
+
+        return bool(voicemeeter.connect() and voicemeeter.load_preset(step.target))
+    return False
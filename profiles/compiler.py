@@ -0,0 +1,233 @@
+"""Compiled profile plans for hotkey switching.
+
+Applying a profile from scratch means finding and parsing its JSON file and
+resolving device names through the DeviceIndex before any audio change happens.
+`ProfileCompiler` does that once per profile and keeps the result, a
+CompiledProfile with endpoint ids and the volume scalar, in memory and in
+PLANS_PATH. A compiled plan is reused while the profile file's mtime and size
+are unchanged and the device topology (the endpoint ids in the snapshot with
+their names, which name resolution depends on) matches the one it was compiled
+against. The profile itself comes
+from the ProfileCatalog, so a file the catalog has already parsed, validated
+and migrated is not read again.
+
+Latency target: with a warm compiler (daemon or GUI process) and a cached
+snapshot (live device table), everything before the first audio write - lookup,
+validation, planning - stays below 1 ms, so a hotkey switch is bounded by the
+endpoint writes themselves and stays under 50 ms end to end on typical hardware
+(two set-default calls plus one volume write). `python -m
+benchmarks.compiled_profiles` checks this against the simulated backend.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from audio.windows import DeviceSnapshot
+from profiles.apply import DEFAULT_VOLUME_TOLERANCE, Plan, State, build_plan, device_target, target_volume, voicemeeter_preset
+from profiles.manager import PROFILES_DIR, ProfileCatalog, profile_catalog
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PLANS_PATH = PROJECT_ROOT / "config" / "profile_plans.json"
+PLAN_CACHE_VERSION = 4  # 2: profiles are validated before compiling; 3: no roles/strategy fields; 4: names in the topology
+
+
+def topology_fingerprint(snapshot: DeviceSnapshot) -> str:
+    """Short hash over the (endpoint id, name) pairs of a snapshot (defaults excluded).
+
+    Names are included because plans bind profile identifiers to ids by name: a
+    renamed endpoint must recompile the plans, even with the same set of ids.
+    """
+    pairs = sorted(f"{d['id']}\t{d.get('name') or ''}" for d in (*snapshot.playback, *snapshot.recording))
+    return hashlib.sha1("\n".join(pairs).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class CompiledProfile:
+    name: str
+    path: str
+    mtime_ns: int
+    size: int
+    topology: str
+    playback: str | None  # identifier as written in the profile
+    playback_id: str | None  # resolved endpoint id (None: executed by name, e.g. SVV fallback)
+    recording: str | None
+    recording_id: str | None
+    volume: float | None  # master volume scalar 0.0-1.0
+    mute: bool | None
+    voicemeeter: str | None
+
+    def plan(self, state: State, tolerance: int = DEFAULT_VOLUME_TOLERANCE) -> Plan:
+        devices = {"playback": (self.playback, self.playback_id), "recording": (self.recording, self.recording_id)}
+        volume = None if self.volume is None else int(round(self.volume * 100))
+        return build_plan(self.name, devices, volume, self.mute, self.voicemeeter, state, tolerance)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CompiledProfile":
+        return cls(**data)
+
+
+def compile_profile(path: Path, snapshot: DeviceSnapshot, catalog: ProfileCatalog | None = None) -> CompiledProfile:
+    """Resolve the devices of profile file `path` against `snapshot`.
+
+    The validated, migrated profile comes from `catalog` (default: the catalog of
+    the file's directory). Raises ValueError for an invalid profile, so errors
+    surface before any step runs.
+    """
+    st = path.stat()
+    profile = (catalog or profile_catalog(path.parent)).checked(path)
+    resolved: dict[str, tuple[str | None, str | None]] = {}
+    for kind in ("playback", "recording"):
+        identifier = device_target(profile, kind)
+        resolved[kind] = (identifier, snapshot.index.resolve(identifier, flow=kind).device_id if identifier else None)
+    volume = target_volume(profile)
+    mute = profile.get("mute")
+    return CompiledProfile(
+        name=str(profile.get("name") or path.stem),
+        path=str(path),
+        mtime_ns=st.st_mtime_ns,
+        size=st.st_size,
+        topology=topology_fingerprint(snapshot),
+        playback=resolved["playback"][0],
+        playback_id=resolved["playback"][1],
+        recording=resolved["recording"][0],
+        recording_id=resolved["recording"][1],
+        volume=None if volume is None else volume / 100.0,
+        mute=None if mute is None else bool(mute),
+        voicemeeter=voicemeeter_preset(profile),
+    )
+
+
+class ProfileCompiler:
+    """Memory and disk cache of CompiledProfile objects, keyed by profile path."""
+
+    def __init__(self, directory: Path = PROFILES_DIR, cache_path: Path | None = PLANS_PATH) -> None:
+        self.directory = directory
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._plans: dict[str, CompiledProfile] = {}
+        self._by_name: dict[str, str] = {}
+        self._loaded = False
+        self.hits = 0
+        self.compiles = 0
+
+    # -- disk cache -------------------------------------------------------
+    def _load(self) -> None:
+        self._loaded = True
+        if self.cache_path is None:
+            return
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != PLAN_CACHE_VERSION:
+            return
+        for entry in data.get("plans", []):
+            try:
+                self._remember(CompiledProfile.from_dict(entry))
+            except TypeError:
+                continue
+
+    def _save(self) -> None:
+        if self.cache_path is None:
+            return
+        data = {"version": PLAN_CACHE_VERSION, "plans": [asdict(p) for p in self._plans.values()]}
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            tmp.replace(self.cache_path)
+        except OSError:
+            # Read-only install: the memory cache still works for this process
+            pass
+
+    def _remember(self, compiled: CompiledProfile) -> None:
+        # A recompiled file may have been renamed inside; drop its old names
+        for key in [k for k, v in self._by_name.items() if v == compiled.path]:
+            del self._by_name[key]
+        self._plans[compiled.path] = compiled
+        self._by_name[compiled.name.casefold()] = compiled.path
+        self._by_name[Path(compiled.path).stem.casefold()] = compiled.path
+
+    @property
+    def catalog(self) -> ProfileCatalog:
+        return profile_catalog(self.directory)
+
+    # -- lookup -----------------------------------------------------------
+    def _path_for(self, name: str) -> Path | None:
+        cached = self._by_name.get(name.casefold())
+        if cached is not None and os.path.exists(cached):
+            return Path(cached)
+        return self._find(name)
+
+    def _find(self, name: str) -> Path | None:
+        # Picks up new and edited files; only changed files are parsed again
+        catalog = self.catalog
+        catalog.refresh()
+        entry = catalog.find(name)
+        return None if entry is None else entry.path
+
+    def get(self, name: str, snapshot: DeviceSnapshot) -> CompiledProfile | None:
+        """Compiled plan of profile `name` for `snapshot`'s topology; None if there is no such profile."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            path = self._path_for(name)
+            if path is None:
+                return None
+            compiled = self._get_path(path, snapshot)
+            if compiled is not None and name.casefold() not in (compiled.name.casefold(), path.stem.casefold()):
+                # The cached name belonged to an older version of this file
+                path = self._find(name)
+                compiled = None if path is None else self._get_path(path, snapshot)
+            return compiled
+
+    def _get_path(self, path: Path, snapshot: DeviceSnapshot) -> CompiledProfile | None:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        compiled = self._plans.get(str(path))
+        if (
+            compiled is not None
+            and compiled.mtime_ns == st.st_mtime_ns
+            and compiled.size == st.st_size
+            and compiled.topology == topology_fingerprint(snapshot)
+        ):
+            self.hits += 1
+            return compiled
+        compiled = compile_profile(path, snapshot, self.catalog)
+        self.compiles += 1
+        self._remember(compiled)
+        self._save()
+        return compiled
+
+    def invalidate(self) -> None:
+        """Drop all compiled plans (memory and disk)."""
+        with self._lock:
+            self._plans.clear()
+            self._by_name.clear()
+            self._loaded = True
+            self._save()
+
+    def stats(self) -> dict[str, int]:
+        return {"plans": len(self._plans), "hits": self.hits, "compiles": self.compiles}
+
+
+_compiler: ProfileCompiler | None = None
+_compiler_lock = threading.Lock()
+
+
+def profile_compiler() -> ProfileCompiler:
+    """Process-wide ProfileCompiler over PROFILES_DIR."""
+    global _compiler
+    with _compiler_lock:
+        if _compiler is None:
+            _compiler = ProfileCompiler()
+        return _compiler
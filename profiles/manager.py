@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
+import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable
+
+PROFILES_DIR = Path(__file__).resolve().parent
 
 
 def load_profile(path: Path) -> dict[str, Any]:
@@ -10,8 +17,474 @@ def load_profile(path: Path) -> dict[str, Any]:
         return json.load(f)
 
 
-def save_profile(path: Path, data: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+def dump_json(data: Any) -> bytes:
+    """Canonical serialisation: sorted keys, 2-space indent, UTF-8, trailing newline."""
+    return (json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _unchanged(path: Path, payload: bytes) -> bool:
+    try:
+        if path.stat().st_size != len(payload):
+            return False
+        return hashlib.sha256(path.read_bytes()).digest() == hashlib.sha256(payload).digest()
+    except OSError:
+        return False
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    # Unique per thread: concurrent saves of one file (daemon, UI helpers) must not share a temp file
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp.open("wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Makes the renames durable; not possible (nor needed) on Windows
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json(path: Path, data: Any) -> bool:
+    """Write `data` canonically via temp file, fsync and rename; False if the file already had this content.
+
+    Unchanged files are not touched, so their mtime stays and file watchers,
+    the catalog and backup sync see no change. A crash mid-write leaves the
+    old file intact.
+    """
+    return bool(write_json_many([(path, data)])["written"])
+
+
+def write_json_many(items: Iterable[tuple[Path, Any]]) -> dict[str, int]:
+    """Batched write_json(): one directory fsync per directory; counts of {"written", "unchanged"}."""
+    written = unchanged = 0
+    directories: set[Path] = set()
+    for path, data in items:
+        payload = dump_json(data)
+        if _unchanged(path, payload):
+            unchanged += 1
+            continue
+        if path.parent not in directories:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            directories.add(path.parent)
+        _write_atomic(path, payload)
+        written += 1
+    for directory in directories:
+        _fsync_dir(directory)
+    return {"written": written, "unchanged": unchanged}
+
+
+def save_profile(path: Path, data: dict[str, Any]) -> bool:
+    """Save one profile (see write_json); False if it was unchanged."""
+    return write_json(path, data)
+
+
+def save_profiles(profiles: dict[Path, dict[str, Any]]) -> dict[str, int]:
+    """Save many profiles in one batch (see write_json_many)."""
+    return write_json_many(profiles.items())
+
+
+def find_profile(name: str, directory: Path = PROFILES_DIR) -> Path | None:
+    """Profile file for `name`: a matching file stem or "name" field (case-insensitive)."""
+    wanted = name.casefold()
+    files = sorted(directory.glob("*.json"))
+    for path in files:
+        if path.stem.casefold() == wanted:
+            return path
+    for path in files:
+        try:
+            if str(load_profile(path).get("name", "")).casefold() == wanted:
+                return path
+        except (OSError, ValueError, AttributeError):
+            continue
+    return None
+
+
+# -- schema -------------------------------------------------------------------
+# Profiles without "version" are version 1. Version 2 normalises the short
+# forms: "volume" is {"master": n}, "tags" a list, "voicemeeter" null or an
+# object ({"preset": ...}). Older versions are accepted and migrated forward
+# when read (migrate_profile); files on disk are only changed by saving.
+PROFILE_VERSION = 2
+
+
+def _is_str(v: Any) -> bool:
+    return isinstance(v, str)
+
+
+def _is_percent(v: Any) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool) and 0 <= v <= 100
+
+
+def _check(test: Callable[[Any], bool], expected: str, nullable: bool = True) -> Callable[[Any], str | None]:
+    def check(value: Any) -> str | None:
+        if value is None and nullable:
+            return None
+        return None if test(value) else f"expected {expected}, got {json.dumps(value)[:40]}"
+
+    return check
+
+
+def _check_tags_list(value: Any) -> str | None:
+    if value is None or (isinstance(value, list) and all(isinstance(t, str) for t in value)):
+        return None
+    return "expected a list of strings"
+
+
+def _check_voicemeeter(value: Any) -> str | None:
+    if value is None:
+        return None
+    if not isinstance(value, dict):
+        return "expected null or an object"
+    if value.get("preset") is not None and not isinstance(value["preset"], str):
+        return "preset: expected a string"
+    return None
+
+
+# Field -> (required, check) per schema version; unknown fields are allowed
+PROFILE_SCHEMAS: dict[int, dict[str, tuple[bool, Callable[[Any], str | None]]]] = {
+    1: {
+        "name": (False, _check(_is_str, "a string")),
+        "playback": (False, _check(_is_str, "a device id or name")),
+        "recording": (False, _check(_is_str, "a device id or name")),
+        "volume": (False, _check(lambda v: _is_percent(v) or (isinstance(v, dict) and _is_percent(v.get("master"))), "0-100 or {\"master\": 0-100}")),
+        "mute": (False, _check(lambda v: isinstance(v, bool), "true or false")),
+        "voicemeeter": (False, _check(lambda v: isinstance(v, (str, dict)), "null, a preset path or an object")),
+        "tags": (False, _check(lambda v: isinstance(v, str) or (isinstance(v, list) and all(isinstance(t, str) for t in v)), "a string or a list of strings")),
+    },
+    2: {
+        "version": (True, _check(lambda v: v == 2, "2", nullable=False)),
+        "name": (False, _check(_is_str, "a string")),
+        "playback": (False, _check(_is_str, "a device id or name")),
+        "recording": (False, _check(_is_str, "a device id or name")),
+        "volume": (False, _check(lambda v: isinstance(v, dict) and _is_percent(v.get("master")), "{\"master\": 0-100}")),
+        "mute": (False, _check(lambda v: isinstance(v, bool), "true or false")),
+        "voicemeeter": (False, _check_voicemeeter),
+        "tags": (False, _check_tags_list),
+    },
+}
+
+
+@functools.lru_cache(maxsize=None)
+def profile_validator(version: int) -> Callable[[dict[str, Any]], list[str]]:
+    """Validator for one schema version, built once: data -> list of error messages."""
+    fields = tuple((key, required, check) for key, (required, check) in PROFILE_SCHEMAS[version].items())
+
+    def validate(data: dict[str, Any]) -> list[str]:
+        errors = []
+        for key, required, check in fields:
+            if key not in data:
+                if required:
+                    errors.append(f"{key}: missing")
+                continue
+            error = check(data[key])
+            if error:
+                errors.append(f"{key}: {error}")
+        return errors
+
+    return validate
+
+
+def profile_version(data: Any) -> int | None:
+    """Schema version of a parsed profile; None if it is not a profile of a known version."""
+    if not isinstance(data, dict):
+        return None
+    version = data.get("version", 1)
+    return version if type(version) is int and version in PROFILE_SCHEMAS else None
+
+
+def validate_profile(data: Any) -> list[str]:
+    """Error messages for a parsed profile (empty if valid)."""
+    version = profile_version(data)
+    if version is None:
+        if not isinstance(data, dict):
+            return ["not a JSON object"]
+        return [f"version: unsupported ({json.dumps(data.get('version'))[:20]}, known: {sorted(PROFILE_SCHEMAS)})"]
+    return profile_validator(version)(data)
+
+
+def _v1_to_v2(data: dict[str, Any]) -> dict[str, Any]:
+    out = dict(data)
+    volume = out.get("volume")
+    if volume is not None and not isinstance(volume, dict):
+        out["volume"] = {"master": volume}
+    if isinstance(out.get("tags"), str):
+        out["tags"] = [out["tags"]]
+    if isinstance(out.get("voicemeeter"), str):
+        out["voicemeeter"] = {"preset": out["voicemeeter"]}
+    out["version"] = 2
+    return out
+
+
+MIGRATIONS: dict[int, Callable[[dict[str, Any]], dict[str, Any]]] = {1: _v1_to_v2}
+
+
+def migrate_profile(data: dict[str, Any]) -> dict[str, Any]:
+    """`data` (valid for its version) in the current schema; returned unchanged if already current."""
+    version = profile_version(data) or PROFILE_VERSION
+    while version < PROFILE_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    return data
+
+
+def checked_profile(data: Any) -> dict[str, Any]:
+    """Validated and migrated profile; ValueError with all messages if invalid."""
+    errors = validate_profile(data)
+    if errors:
+        raise ValueError("; ".join(errors))
+    return migrate_profile(data)
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    path: Path
+    mtime_ns: int
+    size: int
+    name: str
+    tags: tuple[str, ...] = ()
+    devices: tuple[str, ...] = ()  # playback/recording identifiers as written
+    data: dict[str, Any] | None = None  # None: file could not be parsed
+    error: str | None = None
+
+
+def _entry(path: Path, st: os.stat_result) -> CatalogEntry:
+    try:
+        data = load_profile(path)
+        if not isinstance(data, dict):
+            raise ValueError("not a JSON object")
+    except (OSError, ValueError) as e:
+        return CatalogEntry(path, st.st_mtime_ns, st.st_size, path.stem, error=str(e))
+    tags = data.get("tags") or ()
+    if isinstance(tags, str):
+        tags = (tags,)
+    elif not isinstance(tags, list):
+        tags = ()  # reported by validate()
+    devices = []
+    for kind in ("playback", "recording"):
+        identifier = data.get(kind)
+        # /init placeholders ("<set-after-scan>") are not devices
+        if identifier and not str(identifier).startswith("<"):
+            devices.append(str(identifier))
+    return CatalogEntry(
+        path,
+        st.st_mtime_ns,
+        st.st_size,
+        str(data.get("name") or path.stem),
+        tuple(str(t) for t in tags),
+        tuple(devices),
+        data,
+    )
+
+
+class ProfileCatalog:
+    """Parsed profiles of one directory, indexed by name, tag and device.
+
+    The first query scans the directory; `refresh()` stats every file again and
+    reparses only those whose mtime or size changed, so keeping a catalog
+    around (daemon, GUI) makes listing and lookups independent of the number
+    of profiles. Lookups are case-insensitive.
+    """
+
+    def __init__(self, directory: Path = PROFILES_DIR) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        # Keyed by path string: stat-only refreshes should not build Path objects
+        self._entries: dict[str, CatalogEntry] = {}
+        self._by_name: dict[str, str] = {}
+        self._by_stem: dict[str, str] = {}
+        self._by_tag: dict[str, list[str]] = {}
+        self._by_device: dict[str, list[str]] = {}
+        # Per path: (entry, result) - valid while the entry object is current
+        self._issues: dict[str, tuple[CatalogEntry, list[str]]] = {}
+        self._migrated: dict[str, tuple[CatalogEntry, dict[str, Any] | None]] = {}
+        self._scanned = False
+        self.parses = 0
+        self.migrations = 0
+
+    def refresh(self) -> dict[str, int]:
+        """Rescan the directory; counts of {"files", "parsed", "removed"}."""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> dict[str, int]:
+        self._scanned = True
+        seen: dict[str, CatalogEntry] = {}
+        parsed = 0
+        try:
+            with os.scandir(self.directory) as it:
+                files = [e for e in it if e.name.endswith(".json") and e.is_file()]
+        except OSError:
+            files = []
+        for dirent in files:
+            try:
+                st = dirent.stat()
+            except OSError:
+                continue
+            entry = self._entries.get(dirent.path)
+            if entry is None or entry.mtime_ns != st.st_mtime_ns or entry.size != st.st_size:
+                entry = _entry(Path(dirent.path), st)
+                parsed += 1
+            seen[dirent.path] = entry
+        gone = self._entries.keys() - seen.keys()
+        removed = len(gone)
+        for key in gone:
+            self._issues.pop(key, None)
+            self._migrated.pop(key, None)
+        self._entries = seen
+        if parsed or removed:
+            self.parses += parsed
+            self._reindex()
+        return {"files": len(seen), "parsed": parsed, "removed": removed}
+
+    def _reindex(self) -> None:
+        self._by_name, self._by_stem, self._by_tag, self._by_device = {}, {}, {}, {}
+        # Sorted like find_profile, so the first file wins on duplicate names
+        for path in sorted(self._entries):
+            entry = self._entries[path]
+            self._by_stem.setdefault(entry.path.stem.casefold(), path)
+            if entry.data is None:
+                continue
+            self._by_name.setdefault(entry.name.casefold(), path)
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag.casefold(), []).append(path)
+            for device in dict.fromkeys(entry.devices):
+                self._by_device.setdefault(device.casefold(), []).append(path)
+
+    def _ensure(self) -> None:
+        if not self._scanned:
+            self._refresh()
+
+    # -- queries ----------------------------------------------------------
+    def entries(self) -> list[CatalogEntry]:
+        """All profiles, sorted by file name (unparsable files included, see `error`)."""
+        with self._lock:
+            self._ensure()
+            return [self._entries[p] for p in sorted(self._entries)]
+
+    def find(self, name: str) -> CatalogEntry | None:
+        """Profile by file stem or "name" field, like find_profile()."""
+        with self._lock:
+            self._ensure()
+            wanted = name.casefold()
+            path = self._by_stem.get(wanted) or self._by_name.get(wanted)
+            return None if path is None else self._entries[path]
+
+    def tagged(self, tag: str) -> list[CatalogEntry]:
+        with self._lock:
+            self._ensure()
+            return [self._entries[p] for p in self._by_tag.get(tag.casefold(), ())]
+
+    def using_device(self, device: str) -> list[CatalogEntry]:
+        """Profiles whose playback or recording identifier is `device` (id or name)."""
+        with self._lock:
+            self._ensure()
+            return [self._entries[p] for p in self._by_device.get(device.casefold(), ())]
+
+    def _validated(self, key: str) -> list[str]:
+        entry = self._entries[key]
+        cached = self._issues.get(key)
+        if cached is None or cached[0] is not entry:
+            cached = (entry, [entry.error] if entry.error else validate_profile(entry.data))
+            self._issues[key] = cached
+        return cached[1]
+
+    def validate(self) -> dict[Path, list[str]]:
+        """Validate every profile in one pass: {path: errors} for the invalid ones.
+
+        Results are kept per file until it changes, so repeated runs only
+        validate edited files.
+        """
+        with self._lock:
+            self._ensure()
+            invalid = {}
+            for key in sorted(self._entries):
+                errors = self._validated(key)
+                if errors:
+                    invalid[self._entries[key].path] = errors
+            return invalid
+
+    def _current(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries[key]
+        cached = self._migrated.get(key)
+        if cached is None or cached[0] is not entry:
+            data = None if self._validated(key) else migrate_profile(entry.data)
+            if data is not None and data is not entry.data:
+                self.migrations += 1
+            cached = self._migrated[key] = (entry, data)
+        return cached[1]
+
+    def profile(self, name: str) -> dict[str, Any] | None:
+        """Profile `name` in the current schema; None if missing or invalid.
+
+        Older versions are migrated on first access and the result is cached
+        until the file changes. The returned dict is shared: copy before editing.
+        """
+        with self._lock:
+            self._ensure()
+            wanted = name.casefold()
+            key = self._by_stem.get(wanted) or self._by_name.get(wanted)
+            return None if key is None else self._current(key)
+
+    def checked(self, path: Path) -> dict[str, Any]:
+        """Profile file `path` (in this directory) in the current schema, like checked_profile().
+
+        Only this file is re-read if it changed; validation and migration results
+        are the cached ones of `profile`. ValueError with all messages if the
+        profile is invalid, OSError if the file is gone. The dict is shared.
+        """
+        with self._lock:
+            self._ensure()
+            key = str(path)
+            st = os.stat(key)
+            entry = self._entries.get(key)
+            if entry is None or entry.mtime_ns != st.st_mtime_ns or entry.size != st.st_size:
+                self._entries[key] = _entry(Path(key), st)
+                self.parses += 1
+                self._reindex()
+            errors = self._validated(key)
+            if errors:
+                raise ValueError("; ".join(errors))
+            return self._current(key)  # type: ignore[return-value]
+
+    def tags(self) -> list[str]:
+        with self._lock:
+            self._ensure()
+            return sorted(self._by_tag)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure()
+            return len(self._entries)
+
+
+_catalogs: dict[Path, ProfileCatalog] = {}
+_catalogs_lock = threading.Lock()
+
 
+def profile_catalog(directory: Path = PROFILES_DIR) -> ProfileCatalog:
+    """Process-wide ProfileCatalog of `directory` (kept warm in the daemon)."""
+    directory = Path(directory).resolve()
+    with _catalogs_lock:
+        if directory not in _catalogs:
+            _catalogs[directory] = ProfileCatalog(directory)
+        return _catalogs[directory]
@@ -0,0 +1,218 @@
+"""Transactional profile switch: parallel lanes, a total deadline and rollback.
+
+Run one after another, the steps of a Plan would cost the sum of their
+latencies. `run_transaction` groups the steps into lanes that run concurrently,
+each on its own worker (COM objects are per thread, so every lane keeps its own
+warm ones). The default playback device, volume and mute share a lane and stay
+in order, because volume and mute act on whatever the default playback device
+is when they run: in parallel they could hit the previous endpoint. The default
+recording device has no such dependency and gets its own lane, as does the
+VoiceMeeter preset. The switch then takes as long as the slowest lane.
+
+The whole transaction has one deadline. If a step fails or the deadline passes,
+the remaining steps are not started and every step that ran (or is still
+running) is undone in reverse order from the State captured before the plan was
+made (read_state): the previous default device of each role, volume and mute.
+Undo steps are queued on the same lane, so they run after a stuck call has
+returned; those that have not finished within the rollback timeout are
+cancelled if they have not started yet and reported as unfinished. After a
+playback switch, volume and mute were written to the new endpoint, whose prior
+values were not read; restoring the previous default device is the undo then.
+A VoiceMeeter preset cannot be read back and is not undone.
+
+Lane workers are process-wide and reused (warm COM objects in the daemon).
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from audio.metrics import incr
+from profiles.apply import Plan, State, Step, execute_step
+
+# Total time for all steps (seconds); undo steps get ROLLBACK_TIMEOUT on top
+DEFAULT_DEADLINE = 2.0
+ROLLBACK_TIMEOUT = 2.0
+
+# Step kind -> worker; steps of one lane run in plan order (see module docstring)
+LANES = {"playback": "windows", "volume": "windows", "mute": "windows", "recording": "recording", "voicemeeter": "voicemeeter"}
+
+
+def _init_com() -> None:
+    try:
+        import comtypes
+
+        comtypes.CoInitialize()
+    except Exception:
+        # No COM on this host (simulated backend) or already initialised
+        pass
+
+
+_pools: dict[str, concurrent.futures.ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _lane(name: str) -> concurrent.futures.ThreadPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix=f"Profile-{name}", initializer=_init_com)
+        return pool
+
+
+@dataclass
+class TransactionResult:
+    ok: bool
+    results: dict[str, bool] = field(default_factory=dict)  # kind -> success of executed steps
+    timed_out: list[str] = field(default_factory=list)  # steps still running at the deadline
+    not_run: list[str] = field(default_factory=list)
+    rolled_back: dict[str, bool] = field(default_factory=dict)  # kind -> undo succeeded
+    rollback_unfinished: list[str] = field(default_factory=list)  # undo still running or cancelled at the rollback timeout
+    elapsed: float = 0.0
+
+    @property
+    def failed(self) -> list[str]:
+        return [kind for kind, ok in self.results.items() if not ok] + self.timed_out
+
+    def describe(self) -> list[str]:
+        if self.ok:
+            return [f"ok ({self.elapsed * 1e3:.0f} ms)"]
+        lines = [f"failed: {', '.join(self.failed) or '-'} ({self.elapsed * 1e3:.0f} ms)"]
+        if self.timed_out:
+            lines.append(f"deadline passed while running: {', '.join(self.timed_out)}")
+        if self.not_run:
+            lines.append(f"not run: {', '.join(self.not_run)}")
+        if self.rolled_back:
+            restored = [k for k, ok in self.rolled_back.items() if ok]
+            broken = [k for k, ok in self.rolled_back.items() if not ok and k not in self.rollback_unfinished]
+            lines.append(f"rolled back: {', '.join(restored) or '-'}" + (f"; rollback failed: {', '.join(broken)}" if broken else ""))
+        if self.rollback_unfinished:
+            lines.append(f"rollback unfinished: {', '.join(self.rollback_unfinished)}")
+        return lines
+
+
+def _restore_defaults(backend: Any, flow: str, roles: dict[int, str | None], preferred: str | None) -> bool | None:
+    """Put every captured role of `flow` back on its previous device.
+
+    The preferred default is restored for all roles with one call; roles that
+    pointed elsewhere are then set one by one (backend.set_default_role).
+    """
+    if not preferred:
+        return None
+    setter = backend.set_default_playback if flow == "playback" else backend.set_default_recording
+    ok = bool(setter(preferred))
+    set_role = getattr(backend, "set_default_role", None)
+    for role, device_id in roles.items():
+        if device_id and device_id != preferred:
+            ok = (set_role is not None and bool(set_role(device_id, flow, role))) and ok
+    return ok
+
+
+def undo_step(step: Step, state: State, backend: Any, switched: bool) -> bool | None:
+    """Restore what `step` changed from the captured `state`; None if there is nothing to restore."""
+    snap = state.snapshot
+    if step.kind == "playback":
+        return _restore_defaults(backend, "playback", snap.defaults.get("playback", {}), snap.default_playback_id)
+    if step.kind == "recording":
+        return _restore_defaults(backend, "recording", snap.defaults.get("recording", {}), snap.default_recording_id)
+    if switched:
+        return None
+    if step.kind == "volume" and state.volume is not None:
+        return bool(backend.set_master_volume(state.volume))
+    if step.kind == "mute" and state.mute is not None:
+        return bool(backend.mute_master(state.mute))
+    return None
+
+
+class _Run:
+    """Shared bookkeeping of one transaction's lanes."""
+
+    def __init__(self, deadline: float) -> None:
+        self.deadline = deadline
+        self.abort = threading.Event()
+        self.lock = threading.Lock()
+        self.started: list[Step] = []
+        self.results: dict[str, bool] = {}
+
+    def lane(self, steps: list[Step], backend: Any, voicemeeter: Any) -> None:
+        for step in steps:
+            if self.abort.is_set() or time.monotonic() >= self.deadline:
+                return
+            with self.lock:
+                self.started.append(step)
+            try:
+                ok = execute_step(step, backend, voicemeeter=voicemeeter)
+            except Exception:
+                ok = False
+            with self.lock:
+                self.results[step.kind] = ok
+            if not ok:
+                # Let the other lanes stop before their next step
+                self.abort.set()
+                return
+
+
+def run_transaction(
+    plan: Plan,
+    backend: Any,
+    state: State,
+    deadline: float = DEFAULT_DEADLINE,
+    rollback_timeout: float = ROLLBACK_TIMEOUT,
+    voicemeeter: Any = None,
+) -> TransactionResult:
+    """Execute `plan` concurrently per lane within `deadline` seconds; undo it on failure.
+
+    `state` is the state the plan was made against (read_state), used for the undo.
+    """
+    start = time.monotonic()
+    steps = plan.operations
+    run = _Run(start + deadline)
+    lanes: dict[str, list[Step]] = {}
+    for step in steps:
+        lanes.setdefault(LANES.get(step.kind, "windows"), []).append(step)
+    futures = [_lane(name).submit(run.lane, lane_steps, backend, voicemeeter) for name, lane_steps in lanes.items()]
+    _done, pending = concurrent.futures.wait(futures, timeout=deadline)
+    run.abort.set()
+    for fut in pending:
+        # Still queued behind another transaction's stuck call: never start it
+        fut.cancel()
+
+    with run.lock:
+        started = list(run.started)
+        results = dict(run.results)
+    result = TransactionResult(ok=not pending and all(results.values()) and len(results) == len(steps), results=results)
+    result.timed_out = [s.kind for s in started if s.kind not in results]
+    started_ids = {id(s) for s in started}
+    result.not_run = [s.kind for s in steps if id(s) not in started_ids]
+    if result.ok:
+        result.elapsed = time.monotonic() - start
+        return result
+
+    incr("profile_rollback", plan.profile)
+    switched = any(s.kind == "playback" and s.device_id is not None for s in started)
+    undo: list[tuple[Step, concurrent.futures.Future]] = []
+    for step in reversed(started):
+        if step.kind == "voicemeeter":
+            # Not restorable; queuing it would also wait for a stuck preset load
+            continue
+        undo.append((step, _lane(LANES.get(step.kind, "windows")).submit(undo_step, step, state, backend, switched)))
+    concurrent.futures.wait([f for _s, f in undo], timeout=rollback_timeout)
+    for step, fut in undo:
+        if not fut.done():
+            # Queued behind a call that is still stuck (cancelled) or running itself
+            fut.cancel()
+            result.rollback_unfinished.append(step.kind)
+            result.rolled_back[step.kind] = False
+            continue
+        try:
+            restored = fut.result()
+        except Exception:
+            restored = False
+        if restored is not None:
+            result.rolled_back[step.kind] = restored
+    result.elapsed = time.monotonic() - start
+    return result